@@ -0,0 +1,235 @@
+import os
+import json
+import argparse
+import numpy as np
+from local_search import LocalSearchEngine, top_k
+from snapshot import SNAPSHOT_DIR
+from timing import Stopwatch
+
+INDEX_FILES = ["centroids", "codebooks", "list_offsets", "ids", "codes"]
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def squared_distances(data, centroids):
+    """||x - c||^2 for every pair, via the dot-product expansion"""
+    return (
+        np.einsum('ij,ij->i', data, data)[:, None]
+        - 2.0 * data @ centroids.T
+        + np.einsum('ij,ij->i', centroids, centroids)[None, :]
+    )
+
+
+def assign(data, centroids, block_size=16384):
+    """Index of the nearest centroid for every row, in blocks"""
+    # ||x||^2 is the same for every centroid, so it does not change the argmin
+    centroid_norms = np.einsum('ij,ij->i', centroids, centroids)
+    labels = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), block_size):
+        scores = centroid_norms[None, :] - 2.0 * data[start:start + block_size] @ centroids.T
+        labels[start:start + block_size] = scores.argmin(axis=1)
+    return labels
+
+
+def kmeans(data, k, iterations=20, seed=0):
+    """Plain Lloyd's k-means; empty clusters are re-seeded from random points"""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=len(data) < k)].copy()
+    for _ in range(iterations):
+        labels = assign(data, centroids)
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=k)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        centroids[present] = np.add.reduceat(data[order], starts, axis=0) / counts[present, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = data[rng.choice(len(data), size=len(empty))]
+    return centroids
+
+
+class IVFPQIndex:
+    """Inverted-file index with product-quantized residuals.
+
+    Vectors are normalized, so squared L2 ranks like cosine and the cosine
+    distance is half the squared L2 distance. Each vector is stored as
+    `m` one-byte codes: with 1536 dimensions and m=96 that is 96 bytes
+    instead of 6 KB. nprobe trades recall for speed at query time; rerank
+    re-scores the best candidates against the full vectors when they are
+    available.
+    """
+
+    def __init__(self, centroids, codebooks, list_offsets, ids, codes, vectors=None):
+        self.centroids = centroids
+        self.codebooks = codebooks
+        self.list_offsets = list_offsets
+        self.ids = ids
+        self.codes = codes
+        self.vectors = vectors
+        # Codebooks have up to 256 codewords, fewer when trained on a small sample
+        self.m, self.ksub, self.dsub = codebooks.shape
+        # ||q - c - r||^2 = ||q - c||^2 + (||r||^2 + 2 c.r) - 2 q.r; the middle term
+        # only depends on the list and the codeword, so it is computed once here
+        split_centroids = centroids.reshape(len(centroids), self.m, self.dsub)
+        self._list_terms = (
+            np.einsum('mkd,mkd->mk', codebooks, codebooks)[None]
+            + 2.0 * np.einsum('lmd,mkd->lmk', split_centroids, codebooks)
+        ).astype(np.float32)
+
+    @classmethod
+    def build(cls, vectors, nlist=1024, m=16, train_size=100000, iterations=20, seed=0, block_size=16384):
+        """Train the coarse quantizer and PQ codebooks on a sample, then encode every vector"""
+        n, dimensions = vectors.shape
+        if dimensions % m:
+            raise ValueError(f"{dimensions} dimensions do not split into {m} subvectors")
+        dsub = dimensions // m
+        rng = np.random.default_rng(seed)
+        sample = normalize(vectors[np.sort(rng.choice(n, size=min(train_size, n), replace=False))])
+
+        centroids = kmeans(sample, min(nlist, len(sample)), iterations, seed)
+        residuals = sample - centroids[assign(sample, centroids)]
+        codebooks = np.stack([
+            kmeans(residuals[:, j * dsub:(j + 1) * dsub], min(256, len(sample)), iterations, seed + j)
+            for j in range(m)
+        ])
+
+        labels = np.empty(n, dtype=np.int64)
+        codes = np.empty((n, m), dtype=np.uint8)
+        for start in range(0, n, block_size):
+            block = normalize(vectors[start:start + block_size])
+            block_labels = assign(block, centroids)
+            block_residuals = block - centroids[block_labels]
+            labels[start:start + len(block)] = block_labels
+            for j in range(m):
+                codes[start:start + len(block), j] = assign(block_residuals[:, j * dsub:(j + 1) * dsub], codebooks[j])
+
+        order = np.argsort(labels, kind='stable')
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))])
+        return cls(centroids, codebooks, list_offsets, order, codes[order], vectors)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in INDEX_FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "index.json"), 'w', encoding='utf-8') as f:
+            json.dump({"type": "ivfpq", "nlist": len(self.centroids), "m": self.m, "dsub": self.dsub,
+                       "vectors": len(self.ids)}, f, indent=2)
+
+    @classmethod
+    def load(cls, directory, vectors=None):
+        """Load a saved index; the id and code arrays stay memory-mapped"""
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in INDEX_FILES}
+        arrays["centroids"] = np.asarray(arrays["centroids"])
+        arrays["codebooks"] = np.asarray(arrays["codebooks"])
+        return cls(vectors=vectors, **arrays)
+
+    def search_indices(self, queries, k=10, nprobe=8, rerank=0):
+        """(indices, cosine distances) of the approximate k nearest rows per query"""
+        queries = normalize(np.atleast_2d(queries))
+        coarse = squared_distances(queries, self.centroids)
+        probes = top_k(-coarse, nprobe)
+        # q.r for every query, subvector and codeword in one batched matmul: (m, queries, ksub)
+        query_terms = np.matmul(queries.reshape(len(queries), self.m, self.dsub).transpose(1, 0, 2),
+                                self.codebooks.transpose(0, 2, 1))
+        subspace_offsets = np.arange(self.m) * self.ksub
+        all_idx, all_dist = [], []
+
+        for qi, (query, lists) in enumerate(zip(queries, probes)):
+            # Lookup tables of every probed list, flattened to (lists, m * ksub)
+            tables = (self._list_terms[lists] - 2.0 * query_terms[:, qi][None]).reshape(len(lists), -1)
+
+            # Probed lists are contiguous runs of the codes array
+            starts, ends = self.list_offsets[lists], self.list_offsets[lists + 1]
+            sizes = ends - starts
+            if not sizes.sum():
+                all_idx.append(np.empty(0, dtype=np.int64))
+                all_dist.append(np.empty(0, dtype=np.float32))
+                continue
+            codes = np.concatenate([self.codes[s:e] for s, e in zip(starts, ends)])
+            ids = np.concatenate([self.ids[s:e] for s, e in zip(starts, ends)])
+            probe = np.repeat(np.arange(len(lists)), sizes)
+            flat = tables.reshape(-1)[(probe * tables.shape[1])[:, None] + subspace_offsets + codes]
+            dist = flat.sum(axis=1) + coarse[qi, lists][probe]
+
+            keep = top_k(-dist[None], max(k, rerank))[0]
+            ids, dist = ids[keep], dist[keep] / 2.0
+
+            if rerank and self.vectors is not None:
+                exact = normalize(self.vectors[np.sort(ids)])
+                dist = 1.0 - exact @ query
+                ids = np.sort(ids)
+                keep = top_k(-dist[None], k)[0]
+                ids, dist = ids[keep], dist[keep]
+            all_idx.append(np.asarray(ids[:k]))
+            all_dist.append(np.asarray(dist[:k]))
+        return all_idx, all_dist
+
+
+def recall_at_k(found, truth):
+    return float(np.mean([len(set(f.tolist()) & set(t.tolist())) / max(len(t), 1) for f, t in zip(found, truth)]))
+
+
+def clustered_vectors(n, dimensions, clusters=200, seed=0):
+    """Synthetic embeddings with cluster structure, closer to real ones than pure noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    return centers[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dimensions)).astype(np.float32)
+
+
+def main():
+    """Build an IVF-PQ index and compare recall@k and queries/sec with exact search"""
+    parser = argparse.ArgumentParser(description="IVF-PQ approximate search over snapshot embeddings")
+    parser.add_argument("--snapshot", default=os.path.join(SNAPSHOT_DIR, "Track"), help="snapshot.py export with vectors")
+    parser.add_argument("--synthetic", type=int, help="Use N clustered random vectors instead of a snapshot")
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--index", help="Index directory (default: <snapshot>/ivfpq)")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--m", type=int, default=16, help="PQ subvectors (bytes per vector)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--rerank", type=int, default=0, help="Re-score this many candidates exactly")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = clustered_vectors(args.synthetic, args.dimensions)
+        exact = LocalSearchEngine(vectors, list(range(len(vectors))), [{} for _ in range(len(vectors))])
+        index_dir = args.index
+    else:
+        exact = LocalSearchEngine.from_snapshot(args.snapshot)
+        vectors = exact.vectors
+        index_dir = args.index or os.path.join(args.snapshot, "ivfpq")
+
+    if index_dir and os.path.exists(os.path.join(index_dir, "index.json")) and not args.rebuild:
+        index = IVFPQIndex.load(index_dir, vectors)
+        print(f"Loaded index from {index_dir}")
+    else:
+        with Stopwatch() as build:
+            index = IVFPQIndex.build(vectors, nlist=args.nlist, m=args.m)
+        print(f"Built index in {build.elapsed_ms / 1000:.1f}s ({index.m} bytes/vector)")
+        if index_dir:
+            index.save(index_dir)
+
+    rng = np.random.default_rng(1)
+    queries = np.asarray(vectors[np.sort(rng.choice(len(vectors), size=args.queries, replace=False))], dtype=np.float32)
+    queries += rng.normal(scale=0.01, size=queries.shape).astype(np.float32)
+
+    with Stopwatch() as sw:
+        truth, _ = exact.search_indices(queries, args.k)
+    print(f"\n📊 {len(vectors)} vectors, {len(queries)} queries, recall@{args.k}")
+    print(f"{'method':<16} {'recall':>7} {'queries/s':>10}")
+    print(f"{'exact':<16} {1.0:>7.3f} {len(queries) / (sw.elapsed_ms / 1000):>10.0f}")
+
+    for nprobe in args.nprobe:
+        with Stopwatch() as sw:
+            found, _ = index.search_indices(queries, args.k, nprobe=nprobe, rerank=args.rerank)
+        label = f"nprobe={nprobe}" + (f" rr={args.rerank}" if args.rerank else "")
+        print(f"{label:<16} {recall_at_k(found, truth):>7.3f} {len(queries) / (sw.elapsed_ms / 1000):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from weaviate.classes.query import MetadataQuery
+from weaviate_client import connect_async
+from track_schema import LEGACY_TRACK_COLLECTION, UI_PROPERTIES
+from timing import summarize, format_summary
+
+SEARCH_MODES = ["near_text", "hybrid", "bm25"]
+
+
+def read_queries(path):
+    """Read queries from a .jsonl file ({"query": ..., "id": ...} per line) or plain text, one per line"""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                entry = json.loads(line)
+                queries.append({"id": entry.get("id", line_no), "query": entry["query"], "limit": entry.get("limit")})
+            else:
+                queries.append({"id": line_no, "query": line, "limit": None})
+    return queries
+
+
+def result_row(obj):
+    """JSON-serializable view of one returned object"""
+    return {
+        "uuid": str(obj.uuid),
+        "distance": obj.metadata.distance,
+        "score": obj.metadata.score,
+        "properties": obj.properties,
+    }
+
+
+async def run_query(collection, mode, entry, limit, return_properties):
+    search = getattr(collection.query, mode)
+    metadata = MetadataQuery(distance=True) if mode == "near_text" else MetadataQuery(score=True)
+    response = await search(
+        query=entry["query"], limit=entry["limit"] or limit,
+        return_properties=return_properties, return_metadata=metadata,
+    )
+    return [result_row(obj) for obj in response.objects]
+
+
+async def batch_search(client, collection_name, queries, output_path, mode="near_text", limit=10,
+                       concurrency=16, return_properties=None):
+    """Run queries with at most `concurrency` in flight and stream each result as one JSONL line.
+
+    Lines are written in completion order, so use the id field to join them
+    back to the input. Returns (latencies_ms, errors, elapsed_s).
+    """
+    collection = client.collections.get(collection_name)
+    return_properties = return_properties or UI_PROPERTIES
+    pending = asyncio.Queue()
+    for entry in queries:
+        pending.put_nowait(entry)
+
+    latencies, errors = [], 0
+    start = time.perf_counter()
+
+    with open(output_path, 'w', encoding='utf-8') as out:
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    entry = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                line = {"id": entry["id"], "query": entry["query"]}
+                query_start = time.perf_counter()
+                try:
+                    line["results"] = await run_query(collection, mode, entry, limit, return_properties)
+                except Exception as e:
+                    errors += 1
+                    line["error"] = str(e)
+                line["latency_ms"] = (time.perf_counter() - query_start) * 1000
+                latencies.append(line["latency_ms"])
+                out.write(json.dumps(line, default=str) + "\n")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run(args):
+    queries = read_queries(args.queries)
+    output = args.output or os.path.splitext(args.queries)[0] + ".results.jsonl"
+    print(f"🔎 {len(queries)} queries against {args.collection} ({args.mode}, concurrency {args.concurrency})")
+
+    async with connect_async(args.target) as client:
+        latencies, errors, elapsed = await batch_search(
+            client, args.collection, queries, output, mode=args.mode, limit=args.limit,
+            concurrency=args.concurrency, return_properties=args.properties,
+        )
+
+    print(f"✅ Wrote {len(latencies)} results to {output} in {elapsed:.1f}s "
+          f"({len(latencies) / max(elapsed, 1e-9):.1f} queries/s, {errors} errors)")
+    print(format_summary("per-query latency", summarize(latencies)))
+
+
+def main():
+    """Offline batch search over a file of queries"""
+    parser = argparse.ArgumentParser(description="Run a file of queries concurrently through the async Weaviate client")
+    parser.add_argument("queries", help="Text file with one query per line, or .jsonl with a query field")
+    parser.add_argument("--output", help="Results JSONL path (default: <queries>.results.jsonl)")
+    parser.add_argument("--collection", default=LEGACY_TRACK_COLLECTION)
+    parser.add_argument("--mode", choices=SEARCH_MODES, default="near_text")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum queries in flight")
+    parser.add_argument("--properties", nargs="+", help="Properties to return (default: the UI properties)")
+    parser.add_argument("--target", choices=["local", "cloud"], default=None)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import uuid
+import argparse
+import numpy as np
+from weaviate.classes.config import Configure, Property, DataType
+from weaviate_client import connect, get_client
+from timing import Stopwatch, summarize, format_summary
+from track_schema import UI_PROPERTIES
+
+
+def time_calls(fn, repeats):
+    """Call fn `repeats` times after one warm-up and return the latency summary"""
+    fn()
+    samples = []
+    for _ in range(repeats):
+        with Stopwatch() as sw:
+            fn()
+        samples.append(sw.elapsed_ms)
+    return summarize(samples)
+
+
+def benchmark_queries(client, collection_name, limit, repeats):
+    """Same fetch over gRPC (v4 query API) and over REST/GraphQL"""
+    collection = client.collections.get(collection_name)
+    fields = " ".join(UI_PROPERTIES)
+    gql = f"{{ Get {{ {collection_name}(limit: {limit}) {{ {fields} }} }} }}"
+
+    return {
+        f"gRPC fetch_objects({limit})": time_calls(
+            lambda: collection.query.fetch_objects(limit=limit, return_properties=UI_PROPERTIES), repeats),
+        f"GraphQL Get({limit})": time_calls(lambda: client.graphql_raw_query(gql), repeats),
+    }
+
+
+def benchmark_connection_reuse(target, collection_name, repeats):
+    """A shared client against opening a new connection for every query"""
+    def fresh_connection():
+        client = connect(target)
+        try:
+            client.collections.get(collection_name).query.fetch_objects(limit=1)
+        finally:
+            client.close()
+
+    shared = get_client(target).collections.get(collection_name)
+    return {
+        "shared client": time_calls(lambda: shared.query.fetch_objects(limit=1), repeats),
+        "connect per query": time_calls(fresh_connection, max(1, repeats // 5)),
+    }
+
+
+def benchmark_inserts(client, objects, dimensions):
+    """Insert throughput of gRPC batches against one REST request per object"""
+    name = "ClientBench"
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((objects, dimensions)).astype(np.float32)
+    results = {}
+
+    for label in ("gRPC batch", "REST insert"):
+        client.collections.delete(name)
+        collection = client.collections.create(
+            name=name,
+            vectorizer_config=Configure.Vectorizer.none(),
+            properties=[Property(name="name", data_type=DataType.TEXT)],
+        )
+        with Stopwatch() as sw:
+            if label == "gRPC batch":
+                with collection.batch.fixed_size(batch_size=200, concurrent_requests=4) as batch:
+                    for i, vector in enumerate(vectors):
+                        batch.add_object(properties={"name": f"track {i}"}, vector=vector.tolist(), uuid=uuid.uuid4())
+            else:
+                for i, vector in enumerate(vectors):
+                    collection.data.insert(properties={"name": f"track {i}"}, vector=vector.tolist())
+        results[label] = objects / (sw.elapsed_ms / 1000)
+
+    client.collections.delete(name)
+    return results
+
+
+def main():
+    """Micro-benchmark of the v4 gRPC client paths used by the loaders and queries"""
+    parser = argparse.ArgumentParser(description="gRPC vs REST and connection reuse micro-benchmark")
+    parser.add_argument("--target", choices=["local", "cloud"], default=None)
+    parser.add_argument("--collection", default="Track")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--insert-objects", type=int, default=2000, help="0 skips the insert benchmark")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    args = parser.parse_args()
+
+    client = get_client(args.target)
+
+    print("📊 Query latency")
+    for label, summary in benchmark_queries(client, args.collection, args.limit, args.repeats).items():
+        print(format_summary(label, summary))
+
+    print("\n📊 Connection reuse")
+    for label, summary in benchmark_connection_reuse(args.target, args.collection, args.repeats).items():
+        print(format_summary(label, summary))
+
+    if args.insert_objects:
+        print(f"\n📊 Insert throughput ({args.insert_objects} objects, {args.dimensions}-dim vectors)")
+        for label, rate in benchmark_inserts(client, args.insert_objects, args.dimensions).items():
+            print(f"{label:<32} {rate:.0f} objects/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import time
+import argparse
+import numpy as np
+from weaviate.classes.config import Configure
+from weaviate.classes.query import MetadataQuery
+from weaviate_client import connect
+from index_profiles import INDEX_PROFILES, vector_index_config, estimated_bytes_per_vector, is_compressed
+from timing import Stopwatch, summarize
+
+
+def load_vectors(collection, limit):
+    """Pull up to `limit` (uuid, vector) pairs out of a collection"""
+    uuids, vectors = [], []
+    for obj in collection.iterator(include_vector=True, return_properties=[]):
+        vector = obj.vector.get("default")
+        if vector is None:
+            continue
+        uuids.append(str(obj.uuid))
+        vectors.append(vector)
+        if len(uuids) >= limit:
+            break
+    return uuids, np.asarray(vectors, dtype=np.float32)
+
+
+def exact_neighbors(data, queries, k):
+    """Ground-truth cosine top-k indices by brute force"""
+    data_n = data / np.linalg.norm(data, axis=1, keepdims=True)
+    query_n = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = query_n @ data_n.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def wait_for_compression(client, name, timeout=120):
+    """Whether every shard of a collection reports compressed vectors, polling up to timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while True:
+        shards = [shard for node in client.cluster.nodes(collection=name, output="verbose") for shard in node.shards
+                  if shard.collection == name]
+        if shards and all(shard.compressed for shard in shards):
+            return True
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(1)
+
+
+def benchmark_profile(client, profile, uuids, data, queries, truth, k):
+    """Build a bring-your-own-vector collection with a profile and measure recall and latency.
+
+    Quantizers train on the benchmark's own object count; a compressed
+    profile whose shards never report compression returns None instead of
+    numbers that would describe plain HNSW.
+    """
+    name = f"IndexBench_{profile.replace('-', '_')}"
+    client.collections.delete(name)
+    collection = client.collections.create(
+        name=name,
+        vectorizer_config=Configure.Vectorizer.none(),
+        vector_index_config=vector_index_config(profile, objects=len(data)),
+    )
+
+    with Stopwatch() as build:
+        with collection.batch.fixed_size(batch_size=500, concurrent_requests=4) as batch:
+            for uuid, vector in zip(uuids, data):
+                batch.add_object(properties={}, uuid=uuid, vector=vector.tolist())
+
+    if is_compressed(profile) and not wait_for_compression(client, name):
+        client.collections.delete(name)
+        return None
+
+    position = {uuid: i for i, uuid in enumerate(uuids)}
+    samples, hits = [], 0
+    for query, expected in zip(queries, truth):
+        with Stopwatch() as sw:
+            response = collection.query.near_vector(
+                near_vector=query.tolist(), limit=k, return_properties=[],
+                return_metadata=MetadataQuery(distance=True),
+            )
+        samples.append(sw.elapsed_ms)
+        found = {position[str(obj.uuid)] for obj in response.objects}
+        hits += len(found & set(expected.tolist()))
+
+    client.collections.delete(name)
+    latency = summarize(samples)
+    return {
+        "profile": profile,
+        "recall": hits / (len(queries) * k),
+        "p50": latency["p50"],
+        "p95": latency["p95"],
+        "qps": 1000 / latency["mean"] if latency["mean"] else 0.0,
+        "build_s": build.elapsed_ms / 1000,
+        "bytes_per_vector": estimated_bytes_per_vector(profile, data.shape[1]),
+    }
+
+
+def main():
+    """Compare vector index profiles on the same vectors and query set"""
+    parser = argparse.ArgumentParser(description="Recall/latency benchmark of the vector index profiles")
+    parser.add_argument("--source", default="Track", help="Collection to copy vectors from")
+    parser.add_argument("--objects", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--profiles", nargs="+", default=list(INDEX_PROFILES), choices=list(INDEX_PROFILES))
+    parser.add_argument("--local", action="store_true", help="Run against a local Weaviate instead of the cloud cluster")
+    args = parser.parse_args()
+
+    client = connect("local" if args.local else None)
+    try:
+        uuids, vectors = load_vectors(client.collections.get(args.source), args.objects + args.queries)
+        if len(vectors) <= args.queries:
+            print(f"Not enough vectors in {args.source} for {args.queries} queries")
+            return
+
+        # Hold the query vectors out of the indexed data so no query finds itself
+        rng = np.random.default_rng(42)
+        order = rng.permutation(len(vectors))
+        query_idx, data_idx = order[:args.queries], order[args.queries:]
+        data, queries = vectors[data_idx], vectors[query_idx]
+        data_uuids = [uuids[i] for i in data_idx]
+        truth = exact_neighbors(data, queries, args.k)
+
+        print(f"📊 {len(data)} vectors ({data.shape[1]} dims), {len(queries)} queries, recall@{args.k}\n")
+        print(f"{'profile':<12} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'qps':>7} {'build s':>8} {'~bytes/vec':>11}")
+        for profile in args.profiles:
+            r = benchmark_profile(client, profile, data_uuids, data, queries, truth, args.k)
+            if r is None:
+                print(f"{profile:<12} skipped: vectors were not compressed after import")
+                continue
+            print(f"{r['profile']:<12} {r['recall']:>7.3f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['qps']:>7.0f} {r['build_s']:>8.1f} {r['bytes_per_vector']:>11}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
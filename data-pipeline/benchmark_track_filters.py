@@ -0,0 +1,78 @@
+import argparse
+from weaviate.classes.query import Filter
+from timing import Stopwatch, summarize, format_summary
+from track_schema import LEGACY_TRACK_COLLECTION, TYPED_TRACK_COLLECTION, create_weaviate_client
+
+GENRES = ["pop", "rock", "hip hop", "k-pop", "jazz"]
+
+
+def legacy_filters():
+    """Filters as they have to be written against the TEXT-blob schema"""
+    queries = {}
+    for genre in GENRES:
+        queries[f"genre={genre}"] = Filter.by_property("genres").like(f"*{genre}*")
+    queries["popularity>=70"] = Filter.by_property("popularity").greater_or_equal(70)
+    queries["genre=pop & popularity>=60"] = (
+        Filter.by_property("genres").like("*pop*") & Filter.by_property("popularity").greater_or_equal(60)
+    )
+    queries["year 2015-2020"] = Filter.any_of([
+        Filter.by_property("release_date").like(f"{year}*") for year in range(2015, 2021)
+    ])
+    return queries
+
+
+def typed_filters():
+    """The same filters against the typed schema"""
+    queries = {}
+    for genre in GENRES:
+        queries[f"genre={genre}"] = Filter.by_property("genres").contains_any([genre])
+    queries["popularity>=70"] = Filter.by_property("popularity").greater_or_equal(70)
+    queries["genre=pop & popularity>=60"] = (
+        Filter.by_property("genres").contains_any(["pop"]) & Filter.by_property("popularity").greater_or_equal(60)
+    )
+    queries["year 2015-2020"] = (
+        Filter.by_property("release_year").greater_or_equal(2015) & Filter.by_property("release_year").less_or_equal(2020)
+    )
+    return queries
+
+
+def run_filters(collection, filters, repeats, limit):
+    """Time every filter `repeats` times after one warm-up call"""
+    results = {}
+    for label, query_filter in filters.items():
+        collection.query.fetch_objects(filters=query_filter, limit=limit, return_properties=["spotify_id"])
+        samples = []
+        for _ in range(repeats):
+            with Stopwatch() as sw:
+                collection.query.fetch_objects(filters=query_filter, limit=limit, return_properties=["spotify_id"])
+            samples.append(sw.elapsed_ms)
+        results[label] = summarize(samples)
+    return results
+
+
+def main():
+    """Compare filtered query latency before and after the typed schema migration"""
+    parser = argparse.ArgumentParser(description="Benchmark filtered Track queries on the legacy and typed schemas")
+    parser.add_argument("--legacy", default=LEGACY_TRACK_COLLECTION)
+    parser.add_argument("--typed", default=TYPED_TRACK_COLLECTION)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    client = create_weaviate_client()
+    try:
+        before = run_filters(client.collections.get(args.legacy), legacy_filters(), args.repeats, args.limit)
+        after = run_filters(client.collections.get(args.typed), typed_filters(), args.repeats, args.limit)
+    finally:
+        client.close()
+
+    print(f"\n📊 Filtered query latency ({args.legacy} -> {args.typed}, {args.repeats} runs each)")
+    for label in before:
+        print(format_summary(f"[before] {label}", before[label]))
+        print(format_summary(f"[after]  {label}", after[label]))
+        speedup = before[label]['p50'] / after[label]['p50'] if after[label]['p50'] else float('inf')
+        print(f"{'':<32} p50 speedup: {speedup:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import os
+import csv
+import time
+import argparse
+from weaviate.classes.config import Configure, Property, DataType
+from weaviate_client import connect, api_key_headers
+from ingestion import IngestionCheckpoint, ingest_rows
+from index_profiles import vector_index_config, add_index_profile_argument
+
+BOOKS_CSV_PATH = os.path.join(os.path.dirname(__file__), '7k-books-kaggle.csv')
+
+# Column order of the kaggle books CSV
+BOOK_COLUMNS = [
+    "isbn13", "isbn10", "title", "subtitle", "authors", "categories",
+    "thumbnail", "description", "published_year", "average_rating",
+    "num_pages", "ratings_count",
+]
+
+# Provider specific settings: where to connect, which collection to fill,
+# which API key headers the server-side modules need and how the collection
+# is vectorized and generated from
+PROVIDERS = {
+    "local": {
+        "connection": "local",
+        "collection": "Book",
+        "headers": [],
+        "vectorizer": lambda: Configure.Vectorizer.text2vec_ollama(model="snowflake-arctic-embed:latest", api_endpoint="http://host.docker.internal:11434"),
+        "generative": lambda: Configure.Generative.ollama(api_endpoint="http://host.docker.internal:11434", model="llama3:latest"),
+    },
+    "cloud": {
+        "connection": "cloud",
+        "collection": "Book",
+        "headers": ["X-OpenAI-Api-Key"],
+        "vectorizer": lambda: Configure.Vectorizer.text2vec_openai(model="text-embedding-3-small"),
+        "generative": lambda: Configure.Generative.openai(model="gpt-3.5-turbo"),
+    },
+    "friendliai": {
+        "connection": "cloud",
+        "collection": "WeaviateEmbeddingBooks",
+        "headers": ["X-Friendli-Api-Key"],
+        "vectorizer": lambda: Configure.Vectorizer.text2vec_weaviate(model="Snowflake/snowflake-arctic-embed-l-v2.0"),
+        "generative": lambda: Configure.Generative.friendliai(model="meta-llama-3.3-70b-instruct"),
+    },
+}
+
+
+def book_properties():
+    """Property definitions of the Book collection"""
+    return [
+        Property(name="title", data_type=DataType.TEXT),
+        Property(name="isbn10", data_type=DataType.TEXT, skip_vectorization=True),
+        Property(name="isbn13", data_type=DataType.TEXT, skip_vectorization=True),
+        Property(name="categories", data_type=DataType.TEXT),
+        Property(name="thumbnail", data_type=DataType.TEXT, skip_vectorization=True),
+        Property(name="description", data_type=DataType.TEXT),
+        Property(name="num_pages", data_type=DataType.TEXT, skip_vectorization=True),
+        Property(name="average_rating", data_type=DataType.TEXT, skip_vectorization=True),
+        Property(name="published_year", data_type=DataType.TEXT, skip_vectorization=True),
+        Property(name="authors", data_type=DataType.TEXT, skip_vectorization=True),
+    ]
+
+
+def connect_provider(provider):
+    """Create a Weaviate client for the given provider settings"""
+    settings = PROVIDERS[provider]
+    return connect(settings["connection"], headers=api_key_headers(settings["headers"]))
+
+
+def create_book_collection(client, provider, index_profile=None):
+    """(Re)create the provider's book collection"""
+    settings = PROVIDERS[provider]
+    client.collections.delete(name=settings["collection"])
+    return client.collections.create(
+        name=settings["collection"],
+        vectorizer_config=settings["vectorizer"](),
+        generative_config=settings["generative"](),
+        vector_index_config=vector_index_config(index_profile),
+        properties=book_properties(),
+    )
+
+
+def read_books(csv_path=BOOKS_CSV_PATH):
+    """Read the books CSV into property dicts, skipping the header and duplicate ISBNs"""
+    books = []
+    seen = set()
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if not row or row[0] == "isbn13":
+                continue
+            row = (row + [""] * len(BOOK_COLUMNS))[:len(BOOK_COLUMNS)]
+            book = dict(zip(BOOK_COLUMNS, row))
+            if not book["isbn13"] or book["isbn13"] in seen:
+                continue
+            seen.add(book["isbn13"])
+            books.append(book)
+    return books
+
+
+def load_books(provider, csv_path=BOOKS_CSV_PATH, resume=False, batch_size=200, concurrent_requests=4):
+    """Batch load the books CSV into the provider's collection"""
+    settings = PROVIDERS[provider]
+    books = read_books(csv_path)
+    print(f"Found {len(books)} books in {os.path.basename(csv_path)}")
+
+    client = connect_provider(provider)
+    try:
+        book_collection = client.collections.get(settings["collection"])
+        checkpoint = IngestionCheckpoint(settings["collection"], csv_path)
+
+        start = time.time()
+        inserted, failed = ingest_rows(
+            book_collection, books, checkpoint, uuid_key="isbn13", resume=resume,
+            batch_size=batch_size, concurrent_requests=concurrent_requests,
+        )
+        elapsed = time.time() - start
+
+        print(f"Loaded {inserted} books into {settings['collection']} in {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):.0f} books/s)")
+        if failed:
+            print(f"{failed} books failed, see {checkpoint.dead_letter_path}")
+    finally:
+        client.close()
+
+
+def create_main(default_provider="local"):
+    """Command line entry point shared by the 1-create_collection scripts"""
+    parser = argparse.ArgumentParser(description="Create the book collection")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default=default_provider)
+    add_index_profile_argument(parser)
+    args = parser.parse_args()
+
+    client = connect_provider(args.provider)
+    try:
+        print(client.is_connected())
+        create_book_collection(client, args.provider, index_profile=args.index_profile)
+        print(f"Created {PROVIDERS[args.provider]['collection']} collection")
+    finally:
+        client.close()
+
+
+def main(default_provider="local"):
+    """Command line entry point shared by the 2-populate scripts"""
+    parser = argparse.ArgumentParser(description="Batch load the kaggle books dataset into Weaviate")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default=default_provider)
+    parser.add_argument("--csv", default=BOOKS_CSV_PATH, help="Path to the books CSV file")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent batch requests")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint and retry dead letters")
+    args = parser.parse_args()
+
+    load_books(
+        args.provider, csv_path=args.csv, resume=args.resume,
+        batch_size=args.batch_size, concurrent_requests=args.concurrency,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import os
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from timing import Stopwatch, summarize, format_summary
+
+CATALOG_DIR = os.path.join(os.path.dirname(__file__), 'catalog')
+TABLE_FILES = {"tracks": "tracks.json", "artists": "artists.json", "albums": "albums.json"}
+
+# Values that belong to the album and move off the track rows
+ALBUM_COLUMNS = {"album_id": "album_id", "album": "name", "album_image_url": "image_url", "release_date": "release_date"}
+DENORMALIZED_COLUMNS = ["artists", "artist_ids", "album", "album_id", "album_image_url", "release_date"]
+
+
+def _split(value):
+    if not isinstance(value, str):
+        return []
+    return [part.strip() for part in value.split(";")]
+
+
+def _artist_rows(tracks):
+    """(track position, artist name, artist id or None) for every credited artist"""
+    names = tracks["artists"].map(_split)
+    ids = tracks["artist_ids"].map(_split) if "artist_ids" in tracks else pd.Series([[]] * len(tracks))
+    owners, artist_names, artist_ids = [], [], []
+    for position, (row_names, row_ids) in enumerate(zip(names, ids)):
+        # Exports written before artist_ids were kept fall back to the names
+        if len(row_ids) != len(row_names):
+            row_ids = [""] * len(row_names)
+        for name, artist_id in zip(row_names, row_ids):
+            if name:
+                owners.append(position)
+                artist_names.append(name)
+                artist_ids.append(artist_id or None)
+    return np.asarray(owners, dtype=np.int64), artist_names, artist_ids
+
+
+def normalize_catalog(tracks):
+    """Split a track frame into tracks, artists and albums tables linked by integer keys.
+
+    Artists are identified by their Spotify id, albums by album_id; rows
+    from older exports without ids fall back to the artist name
+    and to the album name plus cover URL. Track order is kept.
+    """
+    tracks = tracks.reset_index(drop=True)
+    # Categorical columns (memory-optimized frames) are split and joined as plain strings
+    tracks = tracks.astype({c: object for c in DENORMALIZED_COLUMNS
+                            if c in tracks and isinstance(tracks[c].dtype, pd.CategoricalDtype)})
+    owners, names, artist_ids = _artist_rows(tracks)
+    identity = [i if i else "name:" + n for i, n in zip(artist_ids, names)]
+    artist_codes, _ = pd.factorize(pd.Series(identity, dtype=object))
+    artists = pd.DataFrame({"artist_id": artist_ids, "name": names}).groupby(artist_codes, sort=True).first()
+
+    album_ids = tracks["album_id"] if "album_id" in tracks else pd.Series([None] * len(tracks))
+    fallback = "name:" + tracks["album"].fillna("").astype(str) + "|" + tracks["album_image_url"].fillna("").astype(str)
+    album_codes, _ = pd.factorize(album_ids.where(album_ids.notna() & (album_ids != ""), fallback))
+    album_frame = pd.DataFrame({target: tracks[source] if source in tracks else None
+                                for source, target in ALBUM_COLUMNS.items()})
+    albums = album_frame.groupby(album_codes, sort=True).first()
+
+    offsets = np.searchsorted(owners, np.arange(len(tracks) + 1))
+    normalized = tracks.drop(columns=[c for c in DENORMALIZED_COLUMNS if c in tracks])
+    normalized["album_key"] = album_codes.astype(np.int32)
+    return CatalogTables(normalized, artists.reset_index(drop=True), albums.reset_index(drop=True),
+                         offsets, artist_codes.astype(np.int32))
+
+
+class CatalogTables:
+    """Tracks referencing artist and album tables by position.
+
+    artist_keys[artist_offsets[t]:artist_offsets[t + 1]] are the artists of
+    track t in credit order; tracks.album_key is a row of albums. Artist
+    filters resolve names against the (small) artists table once and are
+    then integer set operations over the keys.
+    """
+
+    def __init__(self, tracks, artists, albums, artist_offsets, artist_keys):
+        self.tracks = tracks
+        self.artists = artists
+        self.albums = albums
+        self.artist_offsets = artist_offsets
+        self.artist_keys = artist_keys
+        credits = np.diff(artist_offsets)
+        self.artist_owners = np.repeat(np.arange(len(tracks)), credits)
+        self._single_artist = credits == 1
+        self._no_artist = credits == 0
+        self._artist_name_column = None
+        self._tracks_by_artist = None
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def matches(self, spotify_ids):
+        """True if the tables describe exactly these tracks, in this order"""
+        return len(spotify_ids) == len(self) and list(self.tracks["spotify_id"].astype(str)) == list(spotify_ids)
+
+    def track_artists(self, track):
+        return self.artist_keys[self.artist_offsets[track]:self.artist_offsets[track + 1]]
+
+    def _artist_names(self):
+        from recommender import TextColumn
+        if self._artist_name_column is None:
+            self._artist_name_column = TextColumn(pa.array(self.artists["name"], type=pa.string()))
+        return self._artist_name_column
+
+    def artists_named(self, names):
+        """Keys of artists whose name contains, or is contained in, one of the names"""
+        column = self._artist_names()
+        hit = np.zeros(len(column.dictionary), dtype=bool)
+        for name in names:
+            hit |= column.contains(name.lower()) | column.contained_in(name.lower())
+        return np.flatnonzero(column.rows(hit))
+
+    def _tracks_crediting(self, artist_mask):
+        """Mask of tracks crediting any artist set in a per-artist boolean mask.
+
+        Goes through the artist -> tracks inverse of artist_keys, so the cost
+        follows the matched artists' tracks rather than the whole catalog.
+        """
+        if self._tracks_by_artist is None:
+            order = np.argsort(self.artist_keys, kind='stable')
+            bounds = np.searchsorted(self.artist_keys[order], np.arange(len(self.artists) + 1))
+            self._tracks_by_artist = (self.artist_owners[order].astype(np.int32), bounds)
+        owners, bounds = self._tracks_by_artist
+        keys = np.flatnonzero(artist_mask)
+        starts, lengths = bounds[keys], bounds[keys + 1] - bounds[keys]
+        # Positions of the concatenated [start, end) ranges of the matched artists
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[owners[positions]] = True
+        return mask
+
+    def tracks_by_artists(self, keys):
+        """Mask of tracks crediting any of the artist keys"""
+        artist_mask = np.zeros(len(self.artists), dtype=bool)
+        artist_mask[keys] = True
+        return self._tracks_crediting(artist_mask)
+
+    def favorite_artist_tracks(self, names):
+        """Mask of tracks the API's exclude-favorite-artists removes, from the artist keys.
+
+        The API tests the lowercased, '; '-joined artists string: a name
+        inside it, or all of it inside a name. Names have no spaces, so the
+        second can only hold for tracks with one artist or none.
+        """
+        column = self._artist_names()
+        contains = np.zeros(len(column.dictionary), dtype=bool)
+        contained = np.zeros(len(column.dictionary), dtype=bool)
+        for name in names:
+            contains |= column.contains(name.lower())
+            contained |= column.contained_in(name.lower())
+        mask = self._tracks_crediting(column.rows(contains))
+        mask |= self._single_artist & self._tracks_crediting(column.rows(contained))
+        return mask | self._no_artist
+
+    def denormalize(self):
+        """The flat track frame again, with '; '-joined artists and artist_ids and the album columns"""
+        frame = self.tracks.drop(columns=["album_key"]).copy()
+        names = self.artists["name"].to_numpy(dtype=object)
+        ids = self.artists["artist_id"].fillna("").to_numpy(dtype=object)
+        bounds = list(zip(self.artist_offsets[:-1], self.artist_offsets[1:]))
+        frame["artists"] = ["; ".join(names[self.artist_keys[s:e]]) for s, e in bounds]
+        frame["artist_ids"] = ["; ".join(ids[self.artist_keys[s:e]]) for s, e in bounds]
+        albums = self.albums.iloc[self.tracks["album_key"].to_numpy()].reset_index(drop=True)
+        for source, target in ALBUM_COLUMNS.items():
+            frame[source] = albums[target].to_numpy()
+        return frame
+
+    def save(self, directory=CATALOG_DIR):
+        os.makedirs(directory, exist_ok=True)
+        tracks = self.tracks.copy()
+        tracks["artist_keys"] = [self.artist_keys[s:e].tolist()
+                                 for s, e in zip(self.artist_offsets[:-1], self.artist_offsets[1:])]
+        for name, frame in (("tracks", tracks), ("artists", self.artists), ("albums", self.albums)):
+            # Column names once per table instead of once per row
+            frame.to_json(os.path.join(directory, TABLE_FILES[name]), orient="split", index=False, force_ascii=False)
+
+    @classmethod
+    def load(cls, directory=CATALOG_DIR):
+        frames = {name: pd.read_json(os.path.join(directory, file), orient="split", dtype=False)
+                  for name, file in TABLE_FILES.items()}
+        tracks = frames["tracks"]
+        lengths = tracks["artist_keys"].map(len).to_numpy()
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        keys = np.fromiter((k for keys in tracks["artist_keys"] for k in keys), dtype=np.int32, count=offsets[-1])
+        return cls(tracks.drop(columns=["artist_keys"]), frames["artists"], frames["albums"], offsets, keys)
+
+    def file_sizes(self, directory=CATALOG_DIR):
+        return {name: os.path.getsize(os.path.join(directory, file)) for name, file in TABLE_FILES.items()}
+
+
+def main():
+    """Normalize a track file and compare artifact size and artist-filter speed with the flat rows"""
+    parser = argparse.ArgumentParser(description="Normalize tracks into artist and album tables")
+    parser.add_argument("--tracks", help="Track CSV or JSON (default: the API's database)")
+    parser.add_argument("--output", help="Write the tables here instead of only measuring them")
+    parser.add_argument("--queries", type=int, default=50, help="Favorite-artist exclusions to time")
+    parser.add_argument("--size", type=int, help="Scale the track file up to this many tracks")
+    args = parser.parse_args()
+
+    from recommender import Recommender, load_tracks_table, synthetic_table
+    table = load_tracks_table(args.tracks)
+    if args.size:
+        table = synthetic_table(table, args.size)
+    frame = table.to_pandas()
+    with Stopwatch() as sw:
+        tables = normalize_catalog(frame)
+    print(f"📊 {len(tables)} tracks -> {len(tables.artists)} artists, {len(tables.albums)} albums "
+          f"in {sw.elapsed_ms:.0f}ms")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.output or scratch
+        tables.save(directory)
+        sizes = tables.file_sizes(directory)
+        flat = {}
+        for orient in ("records", "split"):
+            path = os.path.join(scratch, f"flat_{orient}.json")
+            frame.to_json(path, orient=orient, index=False, force_ascii=False)
+            flat[orient] = os.path.getsize(path)
+    print(f"flat JSON {flat['records'] / 1e6:.2f} MB as records, {flat['split'] / 1e6:.2f} MB as columns + rows; "
+          f"normalized {sum(sizes.values()) / 1e6:.2f} MB "
+          + " ".join(f"({name} {size / 1e6:.2f} MB)" for name, size in sizes.items()))
+
+    rng = np.random.default_rng(0)
+    artists = frame["artists"].dropna().to_numpy()
+    requests = [str(artists[i]).split(";")[0].strip().split(" ")[0].lower()
+                for i in rng.integers(0, len(artists), args.queries)]
+    flat, keyed = Recommender(table), Recommender(table, catalog=tables)
+    timings = {"substring over track rows": [], "artist keys": []}
+    for name in requests:
+        with Stopwatch() as sw:
+            flat_mask = flat.excluded(name, "", exclude_favorite_artists=True)
+        timings["substring over track rows"].append(sw.elapsed_ms)
+        with Stopwatch() as sw:
+            keyed_mask = keyed.excluded(name, "", exclude_favorite_artists=True)
+        timings["artist keys"].append(sw.elapsed_ms)
+        assert (keyed_mask == flat_mask).all(), name
+    for label, samples in timings.items():
+        print(format_summary(label, summarize(samples)))
+    if args.output:
+        print(f"Tables written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
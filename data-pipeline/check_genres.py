@@ -1,22 +1,10 @@
-import weaviate
-import os
-from dotenv import load_dotenv
-from collections import Counter
-
-# Load environment variables
-load_dotenv('../.env.local')
-
-# Weaviate configuration
-WEAVIATE_CLUSTER_URL = os.getenv('WEAVIATE_CLUSTER_URL')
-WEAVIATE_API_KEY = os.getenv('WEAVIATE_API_KEY')
+from weaviate_client import connect
+from collection_scan import genre_counts
+from track_search import track_filters, is_typed_collection
 
 def create_weaviate_client():
     """Create and return a Weaviate client"""
-    client = weaviate.connect_to_weaviate_cloud(
-        cluster_url=WEAVIATE_CLUSTER_URL,
-        auth_credentials=weaviate.auth.AuthApiKey(api_key=WEAVIATE_API_KEY)
-    )
-    return client
+    return connect("cloud")
 
 def check_genres():
     """Check what genres are in the database"""
@@ -27,47 +15,11 @@ def check_genres():
         track_collection = client.collections.get("Track")
         print("✅ Found Track collection")
         
-        # Get a larger sample to see genre distribution
-        print("\n🔍 Getting a larger sample to check genres...")
-        
-        all_genres = []
-        pop_tracks = []
-        total_tracks = 0
+        # Count genres over the whole collection in one aggregate call
+        print("\n🔍 Aggregating genres over the whole collection...")
         
-        # Get tracks in batches to see genre distribution
-        for offset in range(0, 1000, 100):  # Check first 1000 tracks
-            try:
-                result = track_collection.query.fetch_objects(limit=100, offset=offset)
-                objects = result.objects
-                
-                if not objects:
-                    break
-                
-                total_tracks += len(objects)
-                
-                for obj in objects:
-                    genres = obj.properties.get('genres', '').strip()
-                    if genres:
-                        # Split genres by semicolon
-                        genre_list = [g.strip().lower() for g in genres.split(';') if g.strip()]
-                        all_genres.extend(genre_list)
-                        
-                        # Check for pop-related genres
-                        if any('pop' in g for g in genre_list):
-                            pop_tracks.append({
-                                'name': obj.properties.get('name', 'N/A'),
-                                'artists': obj.properties.get('artists', 'N/A'),
-                                'genres': genres
-                            })
-                
-                print(f"Processed {total_tracks} tracks so far...")
-                
-            except Exception as e:
-                print(f"Error at offset {offset}: {e}")
-                break
-        
-        # Analyze genres
-        genre_counter = Counter(all_genres)
+        total_tracks = track_collection.aggregate.over_all(total_count=True).total_count
+        genre_counter = genre_counts(track_collection)
         
         print(f"\n📊 Genre Analysis (from {total_tracks} tracks):")
         print(f"Total unique genres found: {len(genre_counter)}")
@@ -76,12 +28,20 @@ def check_genres():
         for genre, count in genre_counter.most_common(20):
             print(f"  {genre}: {count} tracks")
         
-        print(f"\n🔍 Pop-related tracks found: {len(pop_tracks)}")
+        # Let Weaviate filter the pop tracks instead of scanning for them
+        pop_tracks = track_collection.query.fetch_objects(
+            filters=track_filters(genres=["pop"], typed=is_typed_collection(track_collection)),
+            limit=10,
+            return_properties=["name", "artists", "genres"],
+        ).objects
+        pop_total = sum(count for genre, count in genre_counter.items() if 'pop' in genre)
+        
+        print(f"\n🔍 Pop-related genre tags found: {pop_total}")
         if pop_tracks:
             print("\nSample pop tracks:")
-            for i, track in enumerate(pop_tracks[:10]):
-                print(f"  {i+1}. {track['name']} by {track['artists']}")
-                print(f"     Genres: {track['genres']}")
+            for i, track in enumerate(pop_tracks):
+                print(f"  {i+1}. {track.properties.get('name', 'N/A')} by {track.properties.get('artists', 'N/A')}")
+                print(f"     Genres: {track.properties.get('genres', 'N/A')}")
                 print()
         
         # Check for common pop variations
@@ -1,30 +1,18 @@
 import os
+import argparse
 import pandas as pd
+import pyarrow as pa
 import weaviate
-from dotenv import load_dotenv
+from weaviate_client import connect
 import glob
-
-load_dotenv()
+from ingestion import IngestionCheckpoint, ingest_rows
+from index_profiles import vector_index_config, add_index_profile_argument
+from compact_frames import read_export, concat_exports, published_frame, peak_rss_mb
+from track_record import TrackColumns
 
 def create_weaviate_client():
     """Create and return a Weaviate client"""
-    weaviate_url = os.getenv('WEAVIATE_CLUSTER_URL')
-    weaviate_api_key = os.getenv('WEAVIATE_API_KEY')
-    
-    if not weaviate_url or not weaviate_api_key:
-        raise ValueError("WEAVIATE_CLUSTER_URL and WEAVIATE_API_KEY must be set in environment variables")
-    
-    # Remove https:// if present
-    weaviate_url = weaviate_url.replace("https://", "")
-    
-    return weaviate.Client(
-        url=f"https://{weaviate_url}",
-        auth_client_secret=weaviate.Auth.api_key(weaviate_api_key),
-        additional_headers={
-            "X-OpenAI-Api-Key": os.getenv('OPENAI_API_KEY') if os.getenv('OPENAI_API_KEY') else "",
-            "X-Cohere-Api-Key": os.getenv('COHERE_API_KEY') if os.getenv('COHERE_API_KEY') else ""
-        }
-    )
+    return connect("cloud")
 
 def get_all_export_files():
     """Get all CSV files from the exports directory"""
@@ -36,9 +24,16 @@ def get_all_export_files():
     
     return sorted(csv_files)
 
-def combine_csv_files():
-    """Combine all CSV files and remove duplicates"""
-    csv_files = get_all_export_files()
+COMBINED_DATASET_PATH = os.path.join(os.path.dirname(__file__), 'combined_tracks_dataset.csv')
+
+def combine_csv_files(csv_files=None, memory_optimized=False):
+    """Combine all CSV files and remove duplicates.
+
+    With memory_optimized, repeated text columns are categoricals and
+    counters narrow ints (see compact_frames); deduplication and sorting
+    run on those directly.
+    """
+    csv_files = csv_files or get_all_export_files()
     
     print(f"Found {len(csv_files)} CSV files to combine:")
     for file in csv_files:
@@ -52,7 +47,7 @@ def combine_csv_files():
         print(f"\nProcessing file {i}/{len(csv_files)}: {os.path.basename(csv_file)}")
         
         try:
-            df = pd.read_csv(csv_file)
+            df = read_export(csv_file, memory_optimized)
             print(f"  - Found {len(df)} tracks")
             total_tracks_before_dedup += len(df)
             all_dataframes.append(df)
@@ -65,7 +60,8 @@ def combine_csv_files():
     
     # Combine all dataframes
     print(f"\nCombining {len(all_dataframes)} dataframes...")
-    combined_df = pd.concat(all_dataframes, ignore_index=True)
+    combined_df = concat_exports(all_dataframes, memory_optimized)
+    del all_dataframes
     print(f"Combined dataset has {len(combined_df)} tracks")
     
     # Remove duplicates based on spotify_id (most reliable identifier)
@@ -90,14 +86,15 @@ def combine_csv_files():
     
     # Sort by popularity (descending) to prioritize popular tracks
     print("Sorting by popularity...")
-    combined_df = combined_df.sort_values('popularity', ascending=False)
+    combined_df = combined_df.sort_values('popularity', ascending=False, kind='stable')
     
     # Reset index
     combined_df = combined_df.reset_index(drop=True)
+    print(f"Peak memory: {peak_rss_mb():.0f} MB")
     
     return combined_df
 
-def create_track_collection(client):
+def create_track_collection(client, index_profile=None):
     """Create the Track collection if it doesn't exist"""
     try:
         # Check if collection already exists
@@ -123,88 +120,83 @@ def create_track_collection(client):
                 weaviate.classes.config.Property(name="release_date", data_type=weaviate.classes.config.DataType.TEXT),
                 weaviate.classes.config.Property(name="preview_url", data_type=weaviate.classes.config.DataType.TEXT),
                 weaviate.classes.config.Property(name="track_url", data_type=weaviate.classes.config.DataType.TEXT),
-                weaviate.classes.config.Property(name="explicit", data_type=weaviate.classes.config.DataType.BOOLEAN),
+                weaviate.classes.config.Property(name="explicit", data_type=weaviate.classes.config.DataType.BOOL),
                 weaviate.classes.config.Property(name="album_image_url", data_type=weaviate.classes.config.DataType.TEXT)
             ],
-            vectorizer_config=weaviate.classes.config.Configure.Vectorizer.text2vec_openai() if os.getenv('OPENAI_API_KEY') else None
+            vectorizer_config=weaviate.classes.config.Configure.Vectorizer.text2vec_openai() if os.getenv('OPENAI_API_KEY') else None,
+            vector_index_config=vector_index_config(index_profile)
         )
         print("Track collection created successfully!")
         
     except Exception as e:
         print(f"Error creating Track collection: {e}")
 
-def populate_tracks_from_dataframe(client, df):
+def populate_tracks_from_dataframe(client, df, resume=False, index_profile=None):
     """Populate the Track collection with data from a DataFrame"""
     try:
         print(f"Preparing to insert {len(df)} tracks...")
         
+        # Save the combined dataset first so the checkpoint can refer to it
+        if not resume:
+            published_frame(df).to_csv(COMBINED_DATASET_PATH, index=False)
+            print(f"Combined dataset saved to: {COMBINED_DATASET_PATH}")
+        
+        # Clear existing data unless we are resuming an interrupted load
+        if not resume and client.collections.exists("Track"):
+            print("Clearing existing tracks...")
+            client.collections.delete("Track")
+        
         # Check if Track collection exists, if not create it
-        collections = client.collections.list_all()
-        if not any(col.name == "Track" for col in collections):
+        if not client.collections.exists("Track"):
             print("Track collection doesn't exist. Creating it...")
-            create_track_collection(client)
+            create_track_collection(client, index_profile=index_profile)
         
         # Get the Track collection
         track_collection = client.collections.get("Track")
         
-        # Clear existing data
-        print("Clearing existing tracks...")
-        track_collection.delete_many()
-        
-        # Convert DataFrame to list of dictionaries
-        tracks = []
-        for _, row in df.iterrows():
-            track = {
-                "spotify_id": str(row['spotify_id']),
-                "name": str(row['name']),
-                "artists": str(row['artists']),
-                "album": str(row['album']),
-                "genres": str(row['genres']) if pd.notna(row['genres']) else "",
-                "popularity": int(row['popularity']) if pd.notna(row['popularity']) else 0,
-                "duration_ms": int(row['duration_ms']) if pd.notna(row['duration_ms']) else 0,
-                "release_date": str(row['release_date']) if pd.notna(row['release_date']) else "",
-                "preview_url": str(row['preview_url']) if pd.notna(row['preview_url']) else "",
-                "track_url": str(row['track_url']),
-                "explicit": bool(row['explicit']) if pd.notna(row['explicit']) else False,
-                "album_image_url": str(row['album_image_url']) if pd.notna(row['album_image_url']) else ""
-            }
-            tracks.append(track)
-        
-        # Batch insert tracks
-        batch_size = 100
-        total_batches = (len(tracks) + batch_size - 1) // batch_size
-        
-        print(f"Inserting {len(tracks)} tracks in {total_batches} batches...")
-        
-        for i in range(0, len(tracks), batch_size):
-            batch = tracks[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            
-            with track_collection.batch.dynamic() as batch_client:
-                for track in batch:
-                    batch_client.add_object(
-                        properties=track
-                    )
-            
-            print(f"Inserted batch {batch_num}/{total_batches} (tracks {i+1} to {min(i+batch_size, len(tracks))})")
+        # Convert DataFrame to property dicts through the columnar track records
+        tracks = TrackColumns.from_arrow(pa.Table.from_pandas(df, preserve_index=False)).legacy_properties()
         
-        print(f"Successfully populated {len(tracks)} tracks!")
+        # Batch insert tracks, checkpointing after every committed chunk
+        print(f"Inserting {len(tracks)} tracks...")
+        checkpoint = IngestionCheckpoint("Track", COMBINED_DATASET_PATH)
+        inserted, failed = ingest_rows(track_collection, tracks, checkpoint, uuid_key="spotify_id", resume=resume)
         
-        # Save the combined dataset to a new CSV file for future reference
-        output_file = os.path.join(os.path.dirname(__file__), 'combined_tracks_dataset.csv')
-        df.to_csv(output_file, index=False)
-        print(f"Combined dataset saved to: {output_file}")
+        print(f"Successfully populated {inserted} tracks!")
+        if failed:
+            print(f"{failed} tracks failed, see {checkpoint.dead_letter_path}")
         
     except Exception as e:
         print(f"Error populating tracks: {e}")
+        print("Re-run with --resume to continue from the last checkpoint.")
 
 def main():
     """Main function to combine all exports and populate database"""
+    parser = argparse.ArgumentParser(description="Combine all exports and populate the Track collection")
+    parser.add_argument("--resume", action="store_true", help="Continue the last interrupted load of the combined dataset")
+    parser.add_argument("--memory-optimized", action="store_true",
+                        help="Combine with categorical text and narrow int columns")
+    add_index_profile_argument(parser)
+    args = parser.parse_args()
+    
+    if args.resume:
+        if not os.path.exists(COMBINED_DATASET_PATH):
+            print("No combined dataset found to resume from!")
+            return
+        
+        print(f"Resuming load of {COMBINED_DATASET_PATH}")
+        client = create_weaviate_client()
+        try:
+            populate_tracks_from_dataframe(client, pd.read_csv(COMBINED_DATASET_PATH), resume=True, index_profile=args.index_profile)
+        finally:
+            client.close()
+        return
+    
     try:
         print("=== Combining All Export Files ===")
         
         # Combine all CSV files
-        combined_df = combine_csv_files()
+        combined_df = combine_csv_files(memory_optimized=args.memory_optimized)
         
         # Show some statistics
         print(f"\n=== Dataset Statistics ===")
@@ -227,7 +219,7 @@ def main():
             
             try:
                 print("Populating database with combined dataset...")
-                populate_tracks_from_dataframe(client, combined_df)
+                populate_tracks_from_dataframe(client, combined_df, index_profile=args.index_profile)
                 print("\n=== SUCCESS ===")
                 print(f"Your database now contains {len(combined_df)} unique tracks!")
                 print("You can now restart your Next.js app to see the expanded dataset.")
@@ -0,0 +1,172 @@
+import os
+import sys
+import json
+import argparse
+import resource
+import subprocess
+import tempfile
+import numpy as np
+import pandas as pd
+from timing import Stopwatch
+
+# Columns whose values repeat across many tracks; categoricals store each once
+CATEGORY_COLUMNS = ["genres", "artists", "artist_ids", "album", "album_id", "release_date", "album_image_url"]
+INTEGER_COLUMNS = {"popularity": "int8", "duration_ms": "int32"}
+# Added for in-memory use only; the written artifacts keep the export columns
+DERIVED_COLUMNS = ["release_year"]
+
+
+def read_export(csv_file, memory_optimized=False):
+    """One export CSV, with repeated text as categoricals when memory_optimized"""
+    if not memory_optimized:
+        return pd.read_csv(csv_file)
+    header = pd.read_csv(csv_file, nrows=0).columns
+    return pd.read_csv(csv_file, dtype={c: "category" for c in CATEGORY_COLUMNS if c in header})
+
+
+def concat_exports(frames, memory_optimized=False):
+    """Concatenate export frames; categoricals share one set of categories so they stay categorical"""
+    if memory_optimized:
+        for column in CATEGORY_COLUMNS:
+            present = [df[column].cat.categories for df in frames if column in df]
+            if not present:
+                continue
+            categories = pd.Index(np.unique(np.concatenate([c.to_numpy(dtype=object) for c in present])))
+            for df in frames:
+                if column in df:
+                    df[column] = df[column].cat.set_categories(categories)
+                else:
+                    df[column] = pd.Categorical([None] * len(df), categories=categories)
+    combined = pd.concat(frames, ignore_index=True)
+    return compact_frame(combined) if memory_optimized else combined
+
+
+def compact_frame(df):
+    """Downcast counters, make explicit a bool and add release_year parsed from release_date.
+
+    Missing popularity and duration count as 0, like the Weaviate loaders
+    already treat them. release_year is parsed once per distinct date and
+    dropped again (published_frame) before anything is written.
+    """
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0).astype(dtype)
+    if "explicit" in df and df["explicit"].dtype != bool:
+        df["explicit"] = df["explicit"].astype(str).str.strip().str.lower().eq("true")
+    if "release_date" in df:
+        dates = df["release_date"].astype("category")
+        years = pd.to_numeric(pd.Series(dates.cat.categories.astype(str).str[:4]), errors="coerce").astype("Int16")
+        df["release_year"] = years.array.take(dates.cat.codes.to_numpy(), allow_fill=True)
+    return df
+
+
+def published_frame(df):
+    """df without the derived in-memory columns, so artifacts look the same in both modes"""
+    return df.drop(columns=[c for c in DERIVED_COLUMNS if c in df])
+
+
+def write_json_records(df, json_file, chunk_size=20000):
+    """Write df as the same indented JSON list json.dump would, converting chunk_size rows at a time"""
+    with open(json_file, 'w', encoding='utf-8') as f:
+        f.write("[")
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size].astype(object)
+            records = chunk.where(chunk.notna(), None).to_dict("records")
+            text = ",\n".join(json.dumps(r, ensure_ascii=False, indent=2) for r in records)
+            f.write(("," if start else "") + "\n" + "\n".join("  " + line for line in text.split("\n")))
+        f.write("\n]" if len(df) else "]")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def write_benchmark_exports(directory, rows, files, duplicate_share=0.1, tracks=None):
+    """Export-shaped CSVs with `rows` tracks in total, a share of them repeated across files"""
+    from recommender import load_tracks_table, synthetic_table
+    unique = int(rows * (1 - duplicate_share))
+    frame = synthetic_table(load_tracks_table(tracks), unique).to_pandas()
+    repeats = frame.sample(rows - unique, random_state=0)
+    frame = pd.concat([frame, repeats]).sample(frac=1.0, random_state=1)
+    paths = []
+    for i, part in enumerate(np.array_split(np.arange(len(frame)), files)):
+        path = os.path.join(directory, f"tracks_{i:03d}.csv")
+        frame.iloc[part].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def _run_stage(stage, directory, memory_optimized):
+    """Run one stage in this process; its timing, peak RSS and output order"""
+    import glob
+    from combine_all_exports import combine_csv_files
+    from create_fast_csv_database import create_optimized_dataset
+    csv_files = sorted(glob.glob(os.path.join(directory, "tracks_*.csv")))
+    baseline = peak_rss_mb()
+    with Stopwatch() as sw:
+        if stage == "combine":
+            df = combine_csv_files(csv_files, memory_optimized=memory_optimized)
+        else:
+            output = os.path.join(directory, "optimized")
+            df = create_optimized_dataset(csv_files, memory_optimized=memory_optimized, output_dir=output)
+    return {
+        "rows": len(df), "seconds": sw.elapsed_ms / 1000, "baseline_mb": baseline, "peak_mb": peak_rss_mb(),
+        "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+        "top": df["spotify_id"].head(1000).tolist(), "popularity": df["popularity"].astype(int).tolist(),
+    }
+
+
+def main():
+    """Peak RSS of the combine and optimize stages on a 500k-row merge, default vs memory-optimized dtypes"""
+    parser = argparse.ArgumentParser(description="Memory of the export merge stages with default and compact dtypes")
+    parser.add_argument("--tracks", help="Track file the synthetic exports are scaled from (default: the API's database)")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--stages", nargs="+", default=["combine", "optimize"], choices=["combine", "optimize"])
+    parser.add_argument("--write-exports", help=argparse.SUPPRESS)
+    parser.add_argument("--run-stage", choices=["combine", "optimize"], help=argparse.SUPPRESS)
+    parser.add_argument("--exports", help=argparse.SUPPRESS)
+    parser.add_argument("--memory-optimized", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.write_exports:
+        write_benchmark_exports(args.write_exports, args.rows, args.files, tracks=args.tracks)
+        return
+    if args.run_stage:
+        # Stage output goes to stderr so stdout holds only the measurement
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        try:
+            result = _run_stage(args.run_stage, args.exports, args.memory_optimized)
+        finally:
+            sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    script = os.path.abspath(__file__)
+    with tempfile.TemporaryDirectory() as directory:
+        # Children start from this process's peak RSS, so the exports are written by another one
+        command = [sys.executable, script, "--write-exports", directory, "--rows", str(args.rows), "--files", str(args.files)]
+        subprocess.run(command + (["--tracks", args.tracks] if args.tracks else []), check=True)
+        print(f"📊 {args.rows} rows in {args.files} export files")
+        for stage in args.stages:
+            results = {}
+            for memory_optimized in (False, True):
+                # A fresh process per run, since ru_maxrss only ever grows
+                command = [sys.executable, script, "--run-stage", stage, "--exports", directory]
+                if memory_optimized:
+                    command.append("--memory-optimized")
+                done = subprocess.run(command, capture_output=True, text=True, check=True)
+                results[memory_optimized] = json.loads(done.stdout.strip().splitlines()[-1])
+            default, compact = results[False], results[True]
+            same = default["top"] == compact["top"] and default["popularity"] == compact["popularity"]
+            print(f"{stage}: {default['rows']} tracks out, same order: {same}")
+            for label, result in (("default", default), ("memory-optimized", compact)):
+                print(f"  {label:<17} peak RSS {result['peak_mb']:>6.0f} MB "
+                      f"(+{result['peak_mb'] - result['baseline_mb']:.0f} MB over imports), "
+                      f"frame {result['frame_mb']:.0f} MB, {result['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@ import os
 import pandas as pd
 import glob
 import json
+import argparse
+from catalog_tables import normalize_catalog
+from compact_frames import read_export, concat_exports, published_frame, write_json_records, peak_rss_mb
 
 def get_all_export_files():
     """Get all CSV files from the exports directory"""
@@ -13,9 +16,13 @@ def get_all_export_files():
     
     return sorted(csv_files)
 
-def create_optimized_dataset():
-    """Create an optimized dataset with the best tracks"""
-    csv_files = get_all_export_files()
+def create_optimized_dataset(csv_files=None, memory_optimized=False, output_dir=os.path.dirname(__file__)):
+    """Create an optimized dataset with the best tracks.
+
+    memory_optimized keeps repeated text as categoricals and counters as
+    narrow ints while merging (see compact_frames).
+    """
+    csv_files = csv_files or get_all_export_files()
     
     print(f"Found {len(csv_files)} CSV files to combine:")
     for file in csv_files:
@@ -29,7 +36,7 @@ def create_optimized_dataset():
         print(f"\nProcessing file {i}/{len(csv_files)}: {os.path.basename(csv_file)}")
         
         try:
-            df = pd.read_csv(csv_file)
+            df = read_export(csv_file, memory_optimized)
             print(f"  - Found {len(df)} tracks")
             total_tracks_before_dedup += len(df)
             all_dataframes.append(df)
@@ -42,7 +49,8 @@ def create_optimized_dataset():
     
     # Combine all dataframes
     print(f"\nCombining {len(all_dataframes)} dataframes...")
-    combined_df = pd.concat(all_dataframes, ignore_index=True)
+    combined_df = concat_exports(all_dataframes, memory_optimized)
+    del all_dataframes
     print(f"Combined dataset has {len(combined_df)} tracks")
     
     # Remove duplicates
@@ -64,38 +72,51 @@ def create_optimized_dataset():
     print(f"Quality filter: {len(quality_df)} tracks (popularity > 20, has genres)")
     
     # Sort by popularity
-    quality_df = quality_df.sort_values('popularity', ascending=False)
+    quality_df = quality_df.sort_values('popularity', ascending=False, kind='stable')
     
-    # Use all quality tracks (no limit)
-    final_df = quality_df.copy()
+    # Use all quality tracks (no limit), with the export columns only
+    final_df = published_frame(quality_df)
     
     print(f"Final dataset: {len(final_df)} tracks")
     
     # Save optimized CSV
-    output_file = os.path.join(os.path.dirname(__file__), 'optimized_tracks.csv')
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, 'optimized_tracks.csv')
     final_df.to_csv(output_file, index=False)
     print(f"Saved optimized dataset to: {output_file}")
     
     # Also create a JSON file for even faster access
-    json_file = os.path.join(os.path.dirname(__file__), 'tracks_database.json')
-    
-    # Convert to list and handle NaN values
-    tracks_list = []
-    for _, row in final_df.iterrows():
-        track_dict = {}
-        for column, value in row.items():
-            if pd.isna(value):
-                track_dict[column] = None
-            elif isinstance(value, (int, float)) and pd.isna(value):
-                track_dict[column] = None
-            else:
-                track_dict[column] = value
-        tracks_list.append(track_dict)
-    
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(tracks_list, f, ensure_ascii=False, indent=2)
-    
+    json_file = os.path.join(output_dir, 'tracks_database.json')
+    
+    if memory_optimized:
+        # Streamed in chunks instead of holding a dict per track
+        write_json_records(final_df, json_file)
+    else:
+        # Convert to list and handle NaN values
+        tracks_list = []
+        for _, row in final_df.iterrows():
+            track_dict = {}
+            for column, value in row.items():
+                if pd.isna(value):
+                    track_dict[column] = None
+                elif isinstance(value, (int, float)) and pd.isna(value):
+                    track_dict[column] = None
+                else:
+                    track_dict[column] = value
+            tracks_list.append(track_dict)
+        
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(tracks_list, f, ensure_ascii=False, indent=2)
+
     print(f"Saved JSON database to: {json_file}")
+
+    # Artists and albums as their own tables, referenced by integer keys
+    catalog_dir = os.path.join(output_dir, 'catalog')
+    catalog = normalize_catalog(final_df)
+    catalog.save(catalog_dir)
+    catalog_size = sum(catalog.file_sizes(catalog_dir).values())
+    print(f"Saved normalized catalog ({len(catalog.artists)} artists, {len(catalog.albums)} albums, "
+          f"{catalog_size / 1e6:.1f} MB) to: {catalog_dir}")
     
     # Show statistics
     print(f"\n=== Final Dataset Statistics ===")
@@ -108,20 +129,27 @@ def create_optimized_dataset():
     genre_counts = final_df['genres'].value_counts().head(10)
     for genre, count in genre_counts.items():
         print(f"  {genre}: {count} tracks")
+    print(f"Peak memory: {peak_rss_mb():.0f} MB")
     
     return final_df
 
 def main():
     """Create optimized dataset"""
+    parser = argparse.ArgumentParser(description="Merge all exports into the optimized track dataset")
+    parser.add_argument("--memory-optimized", action="store_true",
+                        help="Merge with categorical text and narrow int columns")
+    args = parser.parse_args()
+
     try:
         print("=== Creating Optimized Track Dataset ===")
-        final_df = create_optimized_dataset()
+        final_df = create_optimized_dataset(memory_optimized=args.memory_optimized)
         
         print(f"\n=== SUCCESS ===")
         print(f"Created optimized dataset with {len(final_df)} high-quality tracks!")
         print("Files created:")
         print("  - optimized_tracks.csv (for CSV access)")
         print("  - tracks_database.json (for fast JSON access)")
+        print("  - catalog/ (tracks, artists and albums tables)")
         print("\nYou can now use these files directly in your app for much faster performance!")
         
     except Exception as e:
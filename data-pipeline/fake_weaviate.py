@@ -0,0 +1,929 @@
+import os
+import re
+import math
+import time
+import uuid as uuid_lib
+import random
+import asyncio
+import bisect
+import fnmatch
+import hashlib
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from functools import lru_cache
+import numpy as np
+from weaviate.util import generate_uuid5
+from weaviate.collections.classes.filters import _FilterAnd, _FilterOr, _FilterValue, _Operator
+from weaviate.collections.classes.internal import Object, MetadataReturn, QueryReturn, GenerativeObject, GenerativeReturn
+from weaviate.collections.classes.aggregate import AggregateReturn, AggregateGroupByReturn, AggregateGroup, GroupedBy
+from weaviate.collections.classes.batch import ErrorObject, _BatchObject
+
+FAKE_DIMENSIONS = 256
+DEFAULT_LIMIT = 10
+HYBRID_ALPHA = 0.7
+HYBRID_CANDIDATES = 100
+BATCH_SIZE = 100
+LATENCY_OPERATIONS = ["query", "insert", "batch", "aggregate", "generate", "schema"]
+
+# Weaviate 1.x dict schemas still use the pre-v4 data type names
+LEGACY_DATA_TYPES = {"string": "text", "string[]": "text[]"}
+
+VALUE_CHECKS = {
+    "text": lambda v: isinstance(v, str),
+    "text[]": lambda v: isinstance(v, list) and all(isinstance(x, str) for x in v),
+    "int": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "int[]": lambda v: isinstance(v, list) and all(isinstance(x, int) and not isinstance(x, bool) for x in v),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "date": lambda v: isinstance(v, str),
+}
+
+_TOKEN = re.compile(r"\w+")
+# like() patterns keep their wildcards when tokenized
+_PATTERN_TOKEN = re.compile(r"[\w*?]+")
+# Text properties are word-tokenized unless the schema says otherwise
+DEFAULT_TOKENIZATION = "word"
+
+
+class FakeWeaviateError(Exception):
+    """Raised where a real server would answer with an error status"""
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+@lru_cache(maxsize=65536)
+def _token_vector(token, dimensions):
+    seed = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+    return np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+
+
+def fake_embedding(text, dimensions=FAKE_DIMENSIONS):
+    """Deterministic bag-of-words embedding: the normalized sum of one pseudo-random vector per token.
+
+    The same text always gets the same vector, in every process, and texts
+    sharing words end up close to each other, so near_text rankings are
+    stable and still loosely meaningful.
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token in tokenize(text):
+        vector += _token_vector(token, dimensions)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def parse_latency(spec):
+    """Per-operation latency in ms from a number, a dict or a string like '5' or 'query=5,batch=20'"""
+    if not spec:
+        return {}
+    if isinstance(spec, dict):
+        return {op: float(ms) for op, ms in spec.items()}
+    if isinstance(spec, (int, float)):
+        return {op: float(spec) for op in LATENCY_OPERATIONS}
+    if "=" not in spec:
+        return parse_latency(float(spec))
+    latency = {}
+    for part in spec.split(","):
+        op, ms = part.split("=")
+        latency[op.strip()] = float(ms)
+    return latency
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value)
+
+
+def _infer_data_type(value):
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, list):
+        return "int[]" if value and all(isinstance(v, int) and not isinstance(v, bool) for v in value) else "text[]"
+    return "text"
+
+
+class FakeProperty:
+    def __init__(self, name, data_type, skip_vectorization=False, description=None, tokenization=None):
+        self.name = name
+        self.data_type = data_type
+        self.skip_vectorization = skip_vectorization
+        self.description = description
+        self.tokenization = tokenization or (DEFAULT_TOKENIZATION if data_type in ("text", "text[]") else None)
+
+    @classmethod
+    def from_config(cls, prop):
+        """From a weaviate.classes.config.Property or a v1-style property dict"""
+        if isinstance(prop, dict):
+            data_type = prop["dataType"][0]
+            skip = prop.get("moduleConfig", {}).get("text2vec-openai", {}).get("skip", False)
+            return cls(prop["name"], LEGACY_DATA_TYPES.get(data_type, data_type), skip, prop.get("description"),
+                       prop.get("tokenization"))
+        tokenization = prop.tokenization.value if prop.tokenization is not None else None
+        return cls(prop.name, prop.dataType.value, prop.skip_vectorization, prop.description, tokenization)
+
+    def __repr__(self):
+        return f"FakeProperty({self.name!r}, {self.data_type!r})"
+
+
+class FakeCollectionConfig:
+    """The parts of _CollectionConfig the pipeline reads: name, properties and to_dict"""
+
+    def __init__(self, name, properties, description=None, vector_index_config=None, vectorizer_config=None,
+                 generative_config=None):
+        self.name = name
+        self.description = description
+        self.properties = properties
+        self.vector_index_config = vector_index_config
+        self.vectorizer_config = vectorizer_config
+        self.generative_config = generative_config
+
+    def to_dict(self):
+        return {
+            "class": self.name,
+            "description": self.description,
+            "properties": [{"name": p.name, "dataType": [p.data_type], "description": p.description}
+                           for p in self.properties],
+            "vectorIndexConfig": repr(self.vector_index_config),
+        }
+
+
+class _CollectionData:
+    """Objects of one collection plus lazily rebuilt search structures.
+
+    Every write bumps `version`; the vector matrix, UUID order and BM25
+    postings are rebuilt on the first read after a change, so bulk loads
+    stay cheap and repeated queries reuse them.
+    """
+
+    def __init__(self, config, dimensions):
+        self.config = config
+        self.dimensions = dimensions
+        self.objects = {}
+        self.lock = threading.RLock()
+        self.version = 0
+        self._derived = {}
+
+    @property
+    def properties(self):
+        return {p.name: p for p in self.config.properties}
+
+    def validate(self, properties, vector):
+        known = self.properties
+        for name, value in properties.items():
+            prop = known.get(name)
+            if value is None or prop is None:
+                continue
+            check = VALUE_CHECKS.get(prop.data_type)
+            if check and not check(value):
+                return f"invalid {prop.data_type} property '{name}' on class '{self.config.name}': {value!r}"
+        if vector is not None and len(vector) != self.dimensions:
+            return f"vector lengths don't match: {len(vector)} vs {self.dimensions}"
+        return None
+
+    def put(self, uuid, properties, vector):
+        """Validate and store one object, auto-adding unknown properties like Weaviate's auto-schema"""
+        properties = {k: v for k, v in (properties or {}).items()}
+        error = self.validate(properties, vector)
+        if error:
+            raise FakeWeaviateError(error)
+        with self.lock:
+            known = self.properties
+            for name, value in properties.items():
+                if name not in known and value is not None:
+                    self.config.properties.append(FakeProperty(name, _infer_data_type(value)))
+            if vector is None:
+                vectorized = [p.name for p in self.config.properties if not p.skip_vectorization]
+                vector = fake_embedding(" ".join(_text(properties.get(name)) for name in vectorized), self.dimensions)
+            self.objects[uuid] = (properties, np.asarray(vector, dtype=np.float32))
+            self.version += 1
+
+    def delete(self, uuid):
+        with self.lock:
+            existed = self.objects.pop(uuid, None) is not None
+            self.version += 1
+            return existed
+
+    def _cached(self, key, build):
+        with self.lock:
+            entry = self._derived.get(key)
+            if entry is None or entry[0] != self.version:
+                entry = (self.version, build())
+                self._derived[key] = entry
+            return entry[1]
+
+    def sorted_ids(self):
+        return self._cached("ids", lambda: sorted(self.objects))
+
+    def matrix(self):
+        """(uuids, row-normalized vector matrix) in UUID order"""
+        def build():
+            ids = self.sorted_ids()
+            vectors = np.zeros((len(ids), self.dimensions), dtype=np.float32)
+            for row, uuid in enumerate(ids):
+                vectors[row] = self.objects[uuid][1]
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            return ids, vectors / np.maximum(norms, 1e-12)
+        return self._cached("matrix", build)
+
+    def postings(self, query_properties=None):
+        """BM25 postings {token: (rows, term frequencies)} plus document lengths, optionally boosted per property"""
+        def build():
+            if query_properties:
+                weights = {}
+                for spec in query_properties:
+                    name, _, boost = spec.partition("^")
+                    weights[name] = float(boost or 1)
+            else:
+                weights = {p.name: 1.0 for p in self.config.properties if p.data_type in ("text", "text[]")}
+            ids = self.sorted_ids()
+            vocabulary, tokens, rows, tf = {}, [], [], []
+            for row, uuid in enumerate(ids):
+                properties = self.objects[uuid][0]
+                for name, weight in weights.items():
+                    found = tokenize(_text(properties.get(name)))
+                    tokens.extend(vocabulary.setdefault(t, len(vocabulary)) for t in found)
+                    rows.extend([row] * len(found))
+                    tf.extend([weight] * len(found))
+            # One (token, row) pair per posting with the summed, boosted term frequency
+            n = max(len(ids), 1)
+            pairs, inverse = np.unique(np.asarray(tokens, dtype=np.int64) * n + np.asarray(rows, dtype=np.int64),
+                                       return_inverse=True)
+            frequencies = np.bincount(inverse, weights=tf).astype(np.float32)
+            lengths = np.bincount(np.asarray(rows, dtype=np.int64), weights=tf, minlength=len(ids)).astype(np.float32)
+            bounds = np.searchsorted(pairs // n, np.arange(len(vocabulary) + 1))
+            postings = {t: (pairs[bounds[i]:bounds[i + 1]] % n, frequencies[bounds[i]:bounds[i + 1]])
+                        for t, i in vocabulary.items()}
+            return postings, lengths
+        return self._cached(("bm25", tuple(query_properties or ())), build)
+
+    def bm25_scores(self, query, query_properties=None, k1=1.2, b=0.75):
+        postings, lengths = self.postings(query_properties)
+        scores = np.zeros(len(lengths), dtype=np.float32)
+        if not len(lengths):
+            return scores
+        avg_length = max(float(lengths.mean()), 1e-9)
+        for token in tokenize(query):
+            if token not in postings:
+                continue
+            rows, tf = postings[token]
+            idf = math.log(1 + (len(lengths) - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[rows] / avg_length))
+        return scores
+
+    def mask(self, filters):
+        """Boolean mask over sorted_ids for a v4 Filter, or None without filters.
+
+        Each leaf condition is evaluated once per data version and cached,
+        so repeated filters cost only the numpy and/or of their leaves.
+        """
+        if filters is None:
+            return None
+        if isinstance(filters, _FilterAnd):
+            return np.logical_and.reduce([self.mask(f) for f in filters.filters])
+        if isinstance(filters, _FilterOr):
+            return np.logical_or.reduce([self.mask(f) for f in filters.filters])
+        if not isinstance(filters, _FilterValue):
+            raise TypeError(f"Unsupported filter {filters!r}")
+        if not isinstance(filters.target, str):
+            raise TypeError("The fake only supports property and id filters")
+
+        def build():
+            ids = self.sorted_ids()
+            if filters.target == "_id":
+                values = filters.value if isinstance(filters.value, list) else [filters.value]
+                wanted = {str(uuid_lib.UUID(str(v))) for v in values}
+                found = np.fromiter((u in wanted for u in ids), dtype=bool, count=len(ids))
+                return ~found if filters.operator == _Operator.NOT_EQUAL else found
+            prop = self.properties.get(filters.target)
+            tokenization = prop.tokenization if prop is not None else DEFAULT_TOKENIZATION
+            column = (self.objects[u][0].get(filters.target) for u in ids)
+            return np.fromiter((_compare(filters.operator, v, filters.value, tokenization) for v in column),
+                               dtype=bool, count=len(ids))
+        return self._cached(("filter", filters.target, filters.operator, repr(filters.value)), build)
+
+
+@lru_cache(maxsize=65536)
+def _terms(text, tokenization, pattern=False):
+    """The lowercased tokens Weaviate indexes (or filters on) for a text value; untokenized types keep it whole"""
+    if tokenization in ("field", None):
+        return (text.strip().lower(),)
+    return tuple((_PATTERN_TOKEN if pattern else _TOKEN).findall(text.lower()))
+
+
+def _tokens(values, tokenization, pattern=False):
+    found = []
+    for value in values:
+        found.extend(_terms(value, tokenization, pattern) if isinstance(value, str) else (value,))
+    return found
+
+
+def _compare(operator, actual, expected, tokenization=DEFAULT_TOKENIZATION):
+    """Evaluate one filter condition like Weaviate's inverted index: on the tokens of text values"""
+    if operator == _Operator.IS_NULL:
+        return (actual is None or actual == []) == bool(expected)
+    if actual is None:
+        return operator == _Operator.NOT_EQUAL
+    actual_values = _tokens(actual if isinstance(actual, list) else [actual], tokenization)
+    expected_values = expected if isinstance(expected, list) else [expected]
+
+    if operator in (_Operator.EQUAL, _Operator.NOT_EQUAL):
+        # Every token of the value has to be present, in any order
+        found = all(e in actual_values for e in _tokens(expected_values, tokenization))
+        return found if operator == _Operator.EQUAL else not found
+    if operator == _Operator.CONTAINS_ANY:
+        return any(e in actual_values for e in _tokens(expected_values, tokenization))
+    if operator == _Operator.CONTAINS_ALL:
+        return all(e in actual_values for e in _tokens(expected_values, tokenization))
+    if operator == _Operator.LIKE:
+        return all(any(isinstance(a, str) and fnmatch.fnmatchcase(a, pattern) for a in actual_values)
+                   for pattern in _tokens(expected_values, tokenization, pattern=True))
+    ordering = {
+        _Operator.LESS_THAN: lambda a, e: a < e,
+        _Operator.LESS_THAN_EQUAL: lambda a, e: a <= e,
+        _Operator.GREATER_THAN: lambda a, e: a > e,
+        _Operator.GREATER_THAN_EQUAL: lambda a, e: a >= e,
+    }
+    if operator in ordering:
+        bound = expected_values[0].lower() if isinstance(expected_values[0], str) else expected_values[0]
+        return any(ordering[operator](a, bound) for a in actual_values)
+    raise ValueError(f"The fake does not support {operator.value} filters")
+
+
+def _render(prompt, properties):
+    return re.sub(r"\{(\w+)\}", lambda m: _text(properties.get(m.group(1))), prompt)
+
+
+class _Namespace:
+    def __init__(self, collection):
+        self._collection = collection
+
+    @property
+    def _data(self):
+        return self._collection._data
+
+
+class _Query(_Namespace):
+    """query.fetch_objects/near_text/near_vector/bm25/hybrid over the in-memory objects"""
+
+    def _objects(self, ids, return_properties, include_vector, distances=None, scores=None):
+        objects = []
+        for i, uuid in enumerate(ids):
+            properties, vector = self._data.objects[uuid]
+            if return_properties is not None:
+                properties = {k: properties[k] for k in return_properties if k in properties}
+            metadata = MetadataReturn(
+                distance=float(distances[i]) if distances is not None else None,
+                certainty=float(1 - distances[i] / 2) if distances is not None else None,
+                score=float(scores[i]) if scores is not None else None,
+            )
+            objects.append(Object(
+                uuid=uuid_lib.UUID(uuid), metadata=metadata, properties=dict(properties), references=None,
+                vector={"default": vector.tolist()} if include_vector else {}, collection=self._collection.name,
+            ))
+        return objects
+
+    def _ranked(self, scores, mask, limit, offset=0):
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        order = np.argsort(-scores, kind='stable')
+        order = order[np.isfinite(scores[order])]
+        return order[offset or 0:(offset or 0) + (limit or DEFAULT_LIMIT)]
+
+    def fetch_rows(self, limit=None, offset=None, after=None, filters=None):
+        with self._data.lock:
+            ids = self._data.sorted_ids()
+            start = bisect.bisect_right(ids, str(after)) if after else 0
+            mask = self._data.mask(filters)
+        rows = np.arange(start, len(ids)) if mask is None else start + np.flatnonzero(mask[start:])
+        offset = offset or 0
+        return ids, rows[offset:offset + limit] if limit else rows[offset:]
+
+    def fetch_objects(self, limit=None, offset=None, after=None, filters=None, include_vector=False,
+                      return_properties=None, **kwargs):
+        self._collection._wait("query")
+        ids, rows = self.fetch_rows(limit or DEFAULT_LIMIT, offset, after, filters)
+        return QueryReturn(objects=self._objects([ids[r] for r in rows], return_properties, include_vector))
+
+    def vector_rows(self, vector, limit=None, offset=None, distance=None, filters=None):
+        with self._data.lock:
+            ids, matrix = self._data.matrix()
+            mask = self._data.mask(filters)
+        query = np.asarray(vector, dtype=np.float32)
+        if len(query) != self._data.dimensions:
+            raise FakeWeaviateError(f"vector lengths don't match: {len(query)} vs {self._data.dimensions}")
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        distances = 1.0 - matrix @ query
+        if distance is not None:
+            mask = (distances <= distance) if mask is None else mask & (distances <= distance)
+        rows = self._ranked(-distances, mask, limit, offset)
+        return ids, rows, distances[rows]
+
+    def near_vector(self, near_vector, limit=None, offset=None, distance=None, filters=None, include_vector=False,
+                    return_properties=None, **kwargs):
+        self._collection._wait("query")
+        ids, rows, distances = self.vector_rows(near_vector, limit, offset, distance, filters)
+        return QueryReturn(objects=self._objects([ids[r] for r in rows], return_properties, include_vector, distances))
+
+    def near_text(self, query, limit=None, offset=None, distance=None, filters=None, include_vector=False,
+                  return_properties=None, **kwargs):
+        return _Query.near_vector(self, fake_embedding(query, self._data.dimensions), limit, offset, distance,
+                                  filters, include_vector, return_properties)
+
+    def bm25_rows(self, query, query_properties=None, limit=None, offset=None, filters=None):
+        with self._data.lock:
+            ids = self._data.sorted_ids()
+            scores = self._data.bm25_scores(query, query_properties)
+            mask = self._data.mask(filters)
+        scores = np.where(scores > 0, scores, -np.inf)
+        rows = self._ranked(scores, mask, limit, offset)
+        return ids, rows, scores[rows]
+
+    def bm25(self, query, query_properties=None, limit=None, offset=None, filters=None, include_vector=False,
+             return_properties=None, **kwargs):
+        self._collection._wait("query")
+        ids, rows, scores = self.bm25_rows(query, query_properties, limit, offset, filters)
+        return QueryReturn(objects=self._objects([ids[r] for r in rows], return_properties, include_vector,
+                                                 scores=scores))
+
+    def hybrid(self, query, alpha=HYBRID_ALPHA, vector=None, query_properties=None, limit=None, offset=None,
+               filters=None, include_vector=False, return_properties=None, **kwargs):
+        """Relative score fusion of the top vector and keyword candidates, like Weaviate's default"""
+        self._collection._wait("query")
+        candidates = max((limit or DEFAULT_LIMIT) + (offset or 0), HYBRID_CANDIDATES)
+        vector = fake_embedding(query, self._data.dimensions) if vector is None else vector
+        ids, vector_rows, distances = self.vector_rows(vector, candidates, filters=filters)
+        _, keyword_rows, keyword_scores = self.bm25_rows(query, query_properties, candidates, filters=filters)
+
+        def normalized(values):
+            values = np.asarray(values, dtype=np.float32)
+            if not len(values):
+                return values
+            spread = float(values.max() - values.min())
+            return (values - values.min()) / spread if spread else np.ones_like(values)
+
+        fused = {}
+        for rows, values, weight in ((vector_rows, -distances, alpha), (keyword_rows, keyword_scores, 1 - alpha)):
+            for row, value in zip(rows, normalized(values)):
+                fused[row] = fused.get(row, 0.0) + weight * float(value)
+        ranked = sorted(fused.items(), key=lambda item: -item[1])[offset or 0:(offset or 0) + (limit or DEFAULT_LIMIT)]
+        rows = [row for row, _ in ranked]
+        return QueryReturn(objects=self._objects([ids[r] for r in rows], return_properties, include_vector,
+                                                 scores=[score for _, score in ranked]))
+
+
+class _Generate(_Query):
+    """generate.fetch_objects/near_text that echo the rendered prompts instead of calling a model"""
+
+    def _generated(self, response, single_prompt, grouped_task):
+        generated = []
+        for obj in response.objects:
+            if single_prompt:
+                self._collection._wait("generate")
+                generated.append(f"[fake generation] {_render(single_prompt, self._data.objects[str(obj.uuid)][0])}")
+            else:
+                generated.append(None)
+        objects = [GenerativeObject(uuid=o.uuid, metadata=o.metadata, properties=o.properties, references=None,
+                                    vector=o.vector, collection=o.collection, generated=g)
+                   for o, g in zip(response.objects, generated)]
+        grouped = None
+        if grouped_task:
+            self._collection._wait("generate")
+            grouped = f"[fake generation] {grouped_task} ({len(objects)} objects)"
+        return GenerativeReturn(objects=objects, generated=grouped)
+
+    def fetch_objects(self, single_prompt=None, grouped_task=None, grouped_properties=None, **kwargs):
+        return self._generated(super().fetch_objects(**kwargs), single_prompt, grouped_task)
+
+    def near_text(self, query, single_prompt=None, grouped_task=None, grouped_properties=None, **kwargs):
+        return self._generated(super().near_text(query, **kwargs), single_prompt, grouped_task)
+
+    def near_vector(self, near_vector, single_prompt=None, grouped_task=None, grouped_properties=None, **kwargs):
+        return self._generated(super().near_vector(near_vector, **kwargs), single_prompt, grouped_task)
+
+    def bm25(self, query, single_prompt=None, grouped_task=None, grouped_properties=None, **kwargs):
+        return self._generated(super().bm25(query, **kwargs), single_prompt, grouped_task)
+
+    def hybrid(self, query, single_prompt=None, grouped_task=None, grouped_properties=None, **kwargs):
+        return self._generated(super().hybrid(query, **kwargs), single_prompt, grouped_task)
+
+
+class _Aggregate(_Namespace):
+    def over_all(self, filters=None, group_by=None, total_count=False, return_metrics=None, **kwargs):
+        """Total count, or per-value counts when grouping (array values count once per element)"""
+        self._collection._wait("aggregate")
+        with self._data.lock:
+            ids = self._data.sorted_ids()
+            mask = self._data.mask(filters)
+            selected = [self._data.objects[u][0] for row, u in enumerate(ids) if mask is None or mask[row]]
+        if group_by is None:
+            return AggregateReturn(properties={}, total_count=len(selected) if total_count else None)
+
+        prop, limit = (group_by, None) if isinstance(group_by, str) else (group_by.prop, group_by.limit)
+        counts = Counter()
+        for properties in selected:
+            value = properties.get(prop)
+            for v in value if isinstance(value, list) else [] if value is None else [value]:
+                counts[v] += 1
+        return AggregateGroupByReturn(groups=[
+            AggregateGroup(grouped_by=GroupedBy(prop=prop, value=value), properties={},
+                           total_count=count if total_count else None)
+            for value, count in counts.most_common(limit)
+        ])
+
+
+class _Data(_Namespace):
+    def insert(self, properties, uuid=None, vector=None, references=None, **kwargs):
+        self._collection._wait("insert")
+        uuid = str(uuid_lib.UUID(str(uuid))) if uuid else str(uuid_lib.uuid4())
+        self._data.put(uuid, properties, vector)
+        return uuid_lib.UUID(uuid)
+
+    def delete_by_id(self, uuid):
+        self._collection._wait("insert")
+        return self._data.delete(str(uuid_lib.UUID(str(uuid))))
+
+    def exists(self, uuid):
+        return str(uuid_lib.UUID(str(uuid))) in self._data.objects
+
+
+class _Batch:
+    """Context manager returned by batch.dynamic()/fixed_size(): buffers objects and flushes every batch_size"""
+
+    def __init__(self, collection, batch_size):
+        self._collection = collection
+        self._batch_size = batch_size
+        self._pending = []
+        self._index = 0
+        self.failed_objects = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._flush()
+        self._collection.batch.failed_objects = self.failed_objects
+        return False
+
+    @property
+    def number_errors(self):
+        return len(self.failed_objects)
+
+    def add_object(self, properties=None, references=None, uuid=None, vector=None, tenant=None):
+        uuid = str(uuid_lib.UUID(str(uuid))) if uuid else str(uuid_lib.uuid4())
+        self._pending.append(_BatchObject(collection=self._collection.name, vector=vector, uuid=uuid,
+                                          properties=properties, tenant=tenant, references=references,
+                                          index=self._index))
+        self._index += 1
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+        return uuid_lib.UUID(uuid)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        client = self._collection._client
+        client._wait("batch")
+        for obj in self._pending:
+            try:
+                if client._fail():
+                    raise FakeWeaviateError("injected failure")
+                self._collection._data.put(obj.uuid, obj.properties, obj.vector)
+            except FakeWeaviateError as e:
+                self.failed_objects.append(ErrorObject(message=str(e), object_=obj))
+        self._pending = []
+
+
+class _BatchNamespace:
+    def __init__(self, collection):
+        self._collection = collection
+        self.failed_objects = []
+        self.failed_references = []
+
+    def dynamic(self):
+        return _Batch(self._collection, BATCH_SIZE)
+
+    def fixed_size(self, batch_size=BATCH_SIZE, concurrent_requests=2):
+        return _Batch(self._collection, batch_size)
+
+    def rate_limit(self, requests_per_minute):
+        return _Batch(self._collection, BATCH_SIZE)
+
+
+class _Config(_Namespace):
+    def get(self, simple=False):
+        self._collection._wait("schema")
+        return self._data.config
+
+
+class FakeCollection:
+    """Handle to one collection; like the real client, handles are cheap and share server state"""
+
+    def __init__(self, client, name):
+        self._client = client
+        self.name = name
+        self.config = _Config(self)
+        self.query = _Query(self)
+        self.generate = _Generate(self)
+        self.aggregate = _Aggregate(self)
+        self.data = _Data(self)
+        self.batch = _BatchNamespace(self)
+
+    @property
+    def _data(self):
+        data = self._client.server.collections.get(self.name)
+        if data is None:
+            raise FakeWeaviateError(f"Collection {self.name} does not exist")
+        return data
+
+    def _wait(self, operation):
+        self._client._wait(operation)
+
+    def __len__(self):
+        return len(self._data.objects)
+
+    def iterator(self, include_vector=False, return_properties=None, after=None, cache_size=None, **kwargs):
+        """Cursor over all objects in UUID order, one page of cache_size per simulated request"""
+        page_size = cache_size or 100
+        while True:
+            page = self.query.fetch_objects(limit=page_size, after=after, include_vector=include_vector,
+                                            return_properties=return_properties).objects
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1].uuid
+
+
+def _collection_name(name):
+    """Weaviate stores collection names with a capitalized first letter"""
+    return name[:1].upper() + name[1:]
+
+
+class _Collections:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, name, properties=None, description=None, vectorizer_config=None, vector_index_config=None,
+               generative_config=None, **kwargs):
+        self._client._wait("schema")
+        name = _collection_name(name)
+        config = FakeCollectionConfig(
+            name, [FakeProperty.from_config(p) for p in properties or []], description, vector_index_config,
+            vectorizer_config, generative_config,
+        )
+        with self._client.server.lock:
+            if name in self._client.server.collections:
+                raise FakeWeaviateError(f"Collection {name} already exists")
+            self._client.server.collections[name] = _CollectionData(config, self._client.server.dimensions)
+        return self.get(name)
+
+    def create_from_dict(self, config):
+        return self.create(config["class"], properties=config.get("properties"), description=config.get("description"))
+
+    def get(self, name):
+        return FakeCollection(self._client, _collection_name(name))
+
+    def exists(self, name):
+        self._client._wait("schema")
+        return _collection_name(name) in self._client.server.collections
+
+    def delete(self, name):
+        self._client._wait("schema")
+        with self._client.server.lock:
+            for n in [name] if isinstance(name, str) else name:
+                self._client.server.collections.pop(_collection_name(n), None)
+
+    def delete_all(self):
+        with self._client.server.lock:
+            self._client.server.collections.clear()
+
+    def list_all(self, simple=True):
+        self._client._wait("schema")
+        return {name: data.config for name, data in self._client.server.collections.items()}
+
+
+class FakeServer:
+    """Shared state of the fake: collections and the embedding size"""
+
+    def __init__(self, dimensions=FAKE_DIMENSIONS):
+        self.dimensions = dimensions
+        self.collections = {}
+        self.lock = threading.Lock()
+
+
+SHARED_SERVER = FakeServer()
+
+
+class FakeWeaviateClient:
+    """In-process stand-in for the subset of the v4 client the pipeline uses.
+
+    Objects live in memory. Objects inserted without a vector get
+    fake_embedding of their vectorizable properties, whatever vectorizer
+    the collection was created with, and near_text embeds the query the
+    same way, so results are reproducible without any model provider.
+    latency_ms (see parse_latency) adds a sleep per query, schema call,
+    generation and batch flush; failure_rate fails random batch objects
+    so the dead-letter path can be exercised. Use it to measure the
+    Python side of loaders and search code without a cluster.
+    """
+
+    def __init__(self, server=None, latency_ms=None, failure_rate=0.0, seed=0):
+        self.server = server if server is not None else FakeServer()
+        self.latency_ms = parse_latency(latency_ms)
+        self.failure_rate = failure_rate
+        self.collections = _Collections(self)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._connected = True
+
+    def _wait(self, operation):
+        if not self._connected:
+            raise FakeWeaviateError("Client is closed")
+        delay = self.latency_ms.get(operation, 0.0)
+        if delay:
+            time.sleep(delay / 1000)
+
+    def _fail(self):
+        if not self.failure_rate:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < self.failure_rate
+
+    def connect(self):
+        self._connected = True
+
+    def is_connected(self):
+        return self._connected
+
+    def is_ready(self):
+        return self._connected
+
+    def close(self):
+        self._connected = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class _AsyncNamespace:
+    """Exposes a namespace's methods as coroutines, run in a worker thread so latency overlaps"""
+
+    def __init__(self, namespace):
+        self._namespace = namespace
+
+    def __getattr__(self, name):
+        method = getattr(self._namespace, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return call
+
+
+class _AsyncCollection:
+    def __init__(self, collection):
+        self.name = collection.name
+        for namespace in ("config", "query", "generate", "aggregate", "data"):
+            setattr(self, namespace, _AsyncNamespace(getattr(collection, namespace)))
+
+
+class _AsyncCollections:
+    def __init__(self, collections):
+        self._collections = collections
+        self._async = _AsyncNamespace(collections)
+
+    def get(self, name):
+        return _AsyncCollection(self._collections.get(name))
+
+    def __getattr__(self, name):
+        return getattr(self._async, name)
+
+
+class FakeWeaviateAsyncClient:
+    """Async counterpart of FakeWeaviateClient for code written against the v4 async client"""
+
+    def __init__(self, **kwargs):
+        self._client = FakeWeaviateClient(**kwargs)
+        self.collections = _AsyncCollections(self._client.collections)
+
+    async def connect(self):
+        self._client.connect()
+
+    async def close(self):
+        self._client.close()
+
+    def is_connected(self):
+        return self._client.is_connected()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
+
+
+def connect_to_fake():
+    """A client on the process-wide fake server, configured by FAKE_WEAVIATE_LATENCY_MS"""
+    return FakeWeaviateClient(SHARED_SERVER, latency_ms=os.getenv('FAKE_WEAVIATE_LATENCY_MS'))
+
+
+def use_async_with_fake():
+    return FakeWeaviateAsyncClient(server=SHARED_SERVER, latency_ms=os.getenv('FAKE_WEAVIATE_LATENCY_MS'))
+
+
+def seed_tracks(client, name, csv_path=None, copies=1, batch_size=BATCH_SIZE):
+    """Load the sample tracks CSV into a typed Track collection; copies > 1 scales it up with new ids"""
+    import pandas as pd
+    from track_schema import create_typed_track_collection, track_properties
+    from search_benchmark import TRACKS_CSV_PATH
+
+    if client.collections.exists(name):
+        client.collections.delete(name)
+    collection = create_typed_track_collection(client, name)
+    rows = [track_properties(row) for row in pd.read_csv(csv_path or TRACKS_CSV_PATH).to_dict('records')]
+    with collection.batch.fixed_size(batch_size=batch_size) as batch:
+        for copy in range(copies):
+            for properties in rows:
+                spotify_id = properties["spotify_id"] if copy == 0 else f"{properties['spotify_id']}-{copy}"
+                batch.add_object(properties=dict(properties, spotify_id=spotify_id), uuid=generate_uuid5(spotify_id))
+    return collection
+
+
+def main():
+    """Offline ingest and query benchmark of the pipeline code against the fake"""
+    from track_schema import UI_PROPERTIES, create_typed_track_collection, track_properties
+    from track_search import track_filters
+    from search_benchmark import TRACKS_CSV_PATH, TRACK_GENRES, load_golden
+    from ingestion import IngestionCheckpoint, ingest_rows
+    from timing import Stopwatch, summarize, format_summary
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Benchmark ingestion and queries against the in-process fake Weaviate")
+    parser.add_argument("--csv", default=TRACKS_CSV_PATH)
+    parser.add_argument("--copies", type=int, default=10, help="Repeat the CSV this many times with new ids")
+    parser.add_argument("--latency-ms", default="0", help="e.g. 2 or 'query=5,batch=20'")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of batch objects to fail")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    client = FakeWeaviateClient(latency_ms=args.latency_ms, failure_rate=args.failure_rate)
+    collection = create_typed_track_collection(client, "Track")
+
+    with Stopwatch() as convert:
+        source = pd.read_csv(args.csv).to_dict('records')
+        rows = []
+        for copy in range(args.copies):
+            for row in source:
+                properties = track_properties(row)
+                if copy:
+                    properties["spotify_id"] = f"{properties['spotify_id']}-{copy}"
+                rows.append(properties)
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        checkpoint = IngestionCheckpoint("fake", args.csv, directory=checkpoint_dir)
+        with Stopwatch() as ingest:
+            inserted, failed = ingest_rows(collection, rows, checkpoint, uuid_key="spotify_id",
+                                           chunk_size=10000, batch_size=args.batch_size)
+    print(f"\n📦 Converted {len(rows)} rows in {convert.elapsed_ms:.0f}ms, ingested {inserted} "
+          f"({failed} failed) in {ingest.elapsed_ms:.0f}ms ({inserted / max(ingest.elapsed_ms / 1000, 1e-9):.0f} objects/s)")
+
+    queries = [q["query"] for q in load_golden()["suites"]["tracks"]["queries"]]
+    runs = {
+        "bm25": lambda q: collection.query.bm25(query=q, limit=args.limit, return_properties=UI_PROPERTIES),
+        "near_text": lambda q: collection.query.near_text(query=q, limit=args.limit, return_properties=UI_PROPERTIES),
+        "hybrid": lambda q: collection.query.hybrid(query=q, limit=args.limit, return_properties=UI_PROPERTIES),
+    }
+    print(f"\n🔎 {len(queries)} golden queries, limit {args.limit}")
+    for mode, run in runs.items():
+        samples = []
+        for query in queries:
+            with Stopwatch() as sw:
+                run(query)
+            samples.append(sw.elapsed_ms)
+        print(format_summary(mode, summarize(samples)))
+
+    samples = []
+    for genre in TRACK_GENRES:
+        with Stopwatch() as sw:
+            collection.query.fetch_objects(filters=track_filters([genre], min_popularity=30), limit=args.limit,
+                                           return_properties=UI_PROPERTIES)
+        samples.append(sw.elapsed_ms)
+    print(format_summary("filtered fetch", summarize(samples)))
+
+
+if __name__ == "__main__":
+    main()
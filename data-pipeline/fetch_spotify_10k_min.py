@@ -114,7 +114,9 @@ def normalize_row(t: dict, genre_cache: dict) -> dict:
         "spotify_id": t.get("id"),
         "name": t.get("name"),
         "artists": "; ".join(a_names),
+        "artist_ids": "; ".join(a.get("id") or "" for a in artists),
         "album": album.get("name"),
+        "album_id": album.get("id"),
         "genres": "; ".join(genres),
         "popularity": t.get("popularity", 0),
         "duration_ms": t.get("duration_ms", 0),
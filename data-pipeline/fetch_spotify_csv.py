@@ -86,7 +86,9 @@ for tid, t in track_map.items():
         "spotify_id": tid,
         "name": t.get("name"),
         "artists": "; ".join(artists),
+        "artist_ids": "; ".join(a.get("id") or "" for a in t.get("artists", [])),
         "album": album.get("name"),
+        "album_id": album.get("id"),
         "genres": "; ".join(genres),
         "popularity": t.get("popularity", 0),
         "duration_ms": t.get("duration_ms", 0),
@@ -0,0 +1,220 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from weaviate.classes.query import Filter
+from timing import Stopwatch, summarize, format_summary
+
+GENERATION_CACHE_PATH = os.path.join(os.path.dirname(__file__), 'cache', 'generations.sqlite')
+
+# Generative backend and model per book_loader provider. The models must match
+# the collection's generative config so cached outputs stay valid.
+PROVIDER_MODELS = {
+    "local": ("ollama", "llama3:latest"),
+    "cloud": ("openai", "gpt-3.5-turbo"),
+    "friendliai": ("friendliai", "meta-llama-3.3-70b-instruct"),
+}
+
+# Maximum concurrent LLM calls per backend, overridable with e.g. OPENAI_GENERATIVE_CONCURRENCY.
+# A local Ollama serves one generation at a time, the hosted APIs are rate limited.
+CONCURRENCY_LIMITS = {
+    "ollama": 1,
+    "openai": 8,
+    "friendliai": 4,
+}
+
+FRIENDLIAI_BASE_URL = "https://api.friendli.ai/serverless/v1"
+
+# stream_group prompts differ from the module's grouped task, so they get their own cache keys
+STREAM_KEY_PREFIX = "stream:"
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def provider_limiter(backend):
+    """Process-wide semaphore bounding concurrent generations for a backend"""
+    with _limiters_lock:
+        if backend not in _limiters:
+            limit = int(os.getenv(f"{backend.upper()}_GENERATIVE_CONCURRENCY", CONCURRENCY_LIMITS[backend]))
+            _limiters[backend] = threading.BoundedSemaphore(limit)
+        return _limiters[backend]
+
+
+def template_hash(template):
+    """Short stable hash of a prompt template"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+class GenerationCache:
+    """Generated text keyed by (object key, prompt template hash, model), persisted in SQLite"""
+
+    def __init__(self, path=GENERATION_CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS generations ("
+            "object_key TEXT NOT NULL, template TEXT NOT NULL, model TEXT NOT NULL, output TEXT NOT NULL, "
+            "PRIMARY KEY (object_key, template, model))"
+        )
+        self._db.commit()
+
+    def get(self, object_key, template, model):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT output FROM generations WHERE object_key = ? AND template = ? AND model = ?",
+                (object_key, template, model),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, object_key, template, model, output):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO generations VALUES (?, ?, ?, ?)",
+                (object_key, template, model, output),
+            )
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+def group_key(objects):
+    """Cache key of a set of objects, independent of their order"""
+    return ",".join(sorted(str(obj.uuid) for obj in objects))
+
+
+def group_prompt(task, objects):
+    """Prompt for a grouped task built client-side, the way Weaviate passes results as context"""
+    context = "\n".join(json.dumps(obj.properties, default=str) for obj in objects)
+    return f"{task}\n\n{context}"
+
+
+def _stream_openai_compatible(client, model, prompt):
+    stream = client.chat.completions.create(
+        model=model, messages=[{"role": "user", "content": prompt}], stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def stream_completion(backend, model, prompt):
+    """Stream a completion straight from the provider SDK"""
+    if backend == "ollama":
+        import ollama
+        client = ollama.Client(host=os.getenv('OLLAMA_HOST', 'http://localhost:11434'))
+        for chunk in client.chat(model=model, messages=[{"role": "user", "content": prompt}], stream=True):
+            yield chunk["message"]["content"]
+        return
+
+    from openai import OpenAI
+    if backend == "openai":
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    elif backend == "friendliai":
+        # FriendliAI serverless endpoints speak the OpenAI chat API
+        client = OpenAI(api_key=os.getenv('FRIENDLIAI_API_KEY'), base_url=FRIENDLIAI_BASE_URL)
+    else:
+        raise ValueError(f"Unknown generative backend {backend!r}")
+    yield from _stream_openai_compatible(client, model, prompt)
+
+
+class GenerativeSearch:
+    """Retrieval plus cached LLM explanations for a book_loader provider.
+
+    Search results are retrieved without generation; explanations are then
+    looked up by (object UUID, prompt template hash, model) and only the
+    misses are sent to the collection's generative module, in one request.
+    """
+
+    def __init__(self, collection, provider, cache=None):
+        self.collection = collection
+        self.backend, self.model = PROVIDER_MODELS[provider]
+        self.limiter = provider_limiter(self.backend)
+        self.cache = cache if cache is not None else GenerationCache()
+        self.hits = 0
+        self.misses = 0
+        self.generate_latencies = []
+
+    def search(self, query, limit=3, **kwargs):
+        """near_text retrieval only, no LLM call"""
+        return self.collection.query.near_text(query=query, limit=limit, **kwargs).objects
+
+    def _generate(self, objects, **prompt):
+        uuids = [obj.uuid for obj in objects]
+        with self.limiter, Stopwatch() as sw:
+            response = self.collection.generate.fetch_objects(
+                filters=Filter.by_id().contains_any(uuids), limit=len(uuids), **prompt,
+            )
+        self.generate_latencies.append(sw.elapsed_ms)
+        return response
+
+    def explain_each(self, objects, single_prompt):
+        """One explanation per object, generating only those not cached yet"""
+        template = template_hash(single_prompt)
+        outputs = {str(obj.uuid): self.cache.get(str(obj.uuid), template, self.model) for obj in objects}
+        missing = [obj for obj in objects if outputs[str(obj.uuid)] is None]
+        self.hits += len(objects) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            response = self._generate(missing, single_prompt=single_prompt)
+            for obj in response.objects:
+                if obj.generated is not None:
+                    outputs[str(obj.uuid)] = obj.generated
+                    self.cache.put(str(obj.uuid), template, self.model, obj.generated)
+        return [outputs[str(obj.uuid)] for obj in objects]
+
+    def explain_group(self, objects, grouped_task):
+        """One explanation covering all objects in a single LLM call"""
+        key, template = group_key(objects), template_hash(grouped_task)
+        output = self.cache.get(key, template, self.model)
+        if output is not None:
+            self.hits += 1
+            return output
+
+        self.misses += 1
+        output = self._generate(objects, grouped_task=grouped_task).generated
+        if output is not None:
+            self.cache.put(key, template, self.model, output)
+        return output
+
+    def stream_group(self, objects, grouped_task):
+        """Like explain_group but yields the text as the provider produces it.
+
+        The prompt is built client-side (group_prompt), so outputs are cached
+        apart from explain_group's. The provider slot is taken only while
+        waiting for the next chunk, never while the caller holds one, and the
+        provider stream is closed when the caller stops reading.
+        """
+        key, template = STREAM_KEY_PREFIX + group_key(objects), template_hash(grouped_task)
+        output = self.cache.get(key, template, self.model)
+        if output is not None:
+            self.hits += 1
+            yield output
+            return
+
+        self.misses += 1
+        chunks = []
+        stream = stream_completion(self.backend, self.model, group_prompt(grouped_task, objects))
+        try:
+            with Stopwatch() as sw:
+                while True:
+                    with self.limiter:
+                        chunk = next(stream, None)
+                    if chunk is None:
+                        break
+                    chunks.append(chunk)
+                    yield chunk
+        finally:
+            stream.close()
+        self.generate_latencies.append(sw.elapsed_ms)
+        self.cache.put(key, template, self.model, "".join(chunks))
+
+    def print_metrics(self):
+        total = self.hits + self.misses
+        print(f"📊 {total} explanations, {self.hits} from cache, {self.misses} generated with {self.model}")
+        print(format_summary("generation", summarize(self.generate_latencies)))
@@ -0,0 +1,104 @@
+import os
+from weaviate.classes.config import Configure
+
+DEFAULT_INDEX_PROFILE = "default"
+
+# PQ and SQ compress once a shard holds this many vectors; smaller
+# collections (benchmarks) pass their object count instead
+DEFAULT_TRAINING_LIMIT = 100000
+
+# Vector index presets for the collection builders. Memory numbers are rough
+# per-vector estimates for 1536-dim vectors (text-embedding-3-small); use
+# benchmark_index_profiles.py to measure recall and latency on real data.
+# Each build takes the quantizer training limit.
+INDEX_PROFILES = {
+    "default": {
+        "description": "Server defaults (HNSW ef=-1/dynamic, efConstruction=128, maxConnections=32), uncompressed",
+        "build": lambda training_limit: None,
+    },
+    "hnsw-fast": {
+        "description": "Small graph and search list, lowest latency and build time, slightly lower recall",
+        "build": lambda training_limit: Configure.VectorIndex.hnsw(ef=64, ef_construction=128, max_connections=16),
+    },
+    "hnsw-recall": {
+        "description": "Dense graph and wide search list, highest recall, more memory and slower builds",
+        "build": lambda training_limit: Configure.VectorIndex.hnsw(ef=256, ef_construction=512, max_connections=64),
+    },
+    "hnsw-pq": {
+        "description": "HNSW with 96-segment product quantization, ~64x smaller vectors in memory, loses a few points of recall",
+        "build": lambda training_limit: Configure.VectorIndex.hnsw(
+            ef=128, ef_construction=256, max_connections=32,
+            quantizer=Configure.VectorIndex.Quantizer.pq(segments=96, training_limit=training_limit),
+        ),
+    },
+    "hnsw-sq": {
+        "description": "HNSW with scalar (8-bit) quantization, 4x smaller vectors, small recall loss",
+        "build": lambda training_limit: Configure.VectorIndex.hnsw(
+            ef=128, ef_construction=256, max_connections=32,
+            quantizer=Configure.VectorIndex.Quantizer.sq(rescore_limit=200, training_limit=training_limit),
+        ),
+    },
+    "hnsw-bq": {
+        "description": "HNSW with binary quantization, 32x smaller vectors, needs rescoring for good recall",
+        "build": lambda training_limit: Configure.VectorIndex.hnsw(
+            ef=128, ef_construction=256, max_connections=32,
+            quantizer=Configure.VectorIndex.Quantizer.bq(rescore_limit=200),
+        ),
+    },
+    "flat": {
+        "description": "Brute-force flat index, exact results, no graph memory; only for small collections (<10k objects)",
+        "build": lambda training_limit: Configure.VectorIndex.flat(),
+    },
+    "flat-bq": {
+        "description": "Flat index with cached binary quantization, tiny memory footprint for small collections",
+        "build": lambda training_limit: Configure.VectorIndex.flat(quantizer=Configure.VectorIndex.Quantizer.bq(cache=True)),
+    },
+}
+
+
+def vector_index_config(profile=None, objects=None):
+    """Return the vector index config for a profile name.
+
+    When no profile is given the WEAVIATE_INDEX_PROFILE environment variable is
+    used, falling back to the server defaults. With objects, quantizers train
+    once that many vectors are in, so collections smaller than the default
+    training limit still get compressed.
+    """
+    profile = profile or os.getenv('WEAVIATE_INDEX_PROFILE') or DEFAULT_INDEX_PROFILE
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"Unknown index profile {profile!r}, choose one of: {', '.join(INDEX_PROFILES)}")
+    training_limit = min(DEFAULT_TRAINING_LIMIT, objects) if objects else DEFAULT_TRAINING_LIMIT
+    return INDEX_PROFILES[profile]["build"](training_limit)
+
+
+def is_compressed(profile):
+    """Whether a profile's vectors are quantized"""
+    config = vector_index_config(profile)
+    return getattr(config, "quantizer", None) is not None
+
+
+def estimated_bytes_per_vector(profile, dimensions=1536):
+    """Rough in-memory size of one vector plus its graph links for a profile"""
+    config = vector_index_config(profile)
+    max_connections = getattr(config, "maxConnections", None) or 32
+    graph = 0 if profile.startswith("flat") else max_connections * 2 * 8
+
+    if "-pq" in profile:
+        vector = getattr(config.quantizer, "segments", None) or dimensions // 4
+    elif "-sq" in profile:
+        vector = dimensions
+    elif "-bq" in profile:
+        vector = dimensions // 8
+    elif profile.startswith("flat"):
+        vector = 0  # flat reads uncompressed vectors from disk
+    else:
+        vector = dimensions * 4
+    return vector + graph
+
+
+def add_index_profile_argument(parser):
+    """Add the shared --index-profile option to an argparse parser"""
+    parser.add_argument(
+        "--index-profile", choices=list(INDEX_PROFILES), default=None,
+        help="Vector index preset (defaults to $WEAVIATE_INDEX_PROFILE or server defaults)",
+    )
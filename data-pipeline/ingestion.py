@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import hashlib
+from weaviate.util import generate_uuid5
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), 'checkpoints')
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """Return the sha256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestionCheckpoint:
+    """Tracks the last committed row of a load and the objects that failed.
+
+    The checkpoint is a small JSON file keyed by name (usually the collection
+    name). Failed objects are appended to a dead-letter JSONL file next to it
+    together with the error message, so they can be retried later.
+    """
+
+    def __init__(self, name, source_path=None, directory=CHECKPOINT_DIR):
+        self.name = name
+        self.source_path = os.path.abspath(source_path) if source_path else None
+        self.directory = directory
+        self.checkpoint_path = os.path.join(directory, f"{name}.checkpoint.json")
+        self.dead_letter_path = os.path.join(directory, f"{name}.dead_letter.jsonl")
+        self._source_hash = None
+
+    @property
+    def source_hash(self):
+        if self._source_hash is None:
+            self._source_hash = file_hash(self.source_path)
+        return self._source_hash
+
+    def load(self):
+        """Return the saved checkpoint dict, or None if there is none"""
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, last_row, inserted, failed):
+        """Atomically record progress after a chunk has been committed"""
+        os.makedirs(self.directory, exist_ok=True)
+        state = {
+            "name": self.name,
+            "source_path": self.source_path,
+            "source_hash": self.source_hash,
+            "last_row": last_row,
+            "inserted": inserted,
+            "failed": failed,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def start_row(self, resume):
+        """Return the row to start from, validating the source file on resume"""
+        if not resume:
+            self.reset()
+            return 0
+
+        state = self.load()
+        if state is None:
+            print("No checkpoint found, starting from the first row.")
+            return 0
+
+        if state.get("source_hash") != self.source_hash:
+            print("⚠️ Source file changed since the checkpoint was written, starting from the first row.")
+            self.reset()
+            return 0
+
+        print(f"Resuming from row {state['last_row']} ({state['inserted']} inserted, {state['failed']} failed so far)")
+        return state['last_row']
+
+    def reset(self):
+        """Remove the checkpoint and dead-letter files"""
+        for path in (self.checkpoint_path, self.dead_letter_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def record_failures(self, entries):
+        """Append failed objects to the dead-letter file"""
+        if not entries:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def read_dead_letters(self):
+        """Return all dead-letter entries"""
+        if not os.path.exists(self.dead_letter_path):
+            return []
+        with open(self.dead_letter_path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def rewrite_dead_letters(self, entries):
+        """Replace the dead-letter file with the given entries"""
+        if os.path.exists(self.dead_letter_path):
+            os.remove(self.dead_letter_path)
+        self.record_failures(entries)
+
+
+def _insert_chunk(collection, chunk, batch_size, concurrent_requests):
+    """Insert (row, uuid, properties, vector) tuples and return dead-letter entries for failures"""
+    by_uuid = {}
+    with collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=concurrent_requests) as batch:
+        for row, uuid, properties, vector in chunk:
+            by_uuid[str(uuid)] = (row, vector)
+            batch.add_object(properties=properties, uuid=uuid, vector=vector)
+
+    failures = []
+    for failed in collection.batch.failed_objects:
+        uuid = str(failed.object_.uuid)
+        row, vector = by_uuid.get(uuid, (None, None))
+        entry = {
+            "row": row,
+            "uuid": uuid,
+            "properties": failed.object_.properties,
+            "error": failed.message,
+        }
+        if vector is not None:
+            entry["vector"] = vector
+        failures.append(entry)
+    return failures
+
+
+def ingest_rows(collection, rows, checkpoint, uuid_key=None, resume=False, chunk_size=1000, batch_size=100,
+                concurrent_requests=2, uuids=None, vectors=None):
+    """Batch insert property dicts with checkpoints and a dead-letter queue.
+
+    UUIDs are derived from ``uuid_key`` so re-inserting a chunk after a crash
+    overwrites the same objects instead of duplicating them. The checkpoint is
+    only advanced once a whole chunk has been flushed, so at most one chunk is
+    repeated on resume. ``uuids`` (existing object UUIDs, e.g. from a
+    snapshot) and ``vectors`` (any row-indexable array, such as a memmap) are
+    optional and aligned with ``rows``.
+    """
+    if uuid_key is None and uuids is None:
+        raise ValueError("ingest_rows needs either uuid_key or uuids")
+
+    start = checkpoint.start_row(resume)
+    state = checkpoint.load() or {}
+    inserted = state.get("inserted", 0)
+    failed = state.get("failed", 0)
+    total = len(rows)
+
+    if resume:
+        recovered = retry_dead_letters(collection, checkpoint, batch_size=batch_size)
+        inserted += recovered
+        failed -= recovered
+        checkpoint.save(start, inserted, failed)
+
+    for chunk_start in range(start, total, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, total)
+        chunk = [
+            (
+                row,
+                uuids[row] if uuids is not None else generate_uuid5(rows[row][uuid_key]),
+                rows[row],
+                vectors[row].tolist() if vectors is not None else None,
+            )
+            for row in range(chunk_start, chunk_end)
+        ]
+
+        failures = _insert_chunk(collection, chunk, batch_size, concurrent_requests)
+        checkpoint.record_failures(failures)
+
+        inserted += len(chunk) - len(failures)
+        failed += len(failures)
+        checkpoint.save(chunk_end, inserted, failed)
+        print(f"Committed rows {chunk_start + 1} to {chunk_end} of {total} ({len(failures)} failed)")
+
+    return inserted, failed
+
+
+def retry_dead_letters(collection, checkpoint, max_attempts=5, base_delay=1.0, batch_size=100):
+    """Retry dead-letter entries with exponential backoff, keeping only the ones that still fail"""
+    entries = checkpoint.read_dead_letters()
+    if not entries:
+        return 0
+
+    print(f"Retrying {len(entries)} dead-letter objects...")
+    recovered = 0
+    for attempt in range(max_attempts):
+        if attempt:
+            time.sleep(base_delay * 2 ** (attempt - 1))
+
+        chunk = [(e["row"], e["uuid"], e["properties"], e.get("vector")) for e in entries]
+        failures = _insert_chunk(collection, chunk, batch_size, concurrent_requests=1)
+        attempts = {e["uuid"]: e.get("attempts", 0) + 1 for e in entries}
+        for failure in failures:
+            failure["attempts"] = attempts.get(failure["uuid"], 1)
+
+        recovered += len(entries) - len(failures)
+        entries = failures
+        if not entries:
+            break
+
+    checkpoint.rewrite_dead_letters(entries)
+    print(f"Recovered {recovered} dead-letter objects, {len(entries)} still failing")
+    return recovered
@@ -0,0 +1,167 @@
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from track_schema import LEGACY_TRACK_COLLECTION, UI_PROPERTIES
+from track_search import track_filters, is_typed_collection
+from search_benchmark import load_golden, TRACK_GENRES
+from timing import summarize
+
+DEFAULT_MIX = {"bm25": 0.4, "near_text": 0.4, "filtered_fetch": 0.2}
+
+
+def query_pool(golden_version=1):
+    """Track query texts from the golden set, so load tests replay realistic queries"""
+    return [q["query"] for q in load_golden(golden_version)["suites"]["tracks"]["queries"]]
+
+
+def make_requests(mix, queries, seed=0):
+    """Endless stream of (kind, params) drawn from the weighted query mix"""
+    rng = random.Random(seed)
+    kinds, weights = zip(*mix.items())
+    while True:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "filtered_fetch":
+            yield kind, {"genres": [rng.choice(TRACK_GENRES)], "min_popularity": rng.choice([0, 30, 50, 70])}
+        else:
+            yield kind, {"query": rng.choice(queries)}
+
+
+class WeaviateTarget:
+    """Runs the query mix against a Track collection"""
+
+    def __init__(self, collection, limit=20):
+        self.collection = collection
+        self.limit = limit
+        self.typed = is_typed_collection(collection)
+
+    def execute(self, kind, params):
+        query = self.collection.query
+        if kind == "bm25":
+            return query.bm25(query=params["query"], limit=self.limit, return_properties=UI_PROPERTIES)
+        if kind == "near_text":
+            return query.near_text(query=params["query"], limit=self.limit, return_properties=UI_PROPERTIES)
+        if kind == "filtered_fetch":
+            return query.fetch_objects(
+                filters=track_filters(typed=self.typed, **params), limit=self.limit, return_properties=UI_PROPERTIES,
+            )
+        raise ValueError(f"Unknown query kind {kind!r}")
+
+
+class SimulatedTarget:
+    """Stand-in server with a fixed number of workers and lognormal service times.
+
+    Good enough to check the load generator itself and to see what
+    saturation looks like before pointing it at a real cluster.
+    """
+
+    SERVICE_MS = {"bm25": 8.0, "near_text": 25.0, "filtered_fetch": 5.0}
+
+    def __init__(self, workers=8, error_rate=0.0, seed=0):
+        self.slots = threading.Semaphore(workers)
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def execute(self, kind, params):
+        with self.lock:
+            service = self.rng.lognormvariate(0, 0.5) * self.SERVICE_MS[kind] / 1000
+            fail = self.rng.random() < self.error_rate
+        with self.slots:
+            time.sleep(service)
+        if fail:
+            raise RuntimeError("simulated error")
+
+
+def run_step(target, requests, qps, duration, poisson=False, max_in_flight=512, seed=0):
+    """Offer `qps` requests/sec for `duration` seconds with open-loop scheduling.
+
+    Requests are sent at their scheduled time whether or not earlier ones
+    have finished, and latency is measured from the scheduled time. Once the
+    target saturates, queueing delay therefore shows up in the latencies
+    instead of silently lowering the offered load.
+    """
+    rng = random.Random(seed)
+    latencies, errors, lock = [], [0], threading.Lock()
+
+    def call(scheduled, kind, params):
+        try:
+            target.execute(kind, params)
+            failed = False
+        except Exception:
+            failed = True
+        elapsed = (time.perf_counter() - scheduled) * 1000
+        with lock:
+            latencies.append(elapsed)
+            errors[0] += failed
+
+    start = time.perf_counter()
+    next_at = start
+    sent = 0
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while next_at - start < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            kind, params = next(requests)
+            pool.submit(call, next_at, kind, params)
+            sent += 1
+            next_at += rng.expovariate(qps) if poisson else 1.0 / qps
+    elapsed = time.perf_counter() - start
+
+    latency = summarize(latencies)
+    return {
+        "offered_qps": qps,
+        "sent": sent,
+        "achieved_qps": (len(latencies) - errors[0]) / elapsed,
+        "errors": errors[0],
+        "error_rate": errors[0] / max(sent, 1),
+        "p50_ms": latency["p50"],
+        "p95_ms": latency["p95"],
+        "p99_ms": latency["p99"],
+    }
+
+
+def main():
+    """Saturation curve of the Track collection under a replayed query mix"""
+    parser = argparse.ArgumentParser(description="Open-loop load generator for Track queries")
+    parser.add_argument("--target", choices=["local", "cloud", "fake", "simulated"], default="simulated",
+                        help="Weaviate deployment to load, the in-process fake seeded with the sample tracks, "
+                             "or the simulated server")
+    parser.add_argument("--collection", default=LEGACY_TRACK_COLLECTION)
+    parser.add_argument("--qps", type=float, nargs="+", default=[10, 25, 50, 100, 200, 400])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per QPS step")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX, help='e.g. \'{"bm25": 1, "near_text": 1}\'')
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of a fixed interval")
+    parser.add_argument("--workers", type=int, default=8, help="Worker count of the simulated server")
+    parser.add_argument("--output", help="Write the curve as JSON")
+    args = parser.parse_args()
+
+    if args.target == "simulated":
+        target = SimulatedTarget(workers=args.workers)
+    elif args.target == "fake":
+        from fake_weaviate import connect_to_fake, seed_tracks
+        target = WeaviateTarget(seed_tracks(connect_to_fake(), args.collection))
+    else:
+        from weaviate_client import get_client
+        target = WeaviateTarget(get_client(args.target).collections.get(args.collection))
+
+    requests = make_requests(args.mix, query_pool())
+    print(f"📈 {args.target} target, mix {args.mix}, {args.duration:.0f}s per step\n")
+    print(f"{'offered':>8} {'achieved':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    curve = []
+    for qps in args.qps:
+        step = run_step(target, requests, qps, args.duration, poisson=args.poisson)
+        curve.append(step)
+        print(f"{step['offered_qps']:>8.0f} {step['achieved_qps']:>9.1f} {step['error_rate']:>7.1%} "
+              f"{step['p50_ms']:>8.1f} {step['p95_ms']:>8.1f} {step['p99_ms']:>8.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"target": args.target, "mix": args.mix, "duration": args.duration, "curve": curve}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
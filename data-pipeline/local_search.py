@@ -0,0 +1,225 @@
+import os
+import argparse
+import numpy as np
+from snapshot import load_snapshot, SNAPSHOT_DIR, VECTORS_NAME
+from track_schema import _split_list, parse_release_year
+from timing import Stopwatch, summarize, format_summary
+
+
+def inverse_norms(vectors, block_size=16384):
+    """1 / L2 norm of every row, computed in blocks so float16 memmaps are never fully upcast"""
+    norms = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), block_size):
+        block = np.asarray(vectors[start:start + block_size], dtype=np.float32)
+        norms[start:start + len(block)] = np.linalg.norm(block, axis=1)
+    norms[norms == 0] = 1.0
+    return 1.0 / norms
+
+
+def top_k(scores, k):
+    """Indices of the k highest scores per row, best first"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+class FilterColumns:
+    """Columnar copies of the filterable track properties.
+
+    Filters have the same arguments and the same meaning as the typed schema
+    filters in track_search.track_filters: genres match whole (lowercased)
+    genre values, years come from release_date.
+    """
+
+    def __init__(self, rows):
+        n = len(rows)
+        self.popularity = np.full(n, -1, dtype=np.int16)
+        self.release_year = np.full(n, -1, dtype=np.int16)
+        self.explicit = np.full(n, -1, dtype=np.int8)
+        self._genre_rows = {}
+
+        for i, row in enumerate(rows):
+            if row.get("popularity") is not None:
+                self.popularity[i] = int(row["popularity"])
+            year = row.get("release_year") or parse_release_year(row.get("release_date"))
+            if year is not None:
+                self.release_year[i] = year
+            if row.get("explicit") is not None:
+                self.explicit[i] = int(bool(row["explicit"]))
+            for genre in _split_list(row.get("genres")):
+                self._genre_rows.setdefault(genre.lower(), []).append(i)
+
+        self._genre_rows = {g: np.asarray(rows_, dtype=np.int64) for g, rows_ in self._genre_rows.items()}
+        self.size = n
+
+    def mask(self, genres=None, min_popularity=None, max_popularity=None, year_from=None, year_to=None, explicit=None):
+        """Boolean row mask for the filters, or None if no filter is set"""
+        mask = None
+
+        def combine(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if genres:
+            genre_mask = np.zeros(self.size, dtype=bool)
+            for genre in genres:
+                genre_mask[self._genre_rows.get(genre.lower(), [])] = True
+            combine(genre_mask)
+        if min_popularity is not None:
+            combine(self.popularity >= min_popularity)
+        if max_popularity is not None:
+            combine((self.popularity <= max_popularity) & (self.popularity >= 0))
+        if year_from is not None:
+            combine(self.release_year >= year_from)
+        if year_to is not None:
+            combine((self.release_year <= year_to) & (self.release_year >= 0))
+        if explicit is not None:
+            combine(self.explicit == int(explicit))
+        return mask
+
+
+class LocalSearchEngine:
+    """Exact cosine search over a (memory-mapped) embedding matrix.
+
+    Vectors may be float16 or float32; they are upcast block by block, so
+    memory use is bounded by block_size rows no matter how large the file
+    is. Distances are cosine distances (1 - similarity), the same values
+    Weaviate returns for near_vector on a cosine index.
+    """
+
+    def __init__(self, vectors, uuids, rows, block_size=16384):
+        self.vectors = vectors
+        self.uuids = uuids
+        self.rows = rows
+        self.block_size = block_size
+        self.inv_norms = inverse_norms(vectors, block_size)
+        self.filters = FilterColumns(rows)
+
+    @classmethod
+    def from_snapshot(cls, snapshot_dir, vectors_file=None, **kwargs):
+        """Load a snapshot.py export; vectors_file selects e.g. a float16 copy"""
+        uuids, rows, vectors = load_snapshot(snapshot_dir)
+        if vectors_file:
+            vectors = np.load(os.path.join(snapshot_dir, vectors_file), mmap_mode='r')
+        if vectors is None:
+            raise ValueError(f"Snapshot {snapshot_dir} was exported without vectors")
+        return cls(vectors, uuids, rows, **kwargs)
+
+    def search_indices(self, queries, k=10, **filters):
+        """(indices, distances) of the k nearest rows for each query row"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        mask = self.filters.mask(**filters)
+
+        best_idx = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.uuids), self.block_size):
+            block = np.asarray(self.vectors[start:start + self.block_size], dtype=np.float32)
+            scores = (queries @ block.T) * self.inv_norms[start:start + len(block)]
+            if mask is not None:
+                scores[:, ~mask[start:start + len(block)]] = -np.inf
+
+            # Top-k within the block, then merge the small candidate sets with the running top-k
+            block_top = top_k(scores, k)
+            candidates = np.concatenate([best_scores, np.take_along_axis(scores, block_top, axis=1)], axis=1)
+            candidate_idx = np.concatenate([best_idx, block_top + start], axis=1)
+            keep = top_k(candidates, k)
+            best_scores = np.take_along_axis(candidates, keep, axis=1)
+            best_idx = np.take_along_axis(candidate_idx, keep, axis=1)
+
+        valid = np.isfinite(best_scores)
+        return [idx[ok] for idx, ok in zip(best_idx, valid)], [1.0 - s[ok] for s, ok in zip(best_scores, valid)]
+
+    def search(self, queries, k=10, **filters):
+        """Batched near_vector: one result list of {uuid, distance, properties} per query"""
+        indices, distances = self.search_indices(queries, k, **filters)
+        return [
+            [{"uuid": self.uuids[i], "distance": float(d), "properties": self.rows[i]} for i, d in zip(idx, dist)]
+            for idx, dist in zip(indices, distances)
+        ]
+
+    def near_vector(self, vector, limit=10, **filters):
+        return self.search([vector], limit, **filters)[0]
+
+
+def write_float16(snapshot_dir, name="vectors_f16.npy", block_size=65536):
+    """Write a float16 copy of the snapshot vectors, halving memory and disk use"""
+    source = np.load(os.path.join(snapshot_dir, VECTORS_NAME), mmap_mode='r')
+    target = np.lib.format.open_memmap(os.path.join(snapshot_dir, name), mode='w+', dtype=np.float16, shape=source.shape)
+    for start in range(0, len(source), block_size):
+        target[start:start + block_size] = source[start:start + block_size]
+    target.flush()
+    return name
+
+
+def verify_against_weaviate(engine, collection, queries, k=10):
+    """Mean overlap of the local top-k with near_vector on the live collection"""
+    local = engine.search(queries, k)
+    overlap = []
+    for query, results in zip(queries, local):
+        response = collection.query.near_vector(near_vector=np.asarray(query, dtype=np.float32).tolist(), limit=k, return_properties=[])
+        remote = {str(obj.uuid) for obj in response.objects}
+        overlap.append(len(remote & {r["uuid"] for r in results}) / max(len(remote), 1))
+    return float(np.mean(overlap))
+
+
+def benchmark(engine, queries, k, batch_sizes):
+    """Queries/sec of the local engine for several query batch sizes"""
+    results = {}
+    for batch_size in batch_sizes:
+        samples = []
+        for start in range(0, len(queries), batch_size):
+            with Stopwatch() as sw:
+                engine.search_indices(queries[start:start + batch_size], k)
+            samples.append(sw.elapsed_ms)
+        results[batch_size] = (len(queries) / (sum(samples) / 1000), summarize(samples))
+    return results
+
+
+def main():
+    """Benchmark (and optionally verify) exact local search on a snapshot or synthetic vectors"""
+    parser = argparse.ArgumentParser(description="Offline exact vector search over memory-mapped embeddings")
+    parser.add_argument("--snapshot", default=os.path.join(SNAPSHOT_DIR, "Track"), help="snapshot.py export with vectors")
+    parser.add_argument("--float16", action="store_true", help="Search a float16 copy of the vectors")
+    parser.add_argument("--synthetic", type=int, help="Use N random vectors instead of a snapshot")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--verify", metavar="COLLECTION", help="Compare results with near_vector on this collection")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((args.synthetic, args.dimensions)).astype(np.float16 if args.float16 else np.float32)
+        engine = LocalSearchEngine(vectors, [str(i) for i in range(args.synthetic)], [{} for _ in range(args.synthetic)])
+    else:
+        vectors_file = None
+        if args.float16:
+            vectors_file = "vectors_f16.npy"
+            if not os.path.exists(os.path.join(args.snapshot, vectors_file)):
+                write_float16(args.snapshot, vectors_file)
+        engine = LocalSearchEngine.from_snapshot(args.snapshot, vectors_file)
+
+    rng = np.random.default_rng(1)
+    sample = rng.choice(len(engine.uuids), size=min(args.queries, len(engine.uuids)), replace=False)
+    queries = np.asarray(engine.vectors[np.sort(sample)], dtype=np.float32)
+    queries += rng.normal(scale=0.01, size=queries.shape).astype(np.float32)
+
+    print(f"📊 {len(engine.uuids)} vectors ({engine.vectors.shape[1]} dims, {engine.vectors.dtype}), top-{args.k}")
+    for batch_size, (qps, latency) in benchmark(engine, queries, args.k, args.batch_sizes).items():
+        print(f"batch {batch_size:>4}: {qps:>8.0f} queries/s")
+        print(format_summary(f"  per batch of {batch_size}", latency))
+
+    if args.verify:
+        from weaviate_client import get_client
+        collection = get_client().collections.get(args.verify)
+        overlap = verify_against_weaviate(engine, collection, queries[:50], args.k)
+        print(f"\n🔍 Overlap with Weaviate near_vector top-{args.k}: {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,9 @@
-import weaviate
-import weaviate.classes as wvc
-import weaviate.classes.config as wc
+import os
+import sys
 
-client = weaviate.connect_to_local()
-client.collections.delete(name="Book")
-print(client.is_connected())
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-questions = client.collections.create(
-    name="Book",
-    
-    vectorizer_config=wvc.config.Configure.Vectorizer.text2vec_ollama(model="snowflake-arctic-embed:latest", api_endpoint="http://host.docker.internal:11434"),
-    generative_config=wvc.config.Configure.Generative.ollama(api_endpoint="http://host.docker.internal:11434", model="llama3:latest"),
-    properties=[
-        wc.Property(name="title", data_type=wc.DataType.TEXT),
-        wc.Property(name="isbn10", data_type=wc.DataType.TEXT, skip_vectorization=True),
-        wc.Property(name="isbn13", data_type=wc.DataType.TEXT, skip_vectorization=True),
-        wc.Property(name="categories", data_type=wc.DataType.TEXT),
-        wc.Property(name="thumbnail", data_type=wc.DataType.TEXT, skip_vectorization=True),
-        wc.Property(name="description", data_type=wc.DataType.TEXT),
-        wc.Property(name="num_pages", data_type=wc.DataType.TEXT, skip_vectorization=True),
-        wc.Property(name="average_rating", data_type=wc.DataType.TEXT, skip_vectorization=True),
-        wc.Property(name="published_year", data_type=wc.DataType.TEXT, skip_vectorization=True),
-        wc.Property(name="authors", data_type=wc.DataType.TEXT, skip_vectorization=True),
-    ],
-)
+from book_loader import create_main
 
-client.close()
\ No newline at end of file
+# Recreates the book collection, see book_loader.py and index_profiles.py for options (--index-profile, ...)
+create_main(default_provider="local")
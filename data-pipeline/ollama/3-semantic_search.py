@@ -1,27 +1,42 @@
-import weaviate
-from weaviate.classes.init import AdditionalConfig, Timeout
+import os
+import sys
 
-client = weaviate.connect_to_local(additional_config=AdditionalConfig(
-    timeout=Timeout(init=2, query=200, insert=120)  # Values in seconds
-))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from weaviate_client import connect
+from search_cache import CachedSearch
+from query_embeddings import VectorSearch, query_embedder
+from weaviate.classes.init import Timeout
+
+client = connect("local", timeout=Timeout(init=2, query=200, insert=120))  # Values in seconds
 
 print(client.is_connected())
 
 book_collection = client.collections.get(name="Book")
 
-# Semantic Search
+# Semantic Search, repeated queries are answered from the cache and query
+# vectors are embedded once and reused across runs
+
+backend = VectorSearch(book_collection, query_embedder("local"))
+search = CachedSearch(book_collection, backend=backend)
+
+while True:
+    user_input = input("What query do you have for book recommendations? (empty to quit) ")
+    if not user_input.strip():
+        break
 
-user_input = input("What query do you have for book recommendations? ")
+    response = search.near_text(
+        query=user_input,
+        limit=3
+    )
 
-response = book_collection.query.near_text(
-    query=user_input,
-    limit=3
-)
+    print(f"Here are the recommended books for you based on your interest in {user_input}:")
+    for book in response.objects:
+        print(f"Book Title: {book.properties['title']}")
+        print(f"Book Description: {book.properties['description']}")
+        print('---\n\n\n')
 
-print(f"Here are the recommended books for you based on your interest in {user_input}:")
-for book in response.objects:
-    print(f"Book Title: {book.properties['title']}")
-    print(f"Book Description: {book.properties['description']}")
-    print('---\n\n\n')
+search.print_metrics()
+backend.print_breakdown()
 
-client.close()
\ No newline at end of file
+client.close()
@@ -1,30 +1,38 @@
-import weaviate
-from weaviate.classes.init import AdditionalConfig, Timeout
+import os
+import sys
 
-client = weaviate.connect_to_local(additional_config=AdditionalConfig(
-    timeout=Timeout(init=2, query=200, insert=120)  # Values in seconds
-))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from weaviate_client import connect
+from generative import GenerativeSearch
+from weaviate.classes.init import Timeout
+
+client = connect("local", timeout=Timeout(init=2, query=200, insert=120))  # Values in seconds
 
 print(client.is_connected())
 
 book_collection = client.collections.get(name="Book")
 
-# Generative Search
+# Generative Search, explanations are cached per book and prompt
 
-user_input = input("What query do you have for book recommendations? ")
+generative = GenerativeSearch(book_collection, "local")
 
+user_input = input("What query do you have for book recommendations? ")
 
-response = book_collection.generate.near_text(
-    query=user_input,
-    limit=2,
+books = generative.search(user_input, limit=2)
+explanations = generative.explain_each(
+    books,
     single_prompt="Explain why this book might be interesting to read. The book's title is {title}, with a description: {description}, and is in the genre: {categories}."
 )
 
 
 print(f"Here are the recommended books for you based on your interest in {user_input}:")
-for book in response.objects:
+for book, explanation in zip(books, explanations):
     print(f"Book Title: {book.properties['title']}")
     print(f"Book Description: {book.properties['description']}")
+    print(f"Why read it: {explanation}")
     print('---\n\n\n')
 
+generative.print_metrics()
+
 client.close()
@@ -1,23 +1,25 @@
 import os
-import weaviate
-from weaviate.classes.init import AdditionalConfig, Timeout
+import sys
 
-WEAVIATE_CLUSTER_URL = os.getenv('WEAVIATE_CLUSTER_URL') or 'https://zxzyqcyksbw7ozpm5yowa.c0.us-west2.gcp.weaviate.cloud'
-WEAVIATE_API_KEY = os.getenv('WEAVIATE_API_KEY') or 'n6mdfI32xrXF3DH76i8Pwc2IajzLZop2igb6'
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-client = weaviate.Client(
-    url=WEAVIATE_CLUSTER_URL,
-    auth_client_secret=weaviate.AuthApiKey(api_key=WEAVIATE_API_KEY),
-    additional_headers={"X-OpenAI-Api-Key": OPENAI_API_KEY})
+from weaviate_client import connect, api_key_headers
+from search_cache import CachedSearch
+from query_embeddings import VectorSearch, query_embedder
+
+client = connect("cloud", headers=api_key_headers(["X-OpenAI-Api-Key"]))
 
 print(client.is_connected())
 
 book_collection = client.collections.get(name="Book")
 
-# Semantic Search
+# Semantic Search, repeated queries are answered from the cache and query
+# vectors are embedded once and reused across runs
+
+backend = VectorSearch(book_collection, query_embedder("cloud"))
+search = CachedSearch(book_collection, backend=backend)
 
-response = book_collection.query.near_text(
+response = search.near_text(
     query="biology",
     limit=3
 )
@@ -28,3 +30,6 @@ for book in response.objects:
     print(book.properties['description'])
     print(book.properties['categories'])
     print('---')
+
+search.print_metrics()
+backend.print_breakdown()
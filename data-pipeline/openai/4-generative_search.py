@@ -1,31 +1,33 @@
 import os
-import weaviate
-from weaviate.classes.init import AdditionalConfig, Timeout
+import sys
 
-from dotenv import load_dotenv
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-load_dotenv()
+from weaviate_client import connect, api_key_headers
+from generative import GenerativeSearch
 
-WEAVIATE_CLUSTER_URL = os.getenv('WEAVIATE_CLUSTER_URL') or 'https://zxzyqcyksbw7ozpm5yowa.c0.us-west2.gcp.weaviate.cloud'
-WEAVIATE_API_KEY = os.getenv('WEAVIATE_API_KEY') or 'n6mdfI32xrXF3DH76i8Pwc2IajzLZop2igb6'
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-
-client = weaviate.Client(
-    url=WEAVIATE_CLUSTER_URL,
-    auth_client_secret=weaviate.AuthApiKey(api_key=WEAVIATE_API_KEY),
-    additional_headers={"X-OpenAI-Api-Key": OPENAI_API_KEY})
+client = connect("cloud", headers=api_key_headers(["X-OpenAI-Api-Key"]))
 
 print(client.is_connected())
 
 book_collection = client.collections.get(name="Book")
 
-# Generative Search
+# Generative Search, explanations are cached per book and prompt
+
+generative = GenerativeSearch(book_collection, "cloud")
 
-response = book_collection.generate.near_text(
-    query="technology, data structures and algorithms, distributed systems",
-    limit=2,
+books = generative.search("technology, data structures and algorithms, distributed systems", limit=2)
+explanations = generative.explain_each(
+    books,
     single_prompt="Explain why this book might be interesting to someone who likes playing the violin, rock climbing, and doing yoga. the book's title is {title}, with a description: {description}, and is in the genre: {categories}."
 )
 
 
-print(response.objects[0].generated)  # Inspect the first object
+print(explanations[0])  # Inspect the first object
+
+# The same books compared in a single LLM call, streamed as it is generated
+for chunk in generative.stream_group(books, "Which of these books would you read first, and why?"):
+    print(chunk, end="", flush=True)
+print()
+
+generative.print_metrics()
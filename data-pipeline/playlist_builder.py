@@ -0,0 +1,253 @@
+import os
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from scipy import sparse
+from recommender import Recommender, load_tracks_table, synthetic_table, benchmark_requests
+from timing import Stopwatch, summarize, format_summary
+
+DEFAULT_CANDIDATES = 10000
+METADATA_DIMENSIONS = 64
+
+
+def _gather_ranges(starts, ends):
+    """Concatenated np.arange(start, end) for every pair, without a Python loop"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    shift = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return np.arange(total) + shift
+
+
+class GroupColumn:
+    """Track -> group codes (artists, genres or album) in CSR form.
+
+    '; '-joined strings are split (list columns are used as they are),
+    values are trimmed and lowercased, and empty values belong to no group.
+    """
+
+    def __init__(self, column, split=True):
+        if isinstance(column, pa.ChunkedArray):
+            column = column.combine_chunks()
+        if not (pa.types.is_list(column.type) or pa.types.is_large_list(column.type)):
+            column = pc.fill_null(column.cast(pa.string()), "")
+            column = pc.split_pattern(column, ";") if split else pa.ListArray.from_arrays(
+                np.arange(len(column) + 1, dtype=np.int32), column)
+        values = pc.utf8_lower(pc.utf8_trim_whitespace(pc.list_flatten(column)))
+        parents = pc.list_parent_indices(column).to_numpy()
+        keep = pc.not_equal(values, "").to_numpy(zero_copy_only=False)
+        encoded = pc.dictionary_encode(values.filter(pa.array(keep)))
+        self.names = encoded.dictionary
+        self.codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+        self.offsets = np.searchsorted(parents[keep], np.arange(len(column) + 1))
+
+    def subset(self, rows):
+        """CandidateGroups for the given catalog rows"""
+        starts, ends = self.offsets[rows], self.offsets[rows + 1]
+        owner = np.repeat(np.arange(len(rows)), ends - starts)
+        return CandidateGroups(owner, self.codes[_gather_ranges(starts, ends)], len(rows))
+
+
+class CandidateGroups:
+    """Group memberships of a candidate list, with the candidates of each group for cap updates"""
+
+    def __init__(self, owner, codes, size):
+        local, self.codes = np.unique(codes, return_inverse=True) if len(codes) else (codes, codes)
+        self.count = len(local)
+        self.offsets = np.searchsorted(owner, np.arange(size + 1))
+        order = np.argsort(self.codes, kind='stable')
+        self.members = owner[order]
+        self.member_offsets = np.searchsorted(self.codes[order], np.arange(self.count + 1))
+
+    def of(self, candidate):
+        return self.codes[self.offsets[candidate]:self.offsets[candidate + 1]]
+
+    def members_of(self, group):
+        return self.members[self.member_offsets[group]:self.member_offsets[group + 1]]
+
+
+def metadata_vectors(groups, dimensions=METADATA_DIMENSIONS, seed=0):
+    """Candidate vectors from shared artists and genres, for catalogs without embeddings.
+
+    Each group gets a fixed random direction and a track is the normalized
+    sum of its groups' directions (random indexing), so the cosine of two
+    tracks approximates their overlap in artists and genres.
+    """
+    size = len(groups[0].offsets) - 1
+    vectors = np.zeros((size, dimensions), dtype=np.float32)
+    for i, g in enumerate(groups):
+        directions = np.random.default_rng(seed + i).standard_normal((g.count, dimensions)).astype(np.float32)
+        membership = sparse.csr_matrix((np.ones(len(g.codes), dtype=np.float32), g.codes, g.offsets),
+                                       shape=(size, g.count))
+        vectors += membership @ directions
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _caps_exceeded(caps, candidate, counts, eligible):
+    for (groups, cap), count in zip(caps, counts):
+        for group in groups.of(candidate):
+            count[group] += 1
+            if count[group] >= cap:
+                eligible[groups.members_of(group)] = False
+
+
+def mmr_select(vectors, relevance, size, diversity=0.3, caps=()):
+    """Greedy maximal marginal relevance with group caps, vectorized over the candidates.
+
+    A candidate's score is (1 - diversity) * relevance - diversity * (its
+    highest cosine similarity to a selected track, floored at 0); each pick
+    costs one matrix-vector product against the unit-length vectors. caps
+    is a list of (CandidateGroups, max tracks per group) and candidates
+    whose groups are full are dropped from the running.
+    """
+    base = (1.0 - diversity) * np.asarray(relevance, dtype=np.float64)
+    max_sim = np.zeros(len(base), dtype=np.float32)
+    eligible = np.ones(len(base), dtype=bool)
+    counts = [np.zeros(groups.count, dtype=np.int64) for groups, _ in caps]
+    selected = []
+    while len(selected) < size:
+        scores = np.where(eligible, base - diversity * max_sim, -np.inf)
+        best = int(np.argmax(scores))
+        if scores[best] == -np.inf:
+            break
+        selected.append(best)
+        eligible[best] = False
+        _caps_exceeded(caps, best, counts, eligible)
+        np.maximum(max_sim, vectors @ vectors[best], out=max_sim)
+    return np.asarray(selected, dtype=np.int64)
+
+
+class PlaylistBuilder:
+    """Diverse playlists from the track artifact, optionally with embeddings.
+
+    Candidates come from the Recommender's scoring (the fast-recommendations
+    ranking), are reranked with MMR, and no artist, album or genre may
+    exceed its cap. vectors, aligned with the table rows, are used for
+    similarity when given; otherwise metadata_vectors stand in.
+    """
+
+    def __init__(self, table, vectors=None):
+        self.table = table
+        self.vectors = vectors
+        self.recommender = Recommender(table)
+        self.artists = GroupColumn(table.column("artists"))
+        self.genres = GroupColumn(table.column("genres"))
+        self.albums = GroupColumn(table.column("album"), split=False)
+
+    def candidates(self, query, user_interests="", favorite_songs="", exclude_favorite_artists=False,
+                   limit=DEFAULT_CANDIDATES):
+        """(catalog rows, relevance scaled to [0, 1]) of the best `limit` tracks for a request"""
+        rows = self.recommender.recommend_indices(query, user_interests, favorite_songs, exclude_favorite_artists, limit)
+        scores = self.recommender.scores(query, user_interests)[rows]
+        spread = scores.max() - scores.min() if len(scores) else 0.0
+        return rows, (scores - scores.min()) / spread if spread else np.ones(len(rows))
+
+    def rerank(self, rows, relevance, size=100, diversity=0.3, max_per_artist=2, max_per_album=2,
+               max_genre_share=0.4):
+        """Catalog rows of a `size` track playlist picked from the candidate rows"""
+        artists, genres, albums = self.artists.subset(rows), self.genres.subset(rows), self.albums.subset(rows)
+        if self.vectors is not None:
+            vectors = np.asarray(self.vectors[np.sort(rows)], dtype=np.float32)[np.argsort(np.argsort(rows))]
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        else:
+            vectors = metadata_vectors([artists, genres])
+        caps = [(artists, max_per_artist), (albums, max_per_album),
+                (genres, max(1, math.ceil(max_genre_share * size)))]
+        return rows[mmr_select(vectors, relevance, size, diversity, caps)]
+
+    def build(self, query, user_interests="", favorite_songs="", exclude_favorite_artists=False, size=100,
+              candidates=DEFAULT_CANDIDATES, **rerank_kwargs):
+        """A playlist for one request, as track dicts"""
+        rows, relevance = self.candidates(query, user_interests, favorite_songs, exclude_favorite_artists, candidates)
+        picked = self.rerank(rows, relevance, size, **rerank_kwargs)
+        return self.table.take(pa.array(picked, type=pa.int64())).to_pylist()
+
+
+_worker_builder = None
+
+
+def _init_worker(table, vectors):
+    global _worker_builder
+    _worker_builder = PlaylistBuilder(table, vectors)
+
+
+def _build_ids(task):
+    request, kwargs = task
+    return [track["spotify_id"] for track in _worker_builder.build(**request, **kwargs)]
+
+
+def build_playlists(table, requests, vectors=None, processes=None, **kwargs):
+    """Playlists (lists of spotify_ids) for many requests, spread over worker processes.
+
+    Each worker builds its own PlaylistBuilder once, then handles a share
+    of the requests; kwargs are passed to PlaylistBuilder.build.
+    """
+    processes = processes or os.cpu_count() or 1
+    tasks = [(request, kwargs) for request in requests]
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(table, vectors)) as pool:
+        return list(pool.map(_build_ids, tasks, chunksize=max(1, len(tasks) // (4 * processes))))
+
+
+def artist_spread(table, rows):
+    """(distinct artists, most tracks by one artist) of a playlist"""
+    counts = {}
+    for artists in table.column("artists").take(pa.array(rows, type=pa.int64())).to_pylist():
+        for artist in str(artists or "").split(";"):
+            if artist.strip():
+                counts[artist.strip().lower()] = counts.get(artist.strip().lower(), 0) + 1
+    return len(counts), max(counts.values(), default=0)
+
+
+def main():
+    """Latency and diversity of MMR playlists compared with taking the top hits"""
+    parser = argparse.ArgumentParser(description="Diversity-aware playlist builder benchmark")
+    parser.add_argument("--tracks", help="JSON, CSV or Parquet track file (default: the API's database)")
+    parser.add_argument("--catalog", type=int, default=120000, help="Scale the tracks up to this many rows")
+    parser.add_argument("--dimensions", type=int, default=0,
+                        help="Use synthetic embeddings of this size instead of metadata vectors")
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES)
+    parser.add_argument("--diversity", type=float, default=0.3)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    table = synthetic_table(load_tracks_table(args.tracks), args.catalog)
+    vectors = None
+    if args.dimensions:
+        from ann_index import clustered_vectors
+        vectors = clustered_vectors(len(table), args.dimensions)
+    builder = PlaylistBuilder(table, vectors)
+    requests = benchmark_requests(args.queries)
+    rerank_kwargs = {"size": args.size, "diversity": args.diversity}
+
+    timings = {"candidates": [], "mmr rerank": []}
+    spread = {"top hits": [], "mmr": []}
+    for request in requests:
+        with Stopwatch() as sw:
+            rows, relevance = builder.candidates(**request, limit=args.candidates)
+        timings["candidates"].append(sw.elapsed_ms)
+        with Stopwatch() as sw:
+            picked = builder.rerank(rows, relevance, **rerank_kwargs)
+        timings["mmr rerank"].append(sw.elapsed_ms)
+        spread["top hits"].append(artist_spread(table, rows[:args.size]))
+        spread["mmr"].append(artist_spread(table, picked))
+
+    vector_label = f"{args.dimensions}-d embeddings" if args.dimensions else "metadata vectors"
+    print(f"📊 {args.size}-track playlists from {args.candidates} candidates, {len(table)} tracks, {vector_label}")
+    for label, samples in timings.items():
+        print(format_summary(label, summarize(samples)))
+    for label, values in spread.items():
+        distinct, most = zip(*values)
+        print(f"{label:<10} {np.mean(distinct):>6.1f} distinct artists, up to {max(most)} tracks by one artist")
+
+    for processes in sorted({1, args.processes}):
+        with Stopwatch() as sw:
+            build_playlists(table, requests, vectors, processes=processes, candidates=args.candidates, **rerank_kwargs)
+        print(f"batch of {len(requests)} with {processes} process(es): {len(requests) / (sw.elapsed_ms / 1000):.1f} playlists/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,16 @@
 import weaviate
 import pandas as pd
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv('../.env.local')
-
-# Weaviate configuration
-WEAVIATE_CLUSTER_URL = os.getenv('WEAVIATE_CLUSTER_URL')
-WEAVIATE_API_KEY = os.getenv('WEAVIATE_API_KEY')
-
-if not WEAVIATE_CLUSTER_URL or not WEAVIATE_API_KEY:
-    print("Error: WEAVIATE_CLUSTER_URL and WEAVIATE_API_KEY must be set in environment variables")
-    exit(1)
+import argparse
+from weaviate_client import connect
+from ingestion import IngestionCheckpoint, ingest_rows
+from index_profiles import vector_index_config, add_index_profile_argument
 
 def create_weaviate_client():
     """Create and return a Weaviate client"""
-    client = weaviate.connect_to_weaviate_cloud(
-        cluster_url=WEAVIATE_CLUSTER_URL,
-        auth_credentials=weaviate.auth.AuthApiKey(api_key=WEAVIATE_API_KEY)
-    )
-    return client
+    return connect("cloud")
 
-def create_track_collection(client):
+def create_track_collection(client, index_profile=None):
     """Create the Track collection in Weaviate"""
     try:
         # Check if collection already exists
@@ -115,17 +103,18 @@ def create_track_collection(client):
                 weaviate.classes.config.Property(name="release_date", data_type=weaviate.classes.config.DataType.TEXT),
                 weaviate.classes.config.Property(name="preview_url", data_type=weaviate.classes.config.DataType.TEXT),
                 weaviate.classes.config.Property(name="track_url", data_type=weaviate.classes.config.DataType.TEXT),
-                weaviate.classes.config.Property(name="explicit", data_type=weaviate.classes.config.DataType.BOOLEAN),
+                weaviate.classes.config.Property(name="explicit", data_type=weaviate.classes.config.DataType.BOOL),
                 weaviate.classes.config.Property(name="album_image_url", data_type=weaviate.classes.config.DataType.TEXT)
             ],
-            vectorizer_config=weaviate.classes.config.Configure.Vectorizer.text2vec_openai() if os.getenv('OPENAI_API_KEY') else None
+            vectorizer_config=weaviate.classes.config.Configure.Vectorizer.text2vec_openai() if os.getenv('OPENAI_API_KEY') else None,
+            vector_index_config=vector_index_config(index_profile)
         )
         print("Track collection created successfully!")
         
     except Exception as e:
         print(f"Error creating Track collection: {e}")
 
-def populate_tracks(client):
+def populate_tracks(client, resume=False):
     """Populate the Track collection with data from CSV"""
     try:
         # Read the CSV file
@@ -156,35 +145,34 @@ def populate_tracks(client):
             }
             tracks.append(track)
         
-        # Batch insert tracks
-        batch_size = 100
-        for i in range(0, len(tracks), batch_size):
-            batch = tracks[i:i + batch_size]
-            
-            with track_collection.batch.dynamic() as batch_client:
-                for track in batch:
-                    batch_client.add_object(
-                        properties=track
-                    )
-            
-            print(f"Inserted tracks {i+1} to {min(i+batch_size, len(tracks))}")
+        # Batch insert tracks, checkpointing after every committed chunk
+        checkpoint = IngestionCheckpoint("Track", csv_path)
+        inserted, failed = ingest_rows(track_collection, tracks, checkpoint, uuid_key="spotify_id", resume=resume)
         
-        print(f"Successfully populated {len(tracks)} tracks!")
+        print(f"Successfully populated {inserted} tracks!")
+        if failed:
+            print(f"{failed} tracks failed, see {checkpoint.dead_letter_path}")
         
     except Exception as e:
         print(f"Error populating tracks: {e}")
+        print("Re-run with --resume to continue from the last checkpoint.")
 
 def main():
     """Main function to create collection and populate with data"""
+    parser = argparse.ArgumentParser(description="Create and populate the Track collection")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint and retry dead letters")
+    add_index_profile_argument(parser)
+    args = parser.parse_args()
+    
     print("Connecting to Weaviate...")
     client = create_weaviate_client()
     
     try:
         print("Creating Track collection...")
-        create_track_collection(client)
+        create_track_collection(client, index_profile=args.index_profile)
         
         print("Populating tracks...")
-        populate_tracks(client)
+        populate_tracks(client, resume=args.resume)
         
         print("Done!")
     finally:
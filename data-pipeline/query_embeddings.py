@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import threading
+import numpy as np
+from search_cache import normalize_query
+from timing import Stopwatch, summarize, format_summary
+
+EMBEDDING_CACHE_PATH = os.path.join(os.path.dirname(__file__), 'cache', 'query_embeddings.sqlite')
+
+
+class EmbeddingCache:
+    """Query vectors keyed by (model, normalized text), persisted in SQLite.
+
+    Lookups are served from memory after the first hit; every new vector is
+    written through to disk so later runs start warm.
+    """
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text))"
+        )
+        self._db.commit()
+
+    def get(self, model, text):
+        key = (model, normalize_query(text))
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is None:
+                row = self._db.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND text = ?", key,
+                ).fetchone()
+                if row is None:
+                    return None
+                vector = np.frombuffer(row[0], dtype=np.float32)
+                self._memory[key] = vector
+            return vector
+
+    def put_many(self, model, texts, vectors):
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = (model, normalize_query(text))
+                vector = np.asarray(vector, dtype=np.float32)
+                self._memory[key] = vector
+                rows.append(key + (vector.tobytes(),))
+            self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._db.commit()
+
+    def put(self, model, text, vector):
+        self.put_many(model, [text], [vector])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+class OpenAIEmbedder:
+    """Client-side OpenAI embeddings, matching the text2vec_openai collections"""
+
+    def __init__(self, model="text-embedding-3-small"):
+        from openai import OpenAI
+        self.model = model
+        self._client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    def embed_many(self, texts):
+        response = self._client.embeddings.create(model=self.model, input=list(texts))
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+class OllamaEmbedder:
+    """Client-side Ollama embeddings, matching the text2vec_ollama collections"""
+
+    def __init__(self, model="snowflake-arctic-embed:latest", host=None):
+        import ollama
+        self.model = model
+        self._client = ollama.Client(host=host or os.getenv('OLLAMA_HOST', 'http://localhost:11434'))
+
+    def embed_many(self, texts):
+        return [self._client.embeddings(model=self.model, prompt=text)["embedding"] for text in texts]
+
+
+# Query embedders per book_loader provider. The models must match the
+# collection's vectorizer or near_vector searches a different space.
+# Weaviate embeddings only run inside the cluster, so the friendliai
+# provider has no client-side embedder and keeps using near_text.
+QUERY_EMBEDDERS = {
+    "local": lambda: OllamaEmbedder(),
+    "cloud": lambda: OpenAIEmbedder(),
+    "friendliai": None,
+}
+
+
+class CachedEmbedder:
+    """Embeds query text once per (model, normalized text)"""
+
+    def __init__(self, embedder, cache=None):
+        self.embedder = embedder
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        return self.embedder.model
+
+    def embed_many(self, texts):
+        vectors = [self.cache.get(self.model, text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        # Embed each distinct missing text once, even if it repeats in the batch
+        unique = list(dict.fromkeys(normalize_query(texts[i]) for i in missing))
+        self.hits += len(texts) - len(unique)
+        self.misses += len(unique)
+        if unique:
+            self.cache.put_many(self.model, unique, self.embedder.embed_many(unique))
+            for i in missing:
+                vectors[i] = self.cache.get(self.model, texts[i])
+        return vectors
+
+    def embed(self, text):
+        return self.embed_many([text])[0]
+
+
+def query_embedder(provider, cache=None):
+    """CachedEmbedder for a book_loader provider, or None if it can only embed server-side"""
+    factory = QUERY_EMBEDDERS.get(provider)
+    return CachedEmbedder(factory(), cache) if factory else None
+
+
+class VectorSearch:
+    """Query backend that embeds the query itself and searches with near_vector.
+
+    Exposes the same near_text/hybrid/bm25 signatures as collection.query so
+    it can be passed as the backend of search_cache.CachedSearch. Without an
+    embedder every call goes straight to collection.query.
+    """
+
+    def __init__(self, collection, embedder=None):
+        self.collection = collection
+        self.embedder = embedder
+        self.embed_latencies = []
+        self.search_latencies = []
+
+    def _timed_search(self, fn, **kwargs):
+        with Stopwatch() as sw:
+            response = fn(**kwargs)
+        self.search_latencies.append(sw.elapsed_ms)
+        return response
+
+    def _embed(self, query):
+        with Stopwatch() as sw:
+            vector = self.embedder.embed(query)
+        self.embed_latencies.append(sw.elapsed_ms)
+        return vector.tolist()
+
+    def near_text(self, query, limit=10, filters=None, return_properties=None, **kwargs):
+        if self.embedder is None:
+            return self._timed_search(
+                self.collection.query.near_text, query=query, limit=limit,
+                filters=filters, return_properties=return_properties, **kwargs,
+            )
+        return self._timed_search(
+            self.collection.query.near_vector, near_vector=self._embed(query), limit=limit,
+            filters=filters, return_properties=return_properties, **kwargs,
+        )
+
+    def hybrid(self, query, limit=10, filters=None, return_properties=None, **kwargs):
+        if self.embedder is not None:
+            kwargs["vector"] = self._embed(query)
+        return self._timed_search(
+            self.collection.query.hybrid, query=query, limit=limit,
+            filters=filters, return_properties=return_properties, **kwargs,
+        )
+
+    def bm25(self, query, limit=10, filters=None, return_properties=None, **kwargs):
+        return self._timed_search(
+            self.collection.query.bm25, query=query, limit=limit,
+            filters=filters, return_properties=return_properties, **kwargs,
+        )
+
+    def print_breakdown(self):
+        """Where the time of the uncached searches went"""
+        if self.embedder is None:
+            print("⏱️  Query embedding runs inside Weaviate for this collection")
+        else:
+            print(f"⏱️  Query embeddings: {self.embedder.hits} cached, {self.embedder.misses} computed with {self.embedder.model}")
+            print(format_summary("embedding", summarize(self.embed_latencies)))
+        print(format_summary("search", summarize(self.search_latencies)))
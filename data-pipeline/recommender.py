@@ -0,0 +1,388 @@
+import os
+import re
+import json
+import argparse
+from collections import OrderedDict
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from timing import Stopwatch, summarize, format_summary
+
+TRACKS_DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'tracks_database.json')
+SAMPLE_DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'tracks_database_sample.json')
+
+# Same weights as pages/api/fast-recommendations.ts: a whole search term
+# found in a field, then each word (longer than 2 characters) of the term
+TERM_WEIGHTS = {"name": 10, "artists": 8, "genres": 6, "album": 4}
+WORD_WEIGHTS = {"name": 3, "artists": 2, "genres": 1}
+MIN_WORD_LENGTH = 3
+RESULT_LIMIT = 100
+
+_FAVORITE_SEPARATORS = re.compile(r"[,\s]+")
+
+
+def load_tracks_table(path=None):
+    """Tracks as an Arrow table from a JSON database, CSV or Parquet file.
+
+    Without a path this follows the API: tracks_database.json, falling back
+    to the sample database.
+    """
+    if path is None:
+        path = TRACKS_DATABASE_PATH if os.path.exists(TRACKS_DATABASE_PATH) else SAMPLE_DATABASE_PATH
+    if path.endswith(".json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            return pa.Table.from_pylist(json.load(f))
+    if path.endswith(".parquet"):
+        return pq.read_table(path)
+    return pa_csv.read_csv(path)
+
+
+def search_terms(query, user_interests=""):
+    terms = [query.lower()]
+    if user_interests:
+        terms.append(user_interests.lower())
+    return terms
+
+
+def favorite_names(text):
+    """Split a comma/space separated favorites string the way the API does"""
+    return [name for name in _FAVORITE_SEPARATORS.split(text.lower()) if name.strip()]
+
+
+def _substrings(text):
+    return {text[i:j] for i in range(len(text) + 1) for j in range(i, len(text) + 1)}
+
+
+class TrigramIndex:
+    """Byte-trigram postings over the values of a string array.
+
+    A value can only contain a pattern if it contains all of the pattern's
+    trigrams, so a lookup verifies just the values in the shortest posting
+    list instead of scanning every value. Built with NumPy straight from
+    the Arrow offsets and data buffers; UTF-8 keeps byte substrings and
+    character substrings equivalent.
+    """
+
+    def __init__(self, array):
+        offsets = np.frombuffer(array.buffers()[1], dtype=np.int32)[array.offset:array.offset + len(array) + 1]
+        data = np.frombuffer(array.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+        owner = np.repeat(np.arange(len(array), dtype=np.uint64), np.diff(offsets))
+        # Trigrams starting at every byte, minus the ones running into the next value
+        same_value = owner[:-2] == owner[2:] if len(data) > 2 else np.zeros(0, dtype=bool)
+        codes = _trigram_codes(data)[same_value]
+        pairs = (codes.astype(np.uint64) << np.uint64(32)) | owner[:-2][same_value]
+        pairs.sort()
+        pairs = pairs[_first_of_runs(pairs)]
+        keys = (pairs >> np.uint64(32)).astype(np.uint32)
+        starts = np.flatnonzero(_first_of_runs(keys))
+        self.keys = keys[starts]
+        self.offsets = np.append(starts, len(pairs))
+        self.values = (pairs & np.uint64(0xFFFFFFFF)).astype(np.int32)
+
+    def candidates(self, pattern):
+        """Sorted indices of the values that contain every trigram of pattern, or None if it is too short"""
+        encoded = np.frombuffer(pattern.encode('utf-8'), dtype=np.uint8)
+        if len(encoded) < 3:
+            return None
+        smallest = None
+        for code in set(_trigram_codes(encoded).tolist()):
+            i = np.searchsorted(self.keys, code)
+            if i == len(self.keys) or self.keys[i] != code:
+                return np.empty(0, dtype=np.int32)
+            postings = self.values[self.offsets[i]:self.offsets[i + 1]]
+            if smallest is None or len(postings) < len(smallest):
+                smallest = postings
+        return smallest
+
+
+def _first_of_runs(sorted_values):
+    """Mask of the first element of every run of equal values (np.unique is much slower on large arrays)"""
+    first = np.ones(len(sorted_values), dtype=bool)
+    first[1:] = sorted_values[1:] != sorted_values[:-1]
+    return first
+
+
+def _trigram_codes(data):
+    data = data.astype(np.uint32)
+    return (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+
+
+class TextColumn:
+    """A lowercased, dictionary-encoded text column.
+
+    Substring tests run once per distinct value and are broadcast to rows
+    through the dictionary codes, so repeated artists, albums and genre
+    strings are only scanned once. Dictionaries with at least index_size
+    values (track names, mostly) also get a TrigramIndex.
+    """
+
+    def __init__(self, array, index_size=50000):
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        if pa.types.is_list(array.type) or pa.types.is_large_list(array.type):
+            array = pc.binary_join(array, "; ")
+        encoded = pc.dictionary_encode(pc.utf8_lower(pc.fill_null(array.cast(pa.string()), "")))
+        self.dictionary = encoded.dictionary
+        self.codes = encoded.indices.to_numpy(zero_copy_only=False)
+        self.index = TrigramIndex(self.dictionary) if len(self.dictionary) >= index_size else None
+
+    def contains(self, pattern):
+        """Per distinct value: does it contain pattern"""
+        candidates = self.index.candidates(pattern) if self.index is not None else None
+        if candidates is None or len(candidates) > len(self.dictionary) // 4:
+            return pc.match_substring(self.dictionary, pattern).to_numpy(zero_copy_only=False)
+        found = np.zeros(len(self.dictionary), dtype=bool)
+        if len(candidates):
+            matched = pc.match_substring(self.dictionary.take(pa.array(candidates)), pattern)
+            found[candidates[matched.to_numpy(zero_copy_only=False)]] = True
+        return found
+
+    def contained_in(self, text):
+        """Per distinct value: is it a substring of text"""
+        return pc.is_in(self.dictionary, value_set=pa.array(sorted(_substrings(text)))).to_numpy(zero_copy_only=False)
+
+    def rows(self, values):
+        return values[self.codes]
+
+
+class Recommender:
+    """Columnar port of the fast-recommendations API scoring.
+
+    Every track gets +10/+8/+6/+4 for each search term found in its name,
+    artists, genres or album, +3/+2/+1 for each longer word of a term found
+    in its name, artists or genres, plus popularity / 100. Favorite songs
+    (and optionally favorite artists) are excluded, and the top tracks are
+    returned in the same order as the API's stable sort. Substring masks are
+    kept in a small LRU cache, so batches of related queries share work.
+    With a catalog (catalog_tables.CatalogTables of the same tracks),
+    favorite artists are matched against the artists table and excluded
+    through the integer artist keys.
+    """
+
+    def __init__(self, table, cache_size=64, catalog=None):
+        self.table = table
+        self.catalog = catalog
+        self.columns = {name: TextColumn(table.column(name)) for name in TERM_WEIGHTS}
+        popularity = pc.fill_null(table.column("popularity").cast(pa.float64()), 0.0)
+        self.popularity_boost = popularity.to_numpy() / 100
+        self.cache_size = cache_size
+        self._masks = OrderedDict()
+
+    @classmethod
+    def from_path(cls, path=None, **kwargs):
+        """Load a track file, with the catalog/ tables next to it if they describe the same tracks"""
+        table = load_tracks_table(path)
+        path = path or (TRACKS_DATABASE_PATH if os.path.exists(TRACKS_DATABASE_PATH) else SAMPLE_DATABASE_PATH)
+        catalog_dir = os.path.join(os.path.dirname(os.path.abspath(path)), 'catalog')
+        if "catalog" not in kwargs and os.path.isdir(catalog_dir):
+            from catalog_tables import CatalogTables
+            catalog = CatalogTables.load(catalog_dir)
+            if catalog.matches(table.column("spotify_id").cast(pa.string()).to_pylist()):
+                kwargs["catalog"] = catalog
+            else:
+                print(f"⚠️ {catalog_dir} is from another track file, matching artists by substring")
+        return cls(table, **kwargs)
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def _contains(self, field, pattern):
+        key = (field, pattern)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self.columns[field].contains(pattern)
+            self._masks[key] = mask
+            if len(self._masks) > self.cache_size:
+                self._masks.popitem(last=False)
+        else:
+            self._masks.move_to_end(key)
+        return mask
+
+    def scores(self, query, user_interests=""):
+        """Relevance score of every track, identical to the API's"""
+        per_value = {field: np.zeros(len(column.dictionary), dtype=np.int32) for field, column in self.columns.items()}
+        for term in search_terms(query, user_interests):
+            for field, weight in TERM_WEIGHTS.items():
+                per_value[field] += weight * self._contains(field, term)
+            for word in term.split(' '):
+                if len(word) >= MIN_WORD_LENGTH:
+                    for field, weight in WORD_WEIGHTS.items():
+                        per_value[field] += weight * self._contains(field, word)
+
+        scores = np.zeros(len(self), dtype=np.float64)
+        for field, values in per_value.items():
+            if values.any():
+                scores += self.columns[field].rows(values)
+        return scores + self.popularity_boost
+
+    def excluded(self, user_interests="", favorite_songs="", exclude_favorite_artists=False):
+        """Mask of tracks removed as favorite songs or favorite artists, or None"""
+        rules = []
+        mask = None
+        if favorite_songs:
+            rules.append(("name", favorite_names(favorite_songs)))
+        if exclude_favorite_artists and user_interests:
+            names = favorite_names(user_interests)
+            # A ';' in a name can span two credits, which only the joined string has
+            if self.catalog is not None and not any(";" in name for name in names):
+                mask = self.catalog.favorite_artist_tracks(names)
+            else:
+                rules.append(("artists", names))
+
+        for field, names in rules:
+            column = self.columns[field]
+            hit = np.zeros(len(column.dictionary), dtype=bool)
+            for name in names:
+                hit |= self._contains(field, name) | column.contained_in(name)
+            rows = column.rows(hit)
+            mask = rows if mask is None else mask | rows
+        return mask
+
+    def recommend_indices(self, query, user_interests="", favorite_songs="", exclude_favorite_artists=False,
+                          limit=RESULT_LIMIT):
+        """Row indices of the top tracks, best first, ties in table order"""
+        scores = self.scores(query, user_interests)
+        candidates = np.arange(len(scores))
+        excluded = self.excluded(user_interests, favorite_songs, exclude_favorite_artists)
+        if excluded is not None:
+            candidates = candidates[~excluded]
+            scores = scores[candidates]
+        if len(scores) > limit:
+            # Everything scoring at least the limit-th best score, still in table order
+            threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+        return candidates[np.argsort(-scores, kind='stable')[:limit]]
+
+    def recommend(self, query, user_interests="", favorite_songs="", exclude_favorite_artists=False,
+                  limit=RESULT_LIMIT):
+        """Top tracks as dicts, like the API response"""
+        indices = self.recommend_indices(query, user_interests, favorite_songs, exclude_favorite_artists, limit)
+        return self.table.take(pa.array(indices, type=pa.int64())).to_pylist()
+
+    def recommend_many(self, requests, limit=RESULT_LIMIT):
+        """Recommendations for a list of request dicts with recommend's keyword arguments"""
+        return [self.recommend(limit=limit, **request) for request in requests]
+
+
+def naive_recommend(tracks, query, user_interests="", favorite_songs="", exclude_favorite_artists=False,
+                    limit=RESULT_LIMIT):
+    """Line-by-line Python port of the API's searchTracks, as the correctness and speed baseline"""
+    terms = search_terms(query, user_interests)
+    scored = []
+    for track in tracks:
+        score = 0
+        name = (track.get("name") or "").lower()
+        artists = (track.get("artists") or "").lower()
+        genres = (track.get("genres") or "").lower()
+        album = (track.get("album") or "").lower()
+        for term in terms:
+            if term in name:
+                score += 10
+            if term in artists:
+                score += 8
+            if term in genres:
+                score += 6
+            if term in album:
+                score += 4
+            for word in term.split(' '):
+                if len(word) > 2:
+                    if word in name:
+                        score += 3
+                    if word in artists:
+                        score += 2
+                    if word in genres:
+                        score += 1
+        score += (track.get("popularity") or 0) / 100
+        scored.append((track, score))
+
+    if favorite_songs:
+        names = favorite_names(favorite_songs)
+        scored = [(t, s) for t, s in scored
+                  if not any(n in (t.get("name") or "").lower() or (t.get("name") or "").lower() in n for n in names)]
+    if exclude_favorite_artists and user_interests:
+        names = favorite_names(user_interests)
+        scored = [(t, s) for t, s in scored
+                  if not any(n in (t.get("artists") or "").lower() or (t.get("artists") or "").lower() in n for n in names)]
+
+    scored.sort(key=lambda item: -item[1])
+    return [track for track, _ in scored[:limit]]
+
+
+def synthetic_table(base, size):
+    """Scale a track table up to `size` rows by repeating it.
+
+    Repeated rows get a unique spotify_id and a version suffix on the name,
+    so names stay mostly distinct while artists, albums and genres repeat
+    like they do in the real catalog.
+    """
+    rows = np.arange(size) % base.num_rows
+    table = base.take(pa.array(rows))
+    copies = np.arange(size) // base.num_rows
+    suffix = pa.array([f" (take {c})" if c else "" for c in copies])
+    names = pc.binary_join_element_wise(pc.fill_null(table.column("name").cast(pa.string()), ""), suffix, "")
+    ids = pc.binary_join_element_wise(table.column("spotify_id").cast(pa.string()),
+                                      pa.array([f"-{c}" if c else "" for c in copies]), "")
+    table = table.set_column(table.schema.get_field_index("name"), "name", names)
+    return table.set_column(table.schema.get_field_index("spotify_id"), "spotify_id", ids)
+
+
+def benchmark_requests(count, seed=0):
+    """Recommendation requests shaped like the UI's: a query, interests and a few favorite songs"""
+    from search_benchmark import load_golden, TRACK_GENRES
+    rng = np.random.default_rng(seed)
+    queries = [q["query"] for q in load_golden()["suites"]["tracks"]["queries"]]
+    requests = []
+    for i in range(count):
+        requests.append({
+            "query": queries[rng.integers(len(queries))],
+            "user_interests": TRACK_GENRES[rng.integers(len(TRACK_GENRES))] if i % 2 else "",
+            "favorite_songs": queries[rng.integers(len(queries))].split()[0] if i % 3 == 0 else "",
+            "exclude_favorite_artists": i % 4 == 1,
+        })
+    return requests
+
+
+def main():
+    """Check the vectorized recommender against the naive loop and compare their speed"""
+    parser = argparse.ArgumentParser(description="Vectorized fast-recommendations scoring benchmark")
+    parser.add_argument("--tracks", help="JSON, CSV or Parquet track file (default: the API's database)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[120000, 1000000])
+    parser.add_argument("--queries", type=int, default=50, help="Requests for the vectorized recommender")
+    parser.add_argument("--naive-queries", type=int, default=3, help="Requests for the naive loop (it is slow)")
+    args = parser.parse_args()
+
+    base = load_tracks_table(args.tracks)
+    requests = benchmark_requests(args.queries)
+    for size in args.sizes:
+        table = synthetic_table(base, size)
+        with Stopwatch() as build:
+            recommender = Recommender(table)
+        tracks = table.to_pylist()
+        print(f"\n📊 {size} tracks (columns encoded in {build.elapsed_ms:.0f}ms)")
+
+        naive_samples, fast_samples = [], []
+        for request in requests[:args.naive_queries]:
+            with Stopwatch() as sw:
+                expected = naive_recommend(tracks, **request)
+            naive_samples.append(sw.elapsed_ms)
+            found = recommender.recommend(**request)
+            if [t["spotify_id"] for t in found] != [t["spotify_id"] for t in expected]:
+                raise AssertionError(f"Vectorized results differ from the naive loop for {request}")
+
+        recommender = Recommender(table)
+        for request in requests:
+            with Stopwatch() as sw:
+                recommender.recommend(**request)
+            fast_samples.append(sw.elapsed_ms)
+
+        naive, fast = summarize(naive_samples), summarize(fast_samples)
+        print(format_summary("naive loop", naive))
+        print(format_summary("vectorized", fast))
+        print(f"speedup {naive['mean'] / max(fast['mean'], 1e-9):.0f}x (results identical on {len(naive_samples)} requests)")
+
+
+if __name__ == "__main__":
+    main()
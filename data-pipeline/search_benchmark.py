@@ -0,0 +1,273 @@
+import os
+import json
+import math
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from book_loader import read_books
+from track_schema import _split_list
+from timing import Stopwatch, summarize
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'golden_queries')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'benchmark_results')
+TRACKS_CSV_PATH = os.path.join(os.path.dirname(__file__), 'tracks_1000.csv')
+
+BOOK_CATEGORIES = ["Philosophy", "Poetry", "Comics & Graphic Novels", "Religion", "History",
+                   "Science", "Cooking", "Psychology"]
+TRACK_GENRES = ["classical", "lo-fi", "jazz", "folk", "opera", "metal", "lullaby", "ragtime",
+                "bebop", "new wave", "choral", "mandopop", "singer-songwriter", "orchestra", "jazz fusion"]
+MAX_RELEVANT = 100
+
+
+def _first_words(text, count=12):
+    return " ".join(str(text).split()[:count])
+
+
+def build_golden_queries(books_per_type=30, tracks_per_type=40, seed=0):
+    """Derive the golden query set from the source datasets.
+
+    Known-item queries (a book's title, the start of its description, a
+    track's name and artists) each have one relevant object. Category and
+    genre queries list up to MAX_RELEVANT matching objects, most popular or
+    best rated first. Selection is seeded so a version can be regenerated.
+    """
+    rng = np.random.default_rng(seed)
+
+    books = [b for b in read_books() if b["title"] and b["description"]]
+    picks = rng.choice(len(books), size=2 * books_per_type, replace=False)
+    book_queries = []
+    for i, idx in enumerate(picks):
+        book = books[idx]
+        kind, text = ("title", book["title"]) if i < books_per_type else ("description", _first_words(book["description"]))
+        book_queries.append({"type": kind, "query": text, "relevant": {book["isbn13"]: 1}})
+    for category in BOOK_CATEGORIES:
+        matches = [b for b in books if b["categories"] == category]
+        matches.sort(key=lambda b: float(b["ratings_count"] or 0), reverse=True)
+        if matches:
+            book_queries.append({"type": "category", "query": f"{category.lower()} books",
+                                 "relevant": {b["isbn13"]: 1 for b in matches[:MAX_RELEVANT]}})
+
+    tracks = pd.read_csv(TRACKS_CSV_PATH).drop_duplicates("spotify_id")
+    named = tracks[tracks["name"].notna() & tracks["artists"].notna()].reset_index(drop=True)
+    track_queries = []
+    for idx in rng.choice(len(named), size=tracks_per_type, replace=False):
+        track = named.iloc[idx]
+        artists = ", ".join(_split_list(track["artists"]))
+        track_queries.append({"type": "known_item", "query": f"{track['name']} {artists}",
+                              "relevant": {track["spotify_id"]: 1}})
+    genre_lists = tracks["genres"].map(lambda g: [x.lower() for x in _split_list(g)])
+    for genre in TRACK_GENRES:
+        matches = tracks[genre_lists.map(lambda gs: genre in gs)].sort_values("popularity", ascending=False)
+        if len(matches):
+            track_queries.append({"type": "genre", "query": f"{genre} music",
+                                  "relevant": {sid: 1 for sid in matches["spotify_id"][:MAX_RELEVANT]}})
+
+    def numbered(prefix, queries):
+        return [dict(q, id=f"{prefix}-{i:03d}") for i, q in enumerate(queries, 1)]
+
+    return {
+        "version": 1,
+        "suites": {
+            "books": {"collection": "Book", "id_property": "isbn13", "queries": numbered("books", book_queries)},
+            "tracks": {"collection": "Track", "id_property": "spotify_id", "queries": numbered("tracks", track_queries)},
+        },
+    }
+
+
+def load_golden(version=1):
+    with open(os.path.join(GOLDEN_DIR, f"v{version}.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def recall_at_k(found, relevant, k):
+    """Share of the relevant ids (at most k of them) found in the top k"""
+    if not relevant:
+        return 0.0
+    return len(set(found[:k]) & set(relevant)) / min(len(relevant), k)
+
+
+def ndcg_at_k(found, relevant, k):
+    """Normalized discounted cumulative gain with graded relevance"""
+    dcg = sum(relevant.get(doc, 0) / math.log2(rank + 2) for rank, doc in enumerate(found[:k]))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum(grade / math.log2(rank + 2) for rank, grade in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+class WeaviateBackend:
+    """Searches the live collection with near_text, hybrid or bm25"""
+
+    def __init__(self, client, mode="near_text"):
+        self.client = client
+        self.mode = mode
+        self.label = f"weaviate-{mode}"
+
+    def searcher(self, suite):
+        collection = self.client.collections.get(suite["collection"])
+        search = getattr(collection.query, self.mode)
+        id_property = suite["id_property"]
+
+        def run(query, k):
+            response = search(query=query, limit=k, return_properties=[id_property])
+            return [obj.properties.get(id_property) for obj in response.objects]
+        return run
+
+
+class LocalBackend:
+    """Searches a snapshot with the exact engine, or its IVF-PQ index when nprobe is set"""
+
+    def __init__(self, snapshot_root, embedder, nprobe=None, rerank=0):
+        self.snapshot_root = snapshot_root
+        self.embedder = embedder
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.label = f"ivfpq-nprobe{nprobe}" if nprobe else "local-exact"
+
+    def searcher(self, suite):
+        from local_search import LocalSearchEngine
+        snapshot_dir = os.path.join(self.snapshot_root, suite["collection"])
+        engine = LocalSearchEngine.from_snapshot(snapshot_dir)
+        ids = [row.get(suite["id_property"]) for row in engine.rows]
+
+        if self.nprobe:
+            from ann_index import IVFPQIndex
+            index = IVFPQIndex.load(os.path.join(snapshot_dir, "ivfpq"), engine.vectors)
+            search = lambda vector, k: index.search_indices(vector, k, nprobe=self.nprobe, rerank=self.rerank)[0][0]
+        else:
+            search = lambda vector, k: engine.search_indices(vector, k)[0][0]
+
+        def run(query, k):
+            return [ids[i] for i in search(self.embedder.embed(query), k)]
+        return run
+
+
+def run_suite(backend, suite, k):
+    """Run every golden query of a suite once and return the per-query rows and aggregates"""
+    search = backend.searcher(suite)
+    rows, latencies = [], []
+    for query in suite["queries"]:
+        with Stopwatch() as sw:
+            found = search(query["query"], k)
+        latencies.append(sw.elapsed_ms)
+        rows.append({
+            "id": query["id"],
+            "type": query["type"],
+            "recall": recall_at_k(found, query["relevant"], k),
+            "ndcg": ndcg_at_k(found, query["relevant"], k),
+            "latency_ms": sw.elapsed_ms,
+        })
+
+    latency = summarize(latencies)
+    by_type = {}
+    for row in rows:
+        by_type.setdefault(row["type"], []).append(row)
+    return {
+        "recall": float(np.mean([r["recall"] for r in rows])),
+        "ndcg": float(np.mean([r["ndcg"] for r in rows])),
+        "p50_ms": latency["p50"],
+        "p95_ms": latency["p95"],
+        "p99_ms": latency["p99"],
+        "by_type": {t: {"recall": float(np.mean([r["recall"] for r in rs])), "ndcg": float(np.mean([r["ndcg"] for r in rs]))}
+                    for t, rs in by_type.items()},
+        "queries": rows,
+    }
+
+
+def compare(current, previous):
+    """Print metric deltas between two result files"""
+    print(f"\nΔ vs {previous['backend']} @ {previous['created_at']}")
+    for name, suite in current["suites"].items():
+        before = previous["suites"].get(name)
+        if not before:
+            continue
+        deltas = [f"{metric} {suite[metric] - before[metric]:+.3f}" for metric in ("recall", "ndcg")]
+        deltas += [f"{metric} {suite[metric] - before[metric]:+.1f}ms" for metric in ("p50_ms", "p95_ms", "p99_ms")]
+        collections = f"{before.get('collection', '?')} -> {suite['collection']}"
+        print(f"  {name:<8} {collections:<32} " + "  ".join(deltas))
+
+
+def main():
+    """Golden-query recall/nDCG/latency benchmark for the search backends"""
+    parser = argparse.ArgumentParser(description="Search quality and latency benchmark on the golden query set")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build-golden", help="Regenerate a golden query file from the datasets")
+    build.add_argument("--version", type=int, default=1)
+
+    run = commands.add_parser("run", help="Benchmark a backend")
+    run.add_argument("--backend", choices=["weaviate", "local", "ivfpq"], default="weaviate")
+    run.add_argument("--mode", choices=["near_text", "hybrid", "bm25"], default="near_text", help="Weaviate query type")
+    run.add_argument("--target", choices=["local", "cloud"], default=None)
+    run.add_argument("--snapshots", default=os.path.join(os.path.dirname(__file__), 'snapshots'),
+                     help="Directory with snapshot.py exports named after the collections")
+    run.add_argument("--embedder", default="cloud", help="query_embeddings provider for local backends")
+    run.add_argument("--nprobe", type=int, default=8)
+    run.add_argument("--rerank", type=int, default=100)
+    run.add_argument("--suites", nargs="+", default=["books", "tracks"])
+    run.add_argument("--collection", action="append", default=[], metavar="SUITE=COLLECTION",
+                     help="Search another collection for a suite, e.g. tracks=TrackV2 (repeatable)")
+    run.add_argument("--golden-version", type=int, default=1)
+    run.add_argument("--k", type=int, default=10)
+    run.add_argument("--compare", help="Previous result JSON to diff against")
+    args = parser.parse_args()
+
+    if args.command == "build-golden":
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        golden = build_golden_queries()
+        golden["version"] = args.version
+        path = os.path.join(GOLDEN_DIR, f"v{args.version}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(golden, f, indent=1, ensure_ascii=False)
+        counts = {name: len(suite["queries"]) for name, suite in golden["suites"].items()}
+        print(f"✅ Wrote {path} {counts}")
+        return
+
+    collections = {}
+    for override in args.collection:
+        suite_name, _, collection = override.partition("=")
+        if not collection or suite_name not in args.suites:
+            parser.error(f"--collection expects SUITE=COLLECTION for one of {args.suites}, got {override!r}")
+        collections[suite_name] = collection
+
+    if args.backend == "weaviate":
+        from weaviate_client import get_client
+        backend = WeaviateBackend(get_client(args.target), args.mode)
+    else:
+        from query_embeddings import query_embedder
+        embedder = query_embedder(args.embedder)
+        if embedder is None:
+            parser.error(f"{args.embedder} has no client-side query embedder")
+        nprobe = args.nprobe if args.backend == "ivfpq" else None
+        backend = LocalBackend(args.snapshots, embedder, nprobe=nprobe, rerank=args.rerank)
+
+    golden = load_golden(args.golden_version)
+    result = {
+        "backend": backend.label,
+        "golden_version": golden["version"],
+        "k": args.k,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "suites": {},
+    }
+    print(f"📊 {backend.label}, golden v{golden['version']}, k={args.k}")
+    for name in args.suites:
+        queries = golden["suites"][name]
+        collection = collections.get(name, queries["collection"])
+        suite = dict(run_suite(backend, dict(queries, collection=collection), args.k), collection=collection)
+        result["suites"][name] = suite
+        print(f"  {name:<8} {collection:<16} recall@{args.k}={suite['recall']:.3f} nDCG@{args.k}={suite['ndcg']:.3f} "
+              f"p50={suite['p50_ms']:.1f}ms p95={suite['p95_ms']:.1f}ms p99={suite['p99_ms']:.1f}ms")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{backend.label}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import re
+import time
+import threading
+from collections import OrderedDict, deque
+from timing import Stopwatch, summarize, format_summary
+
+
+def normalize_query(text):
+    """Lowercase and collapse whitespace so trivially different queries share a cache entry"""
+    return re.sub(r"\s+", " ", str(text)).strip().lower()
+
+
+def filter_key(filters):
+    """Hashable structure of a Weaviate filter tree.
+
+    Only single-value filters have a repr that describes them; And/Or
+    filters fall back to the object repr (a memory address), so the tree
+    is walked instead.
+    """
+    if filters is None:
+        return None
+    children = getattr(filters, "filters", None)
+    if children is not None:
+        return (type(filters).__name__, tuple(filter_key(f) for f in children))
+    operator = getattr(filters, "operator", None)
+    if operator is None:
+        return (type(filters).__name__, repr(filters))
+    return (getattr(operator, "value", repr(operator)), repr(filters.target), repr(filters.value))
+
+
+def cache_key(query, limit, filters=None, return_properties=None, **extra):
+    """Build a hashable key from everything that changes the result of a search"""
+    properties = tuple(sorted(return_properties)) if return_properties else None
+    return (
+        normalize_query(query),
+        limit,
+        filter_key(filters),
+        properties,
+        tuple(sorted((k, repr(v)) for k, v in extra.items())),
+    )
+
+
+class ResultCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_size=1024, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run fn once per key at a time; returns (result, shared)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+
+        try:
+            call["result"] = fn()
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+        return call["result"], False
+
+
+def collection_version(collection):
+    """Cheap fingerprint of a collection's size and schema.
+
+    Inserts and deletes change it; updates and upserts of existing objects
+    do not, so those are only picked up once entries expire (ttl) or after
+    CachedSearch.invalidate().
+    """
+    total = collection.aggregate.over_all(total_count=True).total_count
+    config = collection.config.get()
+    return (total, tuple(sorted(p.name for p in config.properties)), str(config.vector_index_config))
+
+
+class CachedSearch:
+    """near_text/hybrid/bm25 query layer with result caching and request coalescing.
+
+    Results are cached on the normalized query text, limit, filters and
+    returned properties. Identical requests that arrive while the first one
+    is still running wait for it instead of hitting Weaviate again. The
+    cache is dropped whenever collection_version changes, checked at most
+    every version_check_interval seconds; call invalidate() after updating
+    objects in place. backend defaults to
+    collection.query; pass a query_embeddings.VectorSearch to embed queries
+    client-side.
+    """
+
+    def __init__(self, collection, max_size=1024, ttl=300, version_check_interval=30, backend=None,
+                 latency_samples=10000):
+        self.collection = collection
+        self.backend = backend or collection.query
+        self.cache = ResultCache(max_size=max_size, ttl=ttl)
+        self.flight = SingleFlight()
+        self.version_check_interval = version_check_interval
+        self._version = None
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # Only the most recent latencies, so a long-running process does not grow them forever
+        self.hit_latencies = deque(maxlen=latency_samples)
+        self.miss_latencies = deque(maxlen=latency_samples)
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = collection_version(self.collection)
+        if self._version is not None and version != self._version:
+            print(f"Collection {self.collection.name} changed, clearing {len(self.cache)} cached results")
+            self.cache.clear()
+        self._version = version
+
+    def invalidate(self):
+        """Drop all cached results"""
+        self.cache.clear()
+
+    def search(self, method, query, limit=10, filters=None, return_properties=None, **kwargs):
+        """Run backend.<method> through the cache"""
+        with Stopwatch() as sw:
+            self._check_version()
+            key = (method,) + cache_key(query, limit, filters, return_properties, **kwargs)
+            result = self.cache.get(key)
+            hit = result is not None
+            if not hit:
+                run = getattr(self.backend, method)
+                result, shared = self.flight.do(key, lambda: run(
+                    query=query, limit=limit, filters=filters, return_properties=return_properties, **kwargs,
+                ))
+                if not shared:
+                    self.cache.put(key, result)
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.hit_latencies.append(sw.elapsed_ms)
+            else:
+                self.misses += 1
+                self.coalesced += int(shared)
+                self.miss_latencies.append(sw.elapsed_ms)
+        return result
+
+    def near_text(self, query, limit=10, filters=None, return_properties=None, **kwargs):
+        return self.search("near_text", query, limit, filters, return_properties, **kwargs)
+
+    def hybrid(self, query, limit=10, filters=None, return_properties=None, **kwargs):
+        return self.search("hybrid", query, limit, filters, return_properties, **kwargs)
+
+    def bm25(self, query, limit=10, filters=None, return_properties=None, **kwargs):
+        return self.search("bm25", query, limit, filters, return_properties, **kwargs)
+
+    def metrics(self):
+        """Hit rate since the layer was created and latency summaries of the last latency_samples searches"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "requests": total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / total if total else 0.0,
+                "hit_latency": summarize(self.hit_latencies),
+                "miss_latency": summarize(self.miss_latencies),
+            }
+
+    def print_metrics(self):
+        m = self.metrics()
+        print(f"📊 {m['requests']} searches, hit rate {m['hit_rate']:.0%} ({m['coalesced']} coalesced)")
+        print(format_summary("cache hits", m['hit_latency']))
+        print(format_summary("cache misses", m['miss_latency']))
+
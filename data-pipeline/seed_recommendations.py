@@ -0,0 +1,340 @@
+import re
+import argparse
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from ann_index import normalize, kmeans
+from recommender import RESULT_LIMIT
+from search_cache import ResultCache, normalize_query
+from timing import Stopwatch, summarize, format_summary
+
+VECTOR_CACHE_SIZE = 4096
+VECTOR_CACHE_TTL = 3600
+
+_SEED_SEPARATORS = re.compile(r"[,\n]+")
+# "Song - Artist" and "Song by Artist"; names may contain the separators too
+_ARTIST_SEPARATOR = re.compile(r"\s+(?:-|–|by)\s+", re.IGNORECASE)
+
+
+def seed_list(favorite_songs):
+    """Favorite songs as a list; the UI's string is split on commas and newlines only, so names keep their words"""
+    if isinstance(favorite_songs, str):
+        favorite_songs = _SEED_SEPARATORS.split(favorite_songs)
+    return [seed.strip() for seed in favorite_songs if seed and seed.strip()]
+
+
+def seed_splits(seed):
+    """Every (name, artist) reading of a "Song - Artist" / "Song by Artist" seed, last separator first"""
+    text = normalize_query(seed)
+    return [(text[:m.start()], text[m.end():]) for m in reversed(list(_ARTIST_SEPARATOR.finditer(text)))]
+
+
+def credited_artists(artists):
+    """Normalized artist names of a track's artists value ('; '-joined string or list)"""
+    if not isinstance(artists, (list, tuple)):
+        artists = str(artists or "").split(";")
+    return [normalize_query(name) for name in artists if str(name).strip()]
+
+
+def split_seed(seed):
+    """(name, artist or None) of a seed, split on its last separator"""
+    splits = seed_splits(seed)
+    return splits[0] if splits else (normalize_query(seed), None)
+
+
+class TrackNameIndex:
+    """Normalized track name -> catalog rows, most popular first.
+
+    Names are normalized like search_cache.normalize_query. A seed is tried
+    as a whole name first, then as "name - artist" at each separator from
+    the last, where the artist picks among tracks sharing the name (a
+    credited artist by equality first, then by substring); without an
+    artist match the most popular track with the first known name wins.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        names = pc.fill_null(table.column("name").cast(pa.string()), "")
+        names = pc.utf8_trim_whitespace(pc.replace_substring_regex(pc.utf8_lower(names), r"\s+", " "))
+        encoded = pc.dictionary_encode(names).combine_chunks()
+        codes = encoded.indices.to_numpy(zero_copy_only=False)
+        popularity = pc.fill_null(table.column("popularity").cast(pa.float64()), 0.0).to_numpy()
+        self.order = np.lexsort((-popularity, codes))
+        self.offsets = np.searchsorted(codes[self.order], np.arange(len(encoded.dictionary) + 1))
+        self.codes = {name: code for code, name in enumerate(encoded.dictionary.to_pylist())}
+        self.spotify_ids = table.column("spotify_id").cast(pa.string())
+
+    def rows(self, name):
+        code = self.codes.get(normalize_query(name))
+        if code is None:
+            return self.order[:0]
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+    def resolve_row(self, seed):
+        """Catalog row of a seed, or None"""
+        rows = self.rows(seed)
+        if len(rows):
+            return int(rows[0])
+        # "Stand By Me by Ben E. King": try each split point, preferring one naming a credited artist,
+        # then one whose artist is part of a credit, then the most popular track with the name
+        partial = fallback = None
+        for name, artist in seed_splits(seed):
+            rows = self.rows(name)
+            if not len(rows):
+                continue
+            artists = [credited_artists(a) for a in self.table.column("artists").take(pa.array(rows)).to_pylist()]
+            for row, names in zip(rows, artists):
+                if artist in names:
+                    return int(row)
+            if partial is None:
+                partial = next((int(row) for row, names in zip(rows, artists)
+                                if any(artist in credit for credit in names)), None)
+            if fallback is None:
+                fallback = int(rows[0])
+        return partial if partial is not None else fallback
+
+    def resolve(self, seeds):
+        """(spotify_ids, unresolved seeds), each seed resolved once and in order"""
+        found, missing = [], []
+        for seed in seed_list(seeds):
+            row = self.resolve_row(seed)
+            if row is None:
+                missing.append(seed)
+            elif self.spotify_ids[row].as_py() not in found:
+                found.append(self.spotify_ids[row].as_py())
+        return found, missing
+
+
+def seed_centroids(vectors, clusters=1, seed=0):
+    """Unit-length centroid(s) of the seed vectors.
+
+    One centroid is the normalized mean. Seeds that span several styles
+    average out to something in between, so clusters > 1 splits them with
+    k-means and searches near each group instead.
+    """
+    vectors = normalize(vectors)
+    if clusters <= 1 or len(vectors) <= 1:
+        return normalize(vectors.mean(axis=0, keepdims=True))
+    return normalize(kmeans(vectors, min(clusters, len(vectors)), iterations=10, seed=seed))
+
+
+def merge_results(result_lists, limit):
+    """One list from several near-vector result lists, each track at its smallest distance"""
+    best = {}
+    for results in result_lists:
+        for track in results:
+            kept = best.get(track["spotify_id"])
+            if kept is None or track["distance"] < kept["distance"]:
+                best[track["spotify_id"]] = track
+    return sorted(best.values(), key=lambda track: track["distance"])[:limit]
+
+
+class LocalVectors:
+    """Seed vectors and neighbors from a matrix aligned with the track table.
+
+    Searches exactly with LocalSearchEngine, or with an IVF-PQ index when
+    one is given; every centroid goes into one batched search call.
+    """
+
+    def __init__(self, table, vectors, index=None, nprobe=8, rerank=100):
+        from local_search import LocalSearchEngine
+        self.table = table
+        ids = table.column("spotify_id").cast(pa.string()).to_pylist()
+        self.rows_by_id = {spotify_id: row for row, spotify_id in enumerate(ids)}
+        self.engine = LocalSearchEngine(vectors, ids, [{} for _ in ids])
+        self.index = index
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.queries = 0
+
+    @classmethod
+    def from_snapshot(cls, snapshot_dir, **kwargs):
+        from snapshot import load_snapshot
+        _, rows, vectors = load_snapshot(snapshot_dir)
+        if vectors is None:
+            raise ValueError(f"Snapshot {snapshot_dir} was exported without vectors")
+        return cls(pa.Table.from_pylist(rows), vectors, **kwargs)
+
+    def vectors(self, spotify_ids):
+        rows = [self.rows_by_id[i] for i in spotify_ids if i in self.rows_by_id]
+        return {self.engine.uuids[row]: np.asarray(self.engine.vectors[row], dtype=np.float32) for row in rows}
+
+    def search(self, centroids, limit, exclude=()):
+        """Track dicts with a distance, nearest first, for each centroid"""
+        excluded = {self.rows_by_id[i] for i in exclude if i in self.rows_by_id}
+        k = limit + len(excluded)
+        self.queries += 1
+        if self.index is not None:
+            indices, distances = self.index.search_indices(centroids, k, nprobe=self.nprobe, rerank=max(self.rerank, k))
+        else:
+            indices, distances = self.engine.search_indices(centroids, k)
+        results = []
+        for idx, dist in zip(indices, distances):
+            keep = [(int(i), float(d)) for i, d in zip(idx, dist) if int(i) not in excluded][:limit]
+            tracks = self.table.take(pa.array([i for i, _ in keep], type=pa.int64())).to_pylist()
+            results.append([dict(track, distance=d) for track, (_, d) in zip(tracks, keep)])
+        return results
+
+
+class WeaviateVectors:
+    """Seed vectors and neighbors from a Track collection.
+
+    Objects are keyed by generate_uuid5(spotify_id), like populate_tracks
+    writes them, so seed vectors come back in one fetch_objects by id and
+    stay cached. Each centroid is one near_vector call that filters the
+    seeds out on the server.
+    """
+
+    def __init__(self, collection, cache_size=VECTOR_CACHE_SIZE, ttl=VECTOR_CACHE_TTL, return_properties=None):
+        from track_schema import UI_PROPERTIES
+        self.collection = collection
+        self.cache = ResultCache(max_size=cache_size, ttl=ttl)
+        self.return_properties = return_properties or UI_PROPERTIES
+        self.queries = 0
+
+    def vectors(self, spotify_ids):
+        from weaviate.classes.query import Filter
+        from weaviate.util import generate_uuid5
+        found = {i: self.cache.get(i) for i in spotify_ids}
+        missing = {generate_uuid5(i): i for i, vector in found.items() if vector is None}
+        if missing:
+            self.queries += 1
+            response = self.collection.query.fetch_objects(
+                filters=Filter.by_id().contains_any(list(missing)), limit=len(missing),
+                include_vector=True, return_properties=[],
+            )
+            for obj in response.objects:
+                vector = np.asarray(obj.vector["default"], dtype=np.float32)
+                spotify_id = missing[str(obj.uuid)]
+                self.cache.put(spotify_id, vector)
+                found[spotify_id] = vector
+        return {i: vector for i, vector in found.items() if vector is not None}
+
+    def search(self, centroids, limit, exclude=()):
+        from weaviate.classes.query import Filter, MetadataQuery
+        from weaviate.util import generate_uuid5
+        conditions = [Filter.by_id().not_equal(generate_uuid5(i)) for i in exclude]
+        filters = None if not conditions else conditions[0] if len(conditions) == 1 else Filter.all_of(conditions)
+        results = []
+        for centroid in centroids:
+            self.queries += 1
+            response = self.collection.query.near_vector(
+                near_vector=centroid.tolist(), limit=limit, filters=filters,
+                return_properties=self.return_properties, return_metadata=MetadataQuery(distance=True),
+            )
+            results.append([dict(obj.properties, distance=obj.metadata.distance) for obj in response.objects])
+        return results
+
+
+class SeedRecommender:
+    """"More like these": tracks near the centroid of a user's favorite songs.
+
+    Favorites are resolved to spotify_ids with the name index, their vectors
+    fetched once (and cached by the source), and combined into one or more
+    centroids, so a user costs one vector search instead of a text search
+    per favorite. source is a LocalVectors or WeaviateVectors.
+    """
+
+    def __init__(self, names, source, clusters=1):
+        self.names = names
+        self.source = source
+        self.clusters = clusters
+
+    def recommend(self, favorite_songs, limit=RESULT_LIMIT, clusters=None):
+        """(track dicts nearest first, unresolved favorites); empty if no favorite resolves"""
+        spotify_ids, missing = self.names.resolve(favorite_songs)
+        vectors = self.source.vectors(spotify_ids)
+        if not vectors:
+            return [], missing
+        centroids = seed_centroids(np.stack(list(vectors.values())), clusters or self.clusters)
+        return merge_results(self.source.search(centroids, limit, exclude=spotify_ids), limit), missing
+
+
+def per_seed_text_search(collection, favorite_songs, limit=RESULT_LIMIT):
+    """The old way: one near_text per favorite, merged by distance"""
+    from weaviate.classes.query import MetadataQuery
+    from track_schema import UI_PROPERTIES
+    results = []
+    for seed in seed_list(favorite_songs):
+        response = collection.query.near_text(query=seed, limit=limit, return_properties=UI_PROPERTIES,
+                                              return_metadata=MetadataQuery(distance=True))
+        results.append([dict(obj.properties, distance=obj.metadata.distance) for obj in response.objects])
+    return merge_results(results, limit)
+
+
+def sample_favorites(table, count, per_user=5, seed=0):
+    """Favorite lists drawn from the catalog, every other seed written "Song - Artist" like users do"""
+    rng = np.random.default_rng(seed)
+    names = table.column("name").to_pylist()
+    artists = table.column("artists").to_pylist()
+    users = []
+    for _ in range(count):
+        seeds = []
+        for j, row in enumerate(rng.choice(len(names), size=per_user, replace=False)):
+            artist = str(artists[row] or "").split(";")[0].strip()
+            seeds.append(f"{names[row]} - {artist}" if j % 2 and artist else str(names[row]))
+        users.append(seeds)
+    return users
+
+
+def main():
+    """Latency and query count of seed-centroid recommendations against per-favorite text searches"""
+    parser = argparse.ArgumentParser(description="'More like these' recommendations from favorite-song vectors")
+    parser.add_argument("--target", choices=["fake", "local", "cloud", "synthetic"], default="fake",
+                        help="Weaviate deployment, the in-process fake seeded with the sample tracks, "
+                             "or synthetic local embeddings")
+    parser.add_argument("--collection", default="TrackSeeds")
+    parser.add_argument("--tracks", help="Track file for the name index (default: the sample CSV)")
+    parser.add_argument("--catalog", type=int, default=120000, help="Catalog size of the synthetic target")
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=1)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--favorites", type=int, default=5, help="Favorite songs per user")
+    parser.add_argument("--limit", type=int, default=RESULT_LIMIT)
+    args = parser.parse_args()
+
+    from recommender import load_tracks_table, synthetic_table
+    from search_benchmark import TRACKS_CSV_PATH
+    table = load_tracks_table(args.tracks or TRACKS_CSV_PATH)
+    collection = None
+    if args.target == "synthetic":
+        from ann_index import clustered_vectors
+        table = synthetic_table(table, args.catalog)
+        source = LocalVectors(table, clustered_vectors(table.num_rows, args.dimensions))
+    elif args.target == "fake":
+        from fake_weaviate import connect_to_fake, seed_tracks
+        collection = seed_tracks(connect_to_fake(), args.collection, args.tracks or TRACKS_CSV_PATH)
+        source = WeaviateVectors(collection)
+    else:
+        from weaviate_client import get_client
+        collection = get_client(args.target).collections.get(args.collection)
+        source = WeaviateVectors(collection)
+
+    recommender = SeedRecommender(TrackNameIndex(table), source, clusters=args.clusters)
+    users = sample_favorites(table, args.users, args.favorites)
+    # Weaviate seed vectors are cached after the first request, local ones never need a fetch
+    labels = ["seed centroid (cold)", "seed centroid (cached)"] if collection is not None else ["seed centroid"]
+    timings = {label: [] for label in labels}
+    if collection is not None:
+        timings["near_text per favorite"] = []
+    unresolved = 0
+    for favorites in users:
+        for label in labels:
+            with Stopwatch() as sw:
+                _, missing = recommender.recommend(favorites, args.limit)
+            timings[label].append(sw.elapsed_ms)
+        unresolved += len(missing)
+        if collection is not None:
+            with Stopwatch() as sw:
+                per_seed_text_search(collection, favorites, args.limit)
+            timings["near_text per favorite"].append(sw.elapsed_ms)
+
+    print(f"📊 {args.users} users x {args.favorites} favorites, {table.num_rows} tracks, {args.target} target")
+    for label, samples in timings.items():
+        print(format_summary(label, summarize(samples)))
+    print(f"{source.queries / (args.users * len(labels)):.1f} queries per recommendation (seed fetches included) "
+          f"instead of {args.favorites} text searches; {unresolved} favorites unresolved")
+
+
+if __name__ == "__main__":
+    main()
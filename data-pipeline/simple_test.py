@@ -1,21 +1,8 @@
-import weaviate
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv('../.env.local')
-
-# Weaviate configuration
-WEAVIATE_CLUSTER_URL = os.getenv('WEAVIATE_CLUSTER_URL')
-WEAVIATE_API_KEY = os.getenv('WEAVIATE_API_KEY')
+from weaviate_client import connect
 
 def create_weaviate_client():
     """Create and return a Weaviate client"""
-    client = weaviate.connect_to_weaviate_cloud(
-        cluster_url=WEAVIATE_CLUSTER_URL,
-        auth_credentials=weaviate.auth.AuthApiKey(api_key=WEAVIATE_API_KEY)
-    )
-    return client
+    return connect("cloud")
 
 def test_database():
     """Test what's in the database"""
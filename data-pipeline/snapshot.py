@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import uuid
+import argparse
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from weaviate_client import get_client
+from collection_scan import scan_collection
+from ingestion import IngestionCheckpoint, ingest_rows
+from timing import Stopwatch
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), 'snapshots')
+MANIFEST_NAME = "manifest.json"
+VECTORS_NAME = "vectors.npy"
+
+
+def read_manifest(snapshot_dir):
+    """Return the snapshot manifest, or None if the directory has none yet"""
+    path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(snapshot_dir, manifest):
+    """Atomically replace the manifest; it is the only record of committed parts"""
+    manifest["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(path + '.tmp', path)
+
+
+def _write_part(snapshot_dir, manifest, uuids, properties, vectors):
+    index = len(manifest["parts"])
+    part = {"file": f"part-{index:05d}.parquet", "rows": len(uuids), "first_uuid": uuids[0], "last_uuid": uuids[-1]}
+
+    table = pa.Table.from_pylist([dict(props, _uuid=u) for u, props in zip(uuids, properties)])
+    pq.write_table(table, os.path.join(snapshot_dir, part["file"]))
+
+    if vectors is not None:
+        part["vectors"] = f"part-{index:05d}.npy"
+        np.save(os.path.join(snapshot_dir, part["vectors"]), np.asarray(vectors, dtype=np.float32))
+
+    manifest["parts"].append(part)
+    manifest["rows"] += len(uuids)
+    write_manifest(snapshot_dir, manifest)
+
+
+def _merge_vectors(snapshot_dir, manifest):
+    """Concatenate the per-part vector files into one .npy through a memmap.
+
+    The manifest points at the merged file before the part files are
+    removed, so an export killed while deleting them resumes cleanly.
+    """
+    if not manifest.get("vectors"):
+        parts = [np.load(os.path.join(snapshot_dir, p["vectors"]), mmap_mode='r') for p in manifest["parts"]]
+        dimensions = parts[0].shape[1] if parts else 0
+        merged = np.lib.format.open_memmap(
+            os.path.join(snapshot_dir, VECTORS_NAME), mode='w+', dtype=np.float32, shape=(manifest["rows"], dimensions),
+        )
+        offset = 0
+        for part in parts:
+            merged[offset:offset + len(part)] = part
+            offset += len(part)
+        merged.flush()
+        del merged, parts
+
+        for p in manifest["parts"]:
+            p.pop("vectors")
+        manifest["vectors"] = VECTORS_NAME
+        manifest["dimensions"] = dimensions
+        write_manifest(snapshot_dir, manifest)
+
+    for p in manifest["parts"]:
+        try:
+            os.remove(os.path.join(snapshot_dir, os.path.splitext(p["file"])[0] + ".npy"))
+        except FileNotFoundError:
+            pass
+
+
+def export_snapshot(collection, snapshot_dir, include_vector=False, chunk_size=10000, resume=False, return_properties=None):
+    """Stream a collection into Parquet parts (plus vectors) with the cursor API.
+
+    Only one chunk is held in memory. Every finished part is recorded in the
+    manifest, so an interrupted export resumes after the last committed UUID.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest = read_manifest(snapshot_dir) if resume else None
+    if manifest and manifest.get("complete"):
+        print(f"Snapshot in {snapshot_dir} is already complete ({manifest['rows']} objects)")
+        return manifest
+    if manifest is None:
+        config = collection.config.get()
+        manifest = {
+            "collection": collection.name,
+            "config": config.to_dict(),
+            "include_vector": include_vector,
+            "properties": return_properties,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows": 0,
+            "parts": [],
+            "complete": False,
+        }
+        write_manifest(snapshot_dir, manifest)
+    else:
+        print(f"Resuming export after {manifest['rows']} objects")
+
+    include_vector = manifest["include_vector"]
+    lower = uuid.UUID(manifest["parts"][-1]["last_uuid"]).int + 1 if manifest["parts"] else None
+    uuids, properties, vectors = [], [], []
+
+    for obj in scan_collection(collection, return_properties=manifest["properties"], include_vector=include_vector,
+                               lower=lower, page_size=min(chunk_size, 10000)):
+        uuids.append(str(obj.uuid))
+        properties.append(obj.properties)
+        if include_vector:
+            vectors.append(obj.vector["default"])
+        if len(uuids) >= chunk_size:
+            _write_part(snapshot_dir, manifest, uuids, properties, vectors if include_vector else None)
+            print(f"Exported {manifest['rows']} objects")
+            uuids, properties, vectors = [], [], []
+
+    if uuids:
+        _write_part(snapshot_dir, manifest, uuids, properties, vectors if include_vector else None)
+
+    if include_vector:
+        _merge_vectors(snapshot_dir, manifest)
+    manifest["complete"] = True
+    write_manifest(snapshot_dir, manifest)
+    return manifest
+
+
+def _complete_manifest(snapshot_dir):
+    manifest = read_manifest(snapshot_dir)
+    if not manifest or not manifest.get("complete"):
+        raise ValueError(f"{snapshot_dir} does not contain a complete snapshot")
+    return manifest
+
+
+def iter_snapshot_parts(snapshot_dir, batch_size=10000):
+    """Yield (part, uuids, property dicts, vectors or None) one Parquet part at a time.
+
+    Vectors are the part's slice of the memory-mapped vectors file, so only
+    one part's properties are in memory at once.
+    """
+    manifest = _complete_manifest(snapshot_dir)
+    vectors = None
+    if manifest.get("vectors"):
+        vectors = np.load(os.path.join(snapshot_dir, manifest["vectors"]), mmap_mode='r')
+
+    offset = 0
+    for part in manifest["parts"]:
+        uuids, rows = [], []
+        for batch in pq.ParquetFile(os.path.join(snapshot_dir, part["file"])).iter_batches(batch_size=batch_size):
+            for row in batch.to_pylist():
+                uuids.append(row.pop("_uuid"))
+                rows.append({k: v for k, v in row.items() if v is not None})
+        yield part, uuids, rows, vectors[offset:offset + len(rows)] if vectors is not None else None
+        offset += len(rows)
+
+
+def load_snapshot(snapshot_dir):
+    """Return (uuids, property dicts, vectors or None) of a complete snapshot; vectors are memory-mapped"""
+    manifest = _complete_manifest(snapshot_dir)
+    uuids, rows = [], []
+    for _, part_uuids, part_rows, _ in iter_snapshot_parts(snapshot_dir):
+        uuids.extend(part_uuids)
+        rows.extend(part_rows)
+
+    vectors = None
+    if manifest.get("vectors"):
+        vectors = np.load(os.path.join(snapshot_dir, manifest["vectors"]), mmap_mode='r')
+    return uuids, rows, vectors
+
+
+def restore_snapshot(client, snapshot_dir, collection_name=None, resume=False, batch_size=200, concurrent_requests=4):
+    """Bulk load a snapshot back into Weaviate through ingest_rows.
+
+    The collection is recreated from the manifest's config if it does not
+    exist. Objects keep their UUIDs, and stored vectors are inserted as-is
+    instead of being re-embedded. Parts are loaded one at a time, each with
+    its own checkpoint, so memory stays at one part however large the
+    snapshot is.
+    """
+    manifest = _complete_manifest(snapshot_dir)
+    name = collection_name or manifest["collection"]
+
+    if not client.collections.exists(name):
+        config = dict(manifest["config"], **{"class": name})
+        client.collections.create_from_dict(config)
+        print(f"Created {name} from the snapshot config")
+
+    collection = client.collections.get(name)
+    inserted = failed = 0
+    for part, uuids, rows, vectors in iter_snapshot_parts(snapshot_dir):
+        stem = os.path.splitext(part["file"])[0]
+        checkpoint = IngestionCheckpoint(f"{name}.restore.{stem}", os.path.join(snapshot_dir, part["file"]))
+        part_inserted, part_failed = ingest_rows(
+            collection, rows, checkpoint, uuids=uuids, vectors=vectors, resume=resume,
+            batch_size=batch_size, concurrent_requests=concurrent_requests,
+        )
+        inserted += part_inserted
+        failed += part_failed
+    return inserted, failed
+
+
+def main():
+    """Export a collection to a local snapshot or restore one"""
+    parser = argparse.ArgumentParser(description="Parquet/.npy snapshots of Weaviate collections")
+    parser.add_argument("--target", choices=["local", "cloud"], default=None)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Stream a collection into a snapshot directory")
+    export.add_argument("--collection", default="Track")
+    export.add_argument("--output", help="Snapshot directory (default: snapshots/<collection>)")
+    export.add_argument("--vectors", action="store_true", help="Include vectors")
+    export.add_argument("--properties", nargs="+", help="Properties to export (default: all)")
+    export.add_argument("--chunk-size", type=int, default=10000, help="Objects per Parquet part")
+    export.add_argument("--resume", action="store_true", help="Continue an interrupted export")
+
+    restore = commands.add_parser("restore", help="Load a snapshot back into Weaviate")
+    restore.add_argument("snapshot", help="Snapshot directory")
+    restore.add_argument("--collection", help="Target collection (default: the exported one)")
+    restore.add_argument("--resume", action="store_true", help="Continue from the last checkpoint and retry dead letters")
+    args = parser.parse_args()
+
+    client = get_client(args.target)
+    with Stopwatch() as sw:
+        if args.command == "export":
+            output = args.output or os.path.join(SNAPSHOT_DIR, args.collection)
+            manifest = export_snapshot(
+                client.collections.get(args.collection), output, include_vector=args.vectors,
+                chunk_size=args.chunk_size, resume=args.resume, return_properties=args.properties,
+            )
+            count = manifest["rows"]
+            print(f"✅ Snapshot of {args.collection} written to {output}")
+        else:
+            count, failed = restore_snapshot(client, args.snapshot, args.collection, resume=args.resume)
+            print(f"✅ Restored {count} objects ({failed} failed)")
+
+    seconds = sw.elapsed_ms / 1000
+    print(f"{count} objects in {seconds:.1f}s ({count / max(seconds, 1e-9):.0f} objects/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,10 @@
-import weaviate
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv('../.env.local')
-
-# Weaviate configuration
-WEAVIATE_CLUSTER_URL = os.getenv('WEAVIATE_CLUSTER_URL')
-WEAVIATE_API_KEY = os.getenv('WEAVIATE_API_KEY')
+from weaviate.classes.query import Filter
+from weaviate_client import connect
+from track_search import search_tracks
 
 def create_weaviate_client():
     """Create and return a Weaviate client"""
-    client = weaviate.connect_to_weaviate_cloud(
-        cluster_url=WEAVIATE_CLUSTER_URL,
-        auth_credentials=weaviate.auth.AuthApiKey(api_key=WEAVIATE_API_KEY)
-    )
-    return client
+    return connect("cloud")
 
 def test_database():
     """Test what's in the database"""
@@ -33,8 +22,8 @@ def test_database():
         
         # Get total count
         try:
-            count_result = client.collections.get("Track").aggregate.over_all(total_count=True)
-            total_count = count_result.total
+            count_result = track_collection.aggregate.over_all(total_count=True)
+            total_count = count_result.total_count
             print(f"📊 Total tracks in database: {total_count}")
         except Exception as e:
             print(f"⚠️ Could not get total count: {e}")
@@ -44,7 +33,7 @@ def test_database():
         print("\n🔍 Testing genre search for 'pop'...")
         try:
             # Try BM25 search
-            result = client.collections.get("Track").with_bm25("pop").with_limit(50).do()
+            result = track_collection.query.bm25(query="pop", limit=50)
             
             tracks = result.objects
             print(f"✅ Found {len(tracks)} tracks with 'pop' in BM25 search")
@@ -60,14 +49,26 @@ def test_database():
         except Exception as e:
             print(f"❌ BM25 search failed: {e}")
         
+        # Test hybrid search with the genre and popularity filters run by Weaviate
+        print("\n🔍 Testing hybrid search for 'pop' (popularity >= 50)...")
+        try:
+            result = search_tracks(track_collection, "pop", alpha=0.5, limit=10, genres=["pop"], min_popularity=50)
+            
+            tracks = result.objects
+            print(f"✅ Found {len(tracks)} tracks in hybrid search")
+            for i, track in enumerate(tracks[:5]):
+                print(f"  {i+1}. {track.properties.get('name', 'N/A')} by {track.properties.get('artists', 'N/A')} (popularity {track.properties.get('popularity', 'N/A')})")
+            
+        except Exception as e:
+            print(f"❌ Hybrid search failed: {e}")
+        
         # Test exact genre match
         print("\n🔍 Testing exact genre match for 'pop'...")
         try:
-            result = client.collections.get("Track").with_where({
-                "path": ["genres"],
-                "operator": "ContainsAny",
-                "valueText": ["pop"]
-            }).with_limit(50).do()
+            result = track_collection.query.fetch_objects(
+                filters=Filter.by_property("genres").contains_any(["pop"]),
+                limit=50
+            )
             
             tracks = result.objects
             print(f"✅ Found {len(tracks)} tracks with exact 'pop' genre match")
@@ -85,7 +86,7 @@ def test_database():
         # Get some random tracks to see what genres are available
         print("\n🔍 Getting random tracks to see available genres...")
         try:
-            result = client.collections.get("Track").with_limit(20).do()
+            result = track_collection.query.fetch_objects(limit=20)
             
             tracks = result.objects
             print(f"✅ Found {len(tracks)} random tracks")
@@ -0,0 +1,68 @@
+from weaviate.classes.config import Property, DataType
+from weaviate.classes.query import Filter
+from fake_weaviate import FakeServer, FakeWeaviateClient
+from track_schema import create_typed_track_collection, track_properties
+from track_search import track_filters
+
+TRACKS = [
+    {"spotify_id": "a", "name": "Winter Song", "artists": "Early Band", "genres": "indie rock",
+     "popularity": 60, "release_date": "1998-12-25", "explicit": False},
+    {"spotify_id": "b", "name": "Summer Song", "artists": "Late Band", "genres": "synth pop; electropop",
+     "popularity": 40, "release_date": "2016-03-04", "explicit": True},
+    {"spotify_id": "c", "name": "Spring Song", "artists": "Other Band", "genres": "rock",
+     "popularity": 80, "release_date": "2019-11-01", "explicit": False},
+    {"spotify_id": "d", "name": "Autumn Song", "artists": "No Date", "genres": "pop",
+     "popularity": 20, "release_date": "", "explicit": False},
+]
+
+
+def legacy_collection():
+    """A Track collection with the legacy all-TEXT schema of populate_tracks.py"""
+    client = FakeWeaviateClient(FakeServer())
+    collection = client.collections.create("Track", properties=[
+        Property(name="spotify_id", data_type=DataType.TEXT),
+        Property(name="name", data_type=DataType.TEXT),
+        Property(name="artists", data_type=DataType.TEXT),
+        Property(name="genres", data_type=DataType.TEXT),
+        Property(name="popularity", data_type=DataType.INT),
+        Property(name="release_date", data_type=DataType.TEXT),
+        Property(name="explicit", data_type=DataType.BOOL),
+    ])
+    for track in TRACKS:
+        collection.data.insert(track)
+    return collection
+
+
+def found(collection, filters):
+    return sorted(o.properties["spotify_id"] for o in collection.query.fetch_objects(filters=filters, limit=100).objects)
+
+
+def test_legacy_year_filters_match_the_year_token():
+    collection = legacy_collection()
+    assert found(collection, track_filters(year_from=2015, typed=False)) == ["b", "c"]
+    assert found(collection, track_filters(year_to=2016, typed=False)) == ["a", "b"]
+    assert found(collection, track_filters(year_from=1990, year_to=1999, typed=False)) == ["a"]
+
+
+def test_legacy_text_ranges_compare_each_token():
+    # Like the server: "1998-12-25" has the token "25", which sorts after "2015"
+    collection = legacy_collection()
+    assert found(collection, Filter.by_property("release_date").greater_or_equal("2015")) == ["a", "b", "c"]
+
+
+def test_legacy_genre_filters_match_words():
+    collection = legacy_collection()
+    assert found(collection, Filter.by_property("genres").equal("rock")) == ["a", "c"]
+    assert found(collection, Filter.by_property("genres").equal("indie rock")) == ["a"]
+    assert found(collection, track_filters(genres=["pop"], typed=False)) == ["b", "d"]
+    assert found(collection, track_filters(genres=["rock"], min_popularity=70, typed=False)) == ["c"]
+
+
+def test_field_tokenized_genres_match_whole_values():
+    client = FakeWeaviateClient(FakeServer())
+    collection = create_typed_track_collection(client, "TrackV2")
+    for track in TRACKS:
+        collection.data.insert(track_properties(track))
+    assert found(collection, track_filters(genres=["rock"])) == ["c"]
+    assert found(collection, track_filters(genres=["indie rock"])) == ["a"]
+    assert found(collection, track_filters(year_from=2015)) == ["b", "c"]
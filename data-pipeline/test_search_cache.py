@@ -0,0 +1,25 @@
+from weaviate.classes.query import Filter
+from fake_weaviate import FakeServer, FakeWeaviateClient
+from search_cache import CachedSearch, cache_key
+
+
+def rock_since(year):
+    return Filter.by_property("genres").like("*rock*") & Filter.by_property("release_year").greater_or_equal(year)
+
+
+def test_compound_filters_are_keyed_on_their_structure():
+    assert cache_key("q", 10, rock_since(1990)) != cache_key("q", 10, rock_since(2000))
+    assert cache_key("q", 10, rock_since(1990)) == cache_key("q", 10, rock_since(1990))
+    either = Filter.by_property("genres").like("*rock*") | Filter.by_property("release_year").greater_or_equal(1990)
+    assert cache_key("q", 10, either) != cache_key("q", 10, rock_since(1990))
+
+
+def test_latency_samples_are_bounded():
+    collection = FakeWeaviateClient(FakeServer()).collections.create("Track")
+    collection.data.insert({"name": "Song", "genres": "rock"})
+    search = CachedSearch(collection, latency_samples=5)
+    for i in range(20):
+        search.bm25(f"song {i % 10}")
+    metrics = search.metrics()
+    assert (metrics["hits"], metrics["misses"]) == (10, 10)
+    assert metrics["hit_latency"]["count"] == 5 and metrics["miss_latency"]["count"] == 5
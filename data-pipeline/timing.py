@@ -0,0 +1,48 @@
+import time
+import math
+
+
+def percentile(sorted_samples, pct):
+    """Return the pct-th percentile of an already sorted list (nearest-rank)"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples_ms):
+    """Summarize latency samples in milliseconds"""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+    }
+
+
+def format_summary(label, summary):
+    """Format a latency summary as a single report line"""
+    return (
+        f"{label:<32} n={summary['count']:<5} mean={summary['mean']:.1f}ms "
+        f"p50={summary['p50']:.1f}ms p95={summary['p95']:.1f}ms p99={summary['p99']:.1f}ms"
+    )
+
+
+class Stopwatch:
+    """Context manager that records elapsed wall time in milliseconds"""
+
+    def __init__(self):
+        self.elapsed_ms = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed_ms = (time.perf_counter() - self._start) * 1000
+        return False
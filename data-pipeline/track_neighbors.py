@@ -0,0 +1,325 @@
+import os
+import json
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pyarrow as pa
+from scipy import sparse
+from local_search import inverse_norms, top_k
+from timing import Stopwatch, summarize
+
+NEIGHBORS_DIR = os.path.join(os.path.dirname(__file__), 'neighbors')
+NEIGHBOR_FILES = ["offsets", "indices", "scores"]
+DEFAULT_TOP_N = 50
+BLOCK_SIZE = 512
+TILE_SIZE = 16384
+GROUP_SIZE = 64
+
+# Sharing an artist says more than sharing a genre
+COOCCURRENCE_WEIGHTS = {"artists": 2.0, "genres": 1.0}
+
+
+def cooccurrence_matrix(table, weights=COOCCURRENCE_WEIGHTS):
+    """Sparse track x (artist, genre) matrix with idf weights and unit-length rows.
+
+    Its row dot products are the cosine similarity of two tracks' artist
+    and genre sets, with rare artists and genres counting for more.
+    """
+    from playlist_builder import GroupColumn
+    blocks = []
+    for field, weight in weights.items():
+        groups = GroupColumn(table.column(field))
+        matrix = sparse.csr_matrix((np.ones(len(groups.codes), dtype=np.float32), groups.codes, groups.offsets),
+                                   shape=(table.num_rows, len(groups.names)))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log(table.num_rows / np.maximum(document_frequency, 1)).astype(np.float32) + 1.0
+        blocks.append(matrix @ sparse.diags(weight * idf))
+    matrix = sparse.hstack(blocks, format='csr', dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return sparse.diags(1.0 / np.maximum(norms, 1e-12)).astype(np.float32) @ matrix
+
+
+class DenseSimilarity:
+    """Cosine similarities between blocks of rows of a (memory-mapped) vector matrix"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.inv_norms = inverse_norms(vectors)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def rows(self, start, stop):
+        return np.asarray(self.vectors[start:stop], dtype=np.float32) * self.inv_norms[start:stop, None]
+
+    def tile(self, block, start, stop):
+        return block @ self.rows(start, stop).T
+
+
+class SparseSimilarity:
+    """Cosine similarities between blocks of rows of a row-normalized sparse matrix"""
+
+    def __init__(self, matrix):
+        self.matrix = matrix.tocsr()
+        self.transposed = self.matrix.T.tocsc()
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def rows(self, start, stop):
+        return self.matrix[start:stop]
+
+    def tile(self, block, start, stop):
+        return (block @ self.transposed[:, start:stop]).toarray()
+
+
+def open_similarity(path):
+    """Similarity source of a vectors .npy (memory-mapped) or a sparse .npz file"""
+    if path.endswith(".npz"):
+        return SparseSimilarity(sparse.load_npz(path))
+    return DenseSimilarity(np.load(path, mmap_mode='r'))
+
+
+def tile_top(scores, k, group_size=GROUP_SIZE):
+    """Column indices of the k highest scores per row (unordered), via the rows' best column groups.
+
+    The k best scores of a row lie in the k column groups with the highest
+    maxima, so only those groups go through the top-k selection. Group j
+    holds columns j, j + groups, j + 2 * groups, ..., which keeps the group
+    maxima a fast reduction over the middle axis. This halves the
+    selection, which otherwise costs more than the matmul.
+    """
+    rows, columns = scores.shape
+    groups = -(-columns // group_size)
+    if groups <= k:
+        return top_k(scores, k)
+    if columns % group_size:
+        padding = np.full((rows, groups * group_size - columns), -np.inf, dtype=scores.dtype)
+        scores = np.concatenate([scores, padding], axis=1)
+    grouped = scores.reshape(rows, group_size, groups)
+    best_groups = np.argpartition(grouped.max(axis=1), groups - k, axis=1)[:, groups - k:]
+    candidates = np.take_along_axis(grouped, best_groups[:, None, :], axis=2).reshape(rows, -1)
+    picked = np.argpartition(candidates, candidates.shape[1] - k, axis=1)[:, -k:]
+    return (picked // k) * groups + np.take_along_axis(best_groups, picked % k, axis=1)
+
+
+def block_neighbors(similarity, start, stop, top_n, tile_size=TILE_SIZE):
+    """(indices, scores) of the top_n most similar other rows for rows start..stop.
+
+    Columns are scored one tile at a time and merged into a running top-n,
+    so memory stays at one (block, tile) score matrix however large the
+    catalog is.
+    """
+    block = similarity.rows(start, stop)
+    rows = np.arange(start, stop)
+    best_idx = np.empty((stop - start, 0), dtype=np.int64)
+    best_scores = np.empty((stop - start, 0), dtype=np.float32)
+    for tile_start in range(0, len(similarity), tile_size):
+        tile_stop = min(tile_start + tile_size, len(similarity))
+        scores = similarity.tile(block, tile_start, tile_stop).astype(np.float32, copy=False)
+        inside = (rows >= tile_start) & (rows < tile_stop)
+        scores[np.flatnonzero(inside), rows[inside] - tile_start] = -np.inf
+
+        in_tile = tile_top(scores, top_n)
+        candidates = np.concatenate([best_scores, np.take_along_axis(scores, in_tile, axis=1)], axis=1)
+        candidate_idx = np.concatenate([best_idx, in_tile + tile_start], axis=1)
+        keep = top_k(candidates, top_n)
+        best_scores = np.take_along_axis(candidates, keep, axis=1)
+        best_idx = np.take_along_axis(candidate_idx, keep, axis=1)
+    return best_idx, best_scores
+
+
+_worker_similarity = None
+
+
+def _init_worker(path):
+    global _worker_similarity
+    _worker_similarity = open_similarity(path)
+
+
+def _neighbors_task(task):
+    start, stop, top_n, tile_size = task
+    indices, scores = block_neighbors(_worker_similarity, start, stop, top_n, tile_size)
+    return start, indices.astype(np.int32), scores
+
+
+class NeighborTable:
+    """Top-n similar tracks of every catalog row, in CSR form.
+
+    indices[offsets[row]:offsets[row + 1]] are the neighbor rows of `row`,
+    most similar first, with their cosine similarity in scores. Loaded
+    tables are memory-mapped, so a lookup is two offset reads and a slice.
+    """
+
+    def __init__(self, offsets, indices, scores, ids=None):
+        self.offsets = offsets
+        self.indices = indices
+        self.scores = scores
+        self.ids = ids
+        self._rows_by_id = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def neighbors(self, row):
+        """(neighbor rows, similarities) of a catalog row"""
+        start, stop = self.offsets[row], self.offsets[row + 1]
+        return self.indices[start:stop], self.scores[start:stop]
+
+    def similar(self, spotify_id, limit=None):
+        """[(spotify_id, similarity)] of a track, if ids were saved with the table"""
+        if self._rows_by_id is None:
+            self._rows_by_id = {spotify_id: row for row, spotify_id in enumerate(self.ids)}
+        row = self._rows_by_id.get(spotify_id)
+        if row is None:
+            return []
+        indices, scores = self.neighbors(row)
+        return [(self.ids[i], float(s)) for i, s in zip(indices[:limit], scores[:limit])]
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in NEIGHBOR_FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        if self.ids is not None:
+            with open(os.path.join(directory, "ids.json"), 'w', encoding='utf-8') as f:
+                json.dump(list(self.ids), f)
+
+    @classmethod
+    def load(cls, directory):
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in NEIGHBOR_FILES}
+        ids = None
+        if os.path.exists(os.path.join(directory, "ids.json")):
+            with open(os.path.join(directory, "ids.json"), 'r', encoding='utf-8') as f:
+                ids = json.load(f)
+        return cls(ids=ids, **arrays)
+
+
+def compute_neighbors(source_path, top_n=DEFAULT_TOP_N, min_similarity=0.0, block_size=BLOCK_SIZE,
+                      tile_size=TILE_SIZE, processes=None, ids=None):
+    """NeighborTable of every row of a vectors .npy or sparse .npz file.
+
+    Row blocks are spread over worker processes, which open the file
+    themselves (vectors memory-mapped) instead of receiving the matrix.
+    Neighbors below min_similarity are dropped, so rows can have fewer
+    than top_n. Scores are stored as float16.
+    """
+    similarity = open_similarity(source_path)
+    n = len(similarity)
+    top_n = min(top_n, n - 1)
+    tasks = [(start, min(start + block_size, n), top_n, tile_size) for start in range(0, n, block_size)]
+    indices = np.empty((n, top_n), dtype=np.int32)
+    scores = np.empty((n, top_n), dtype=np.float32)
+
+    def collect(results):
+        for start, block_indices, block_scores in results:
+            indices[start:start + len(block_indices)] = block_indices
+            scores[start:start + len(block_scores)] = block_scores
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        _init_worker(source_path)
+        collect(map(_neighbors_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(source_path,)) as pool:
+            collect(pool.map(_neighbors_task, tasks))
+
+    keep = np.isfinite(scores) & (scores >= min_similarity)
+    offsets = np.concatenate([[0], np.cumsum(keep.sum(axis=1))]).astype(np.int64)
+    return NeighborTable(offsets, indices[keep], scores[keep].astype(np.float16), ids)
+
+
+def brute_force_recall(similarity, table, rows, top_n, min_similarity=0.0, tolerance=2e-3):
+    """Share of the exact top_n similarities (from one full similarity row) the table matches, for sampled rows.
+
+    Scores are compared rather than rows, so tracks with identical vectors
+    may stand in for each other; tolerance covers the float16 scores. The
+    truth drops scores below min_similarity like compute_neighbors does.
+    """
+    found = []
+    for row in rows:
+        exact = similarity.tile(similarity.rows(row, row + 1), 0, len(similarity))[0]
+        exact[row] = -np.inf
+        truth = np.sort(exact[top_k(exact[None], top_n)[0]])[::-1]
+        truth = truth[np.isfinite(truth) & (truth >= min_similarity)]
+        stored = np.asarray(table.neighbors(row)[1], dtype=np.float32)
+        if not len(truth):
+            found.append(1.0 if not len(stored) else 0.0)
+            continue
+        found.append(np.sum(np.abs(truth[:len(stored)] - stored[:len(truth)]) <= tolerance) / len(truth))
+    return float(np.mean(found))
+
+
+def main():
+    """Precompute the top-n similar tracks of every catalog row"""
+    parser = argparse.ArgumentParser(description="Offline item-item neighbors for similar tracks and playlists")
+    parser.add_argument("--source", choices=["metadata", "cooccurrence", "vectors", "synthetic"], default="metadata",
+                        help="metadata_embeddings vectors, sparse artist/genre co-occurrence, a vectors .npy, "
+                             "or clustered random vectors")
+    parser.add_argument("--tracks", help="Track file (default: the API's database)")
+    parser.add_argument("--vectors", help="Vectors .npy aligned with the tracks, e.g. a snapshot's vectors.npy")
+    parser.add_argument("--catalog", type=int, help="Scale the tracks up to this many rows")
+    parser.add_argument("--dimensions", type=int, default=256, help="Size of the synthetic vectors")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--min-similarity", type=float, default=0.0)
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Table directory (default: neighbors/<source>)")
+    args = parser.parse_args()
+
+    from recommender import load_tracks_table, synthetic_table
+    table = load_tracks_table(args.tracks)
+    if args.catalog:
+        table = synthetic_table(table, args.catalog)
+    ids = table.column("spotify_id").cast(pa.string()).to_pylist()
+    if args.source == "vectors" and not args.vectors:
+        parser.error("--source vectors needs --vectors")
+
+    with tempfile.TemporaryDirectory() as scratch, Stopwatch() as total:
+        source_path = args.vectors
+        if args.source == "cooccurrence":
+            source_path = os.path.join(scratch, "cooccurrence.npz")
+            sparse.save_npz(source_path, cooccurrence_matrix(table))
+        elif args.source != "vectors":
+            if args.source == "synthetic":
+                from ann_index import clustered_vectors
+                vectors = clustered_vectors(table.num_rows, args.dimensions)
+            else:
+                from metadata_embeddings import MetadataEmbedder
+                vectors = MetadataEmbedder.fit(table).transform(table)
+            source_path = os.path.join(scratch, "vectors.npy")
+            np.save(source_path, vectors)
+
+        with Stopwatch() as sw:
+            neighbors = compute_neighbors(source_path, args.top_n, args.min_similarity, args.block_size,
+                                          args.tile_size, args.processes, ids)
+        sample = np.random.default_rng(0).choice(len(neighbors), size=min(20, len(neighbors)), replace=False)
+        recall = brute_force_recall(open_similarity(source_path), neighbors, sample, args.top_n, args.min_similarity)
+
+    output = args.output or os.path.join(NEIGHBORS_DIR, args.source)
+    neighbors.save(output)
+    loaded = NeighborTable.load(output)
+    rows = np.random.default_rng(1).integers(0, len(loaded), size=1000)
+    lookups = []
+    for row in rows:
+        with Stopwatch() as lookup:
+            loaded.neighbors(row)
+        lookups.append(lookup.elapsed_ms * 1000)
+
+    size_mb = sum(os.path.getsize(os.path.join(output, f"{name}.npy")) for name in NEIGHBOR_FILES) / 1e6
+    tile_mb = args.block_size * args.tile_size * 4 / 1e6
+    print(f"📊 {len(neighbors)} tracks, top-{args.top_n} {args.source} neighbors with {args.processes} process(es)")
+    print(f"neighbors: {sw.elapsed_ms / 1000:.1f}s ({len(neighbors) / (sw.elapsed_ms / 1000):.0f} tracks/s), "
+          f"total with source: {total.elapsed_ms / 1000:.1f}s, {tile_mb:.0f} MB score tile per worker")
+    print(f"recall vs brute force on {len(sample)} rows: {recall:.3f}; "
+          f"{len(loaded.indices) / len(loaded):.1f} neighbors per track, {size_mb:.1f} MB on disk")
+    lookup = summarize(lookups)
+    print(f"lookup: p50={lookup['p50']:.1f}µs p99={lookup['p99']:.1f}µs")
+    print(f"Neighbor table written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import gc
+import math
+import argparse
+import tracemalloc
+from typing import Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+from timing import Stopwatch
+
+# Fields of an exported track, in CSV column order, with their Arrow types.
+# artists, artist_ids and genres stay '; '-joined like in the exports.
+TRACK_FIELDS = {
+    "spotify_id": pa.string(),
+    "name": pa.string(),
+    "artists": pa.string(),
+    "artist_ids": pa.string(),
+    "album": pa.string(),
+    "album_id": pa.string(),
+    "genres": pa.string(),
+    "popularity": pa.int8(),
+    "duration_ms": pa.int32(),
+    "release_date": pa.string(),
+    "preview_url": pa.string(),
+    "track_url": pa.string(),
+    "explicit": pa.bool_(),
+    "album_image_url": pa.string(),
+    "isrc": pa.string(),
+}
+INTEGER_FIELDS = ("popularity", "duration_ms")
+
+# Values shared by many tracks are dictionary-encoded in TrackColumns
+DICTIONARY_FIELDS = ("artists", "artist_ids", "album", "album_id", "genres", "release_date", "album_image_url")
+
+# Properties of the legacy all-TEXT Track collection (populate_tracks.py)
+LEGACY_FIELDS = ("spotify_id", "name", "artists", "album", "genres", "popularity", "duration_ms",
+                 "release_date", "preview_url", "track_url", "explicit", "album_image_url")
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _text(value):
+    if _missing(value):
+        return None
+    if isinstance(value, (list, tuple)):
+        value = "; ".join(str(v) for v in value)
+    return str(value) or None
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return False if _missing(value) else bool(value)
+
+
+class Track:
+    """One track with typed fields and no per-instance dict.
+
+    Missing or empty text is None, missing numbers are 0. get() mirrors
+    dict.get, so code written against row dicts (track_properties among
+    others) accepts a Track as it is.
+    """
+
+    __slots__ = tuple(TRACK_FIELDS)
+
+    spotify_id: Optional[str]
+    name: Optional[str]
+    artists: Optional[str]
+    artist_ids: Optional[str]
+    album: Optional[str]
+    album_id: Optional[str]
+    genres: Optional[str]
+    popularity: int
+    duration_ms: int
+    release_date: Optional[str]
+    preview_url: Optional[str]
+    track_url: Optional[str]
+    explicit: bool
+    album_image_url: Optional[str]
+    isrc: Optional[str]
+
+    def __init__(self, spotify_id, name=None, artists=None, artist_ids=None, album=None, album_id=None,
+                 genres=None, popularity=0, duration_ms=0, release_date=None, preview_url=None,
+                 track_url=None, explicit=False, album_image_url=None, isrc=None):
+        self.spotify_id = spotify_id
+        self.name = name
+        self.artists = artists
+        self.artist_ids = artist_ids
+        self.album = album
+        self.album_id = album_id
+        self.genres = genres
+        self.popularity = popularity
+        self.duration_ms = duration_ms
+        self.release_date = release_date
+        self.preview_url = preview_url
+        self.track_url = track_url
+        self.explicit = explicit
+        self.album_image_url = album_image_url
+        self.isrc = isrc
+
+    @classmethod
+    def from_dict(cls, row):
+        """A Track from a CSV/JSON row dict or DataFrame row; NaN and missing keys become None/0"""
+        values = {field: _text(row.get(field)) for field in TRACK_FIELDS}
+        for field in INTEGER_FIELDS:
+            value = row.get(field)
+            values[field] = 0 if _missing(value) else int(value)
+        values["explicit"] = _flag(row.get("explicit"))
+        return cls(**values)
+
+    @classmethod
+    def from_properties(cls, properties):
+        """A Track from Weaviate properties of either schema (list or '; '-joined artists and genres)"""
+        return cls.from_dict(properties)
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None) if field in TRACK_FIELDS else None
+        return default if value is None else value
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in TRACK_FIELDS}
+
+    def properties(self):
+        """Typed Weaviate properties (track_schema.track_properties)"""
+        from track_schema import track_properties
+        return track_properties(self)
+
+    def legacy_properties(self):
+        """Properties of the legacy Track collection, with missing text as """""
+        return {field: "" if getattr(self, field) is None else getattr(self, field) for field in LEGACY_FIELDS}
+
+    def __eq__(self, other):
+        return isinstance(other, Track) and all(getattr(self, f) == getattr(other, f) for f in TRACK_FIELDS)
+
+    def __repr__(self):
+        return f"Track({self.spotify_id!r}, {self.name!r}, artists={self.artists!r})"
+
+
+def _column(table, field):
+    """A table column cast to the field's type, nulls if the table lacks it"""
+    kind = TRACK_FIELDS[field]
+    if field not in table.column_names:
+        column = pa.nulls(table.num_rows, kind)
+    else:
+        column = table.column(field)
+        if isinstance(column, pa.ChunkedArray):
+            column = column.combine_chunks()
+        if pa.types.is_dictionary(column.type):
+            column = column.dictionary_decode()
+        if pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+            column = pc.binary_join(column, "; ")
+        if kind == pa.bool_() and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+            column = pc.equal(pc.utf8_lower(pc.utf8_trim_whitespace(column)), "true")
+        column = column.cast(kind)
+        if kind == pa.string():
+            # Empty CSV cells read as "" with Arrow and NaN with pandas; both are missing
+            column = pc.if_else(pc.equal(column, ""), pa.scalar(None, pa.string()), column)
+    if field in INTEGER_FIELDS or kind == pa.bool_():
+        column = pc.fill_null(column, pa.scalar(0 if field in INTEGER_FIELDS else False, kind))
+    if field in DICTIONARY_FIELDS:
+        column = pc.dictionary_encode(column)
+    return column
+
+
+class TrackColumns:
+    """Many tracks as one Arrow table, a column per field.
+
+    Shared values (artists, albums, genres, release dates, covers) are
+    dictionary-encoded and numbers are narrow ints, so a catalog costs a
+    few arrays instead of a dict per track. Iterating or indexing yields
+    Track records.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def from_arrow(cls, table):
+        """Conform any track table (CSV, JSON or Parquet as loaded by load_tracks_table) to the track fields"""
+        return cls(pa.table({field: _column(table, field) for field in TRACK_FIELDS}))
+
+    @classmethod
+    def from_tracks(cls, tracks):
+        tracks = list(tracks)
+        return cls.from_arrow(pa.table({field: pa.array([getattr(t, field) for t in tracks], type=kind)
+                                        for field, kind in TRACK_FIELDS.items()}))
+
+    @classmethod
+    def from_dicts(cls, rows):
+        return cls.from_tracks(Track.from_dict(row) for row in rows)
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def _values(self, field):
+        """A column as a Python list; rows with the same dictionary value share one str object"""
+        column = self.table.column(field).combine_chunks()
+        if not pa.types.is_dictionary(column.type):
+            return column.to_pylist()
+        values = column.dictionary.to_pylist() + [None]
+        codes = pc.fill_null(column.indices, len(values) - 1).to_numpy(zero_copy_only=False)
+        return [values[code] for code in codes.tolist()]
+
+    def value_lists(self):
+        """One Python list per field, in TRACK_FIELDS order"""
+        return [self._values(field) for field in TRACK_FIELDS]
+
+    def __iter__(self):
+        for values in zip(*self.value_lists()):
+            yield Track(*values)
+
+    def __getitem__(self, row):
+        return Track(*(self.table.column(field)[row].as_py() for field in TRACK_FIELDS))
+
+    def column(self, field):
+        """A numeric or boolean field as a numpy array"""
+        return self.table.column(field).to_numpy()
+
+    def to_arrow(self, decode=True):
+        """The table with plain string columns (decode=False keeps the dictionary encoding)"""
+        if not decode:
+            return self.table
+        return pa.table({field: self.table.column(field).cast(kind) for field, kind in TRACK_FIELDS.items()})
+
+    def to_dicts(self):
+        return [dict(zip(TRACK_FIELDS, values)) for values in zip(*self.value_lists())]
+
+    def properties(self):
+        """Typed Weaviate properties of every track, for batch inserts"""
+        from track_schema import track_properties
+        return (track_properties(track) for track in self)
+
+    def legacy_properties(self):
+        """Legacy Track collection properties of every track; repeated values share one str"""
+        return [track.legacy_properties() for track in self]
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+
+def _traced_mb(build, *args):
+    """(result, MB of Python heap it holds) for build(*args)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build(*args)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held / 1e6
+
+
+def main():
+    """Memory of 1M tracks as dicts, Track records and TrackColumns, and conversion speed"""
+    parser = argparse.ArgumentParser(description="Track record memory benchmark")
+    parser.add_argument("--tracks", help="Track file to scale up (default: the API's database)")
+    parser.add_argument("--records", type=int, default=1000000)
+    args = parser.parse_args()
+
+    from recommender import load_tracks_table, synthetic_table
+    columns = TrackColumns.from_arrow(synthetic_table(load_tracks_table(args.tracks), args.records))
+    count = len(columns)
+
+    # Fresh strings per row, like json.load or to_pylist give the pipeline today
+    fresh, fresh_mb = _traced_mb(lambda: columns.to_arrow().to_pylist())
+    del fresh
+    # Dicts and Track records built from the same decoded lists, so only the containers differ
+    values, values_mb = _traced_mb(columns.value_lists)
+    with Stopwatch() as to_dicts:
+        dicts, dict_mb = _traced_mb(lambda lists: [dict(zip(TRACK_FIELDS, row)) for row in zip(*lists)], values)
+    del dicts
+    with Stopwatch() as to_tracks:
+        tracks, track_mb = _traced_mb(lambda lists: [Track(*row) for row in zip(*lists)], values)
+    del values
+    with Stopwatch() as from_tracks:
+        rebuilt = TrackColumns.from_tracks(tracks)
+    assert rebuilt[count - 1] == tracks[-1]
+    del tracks, rebuilt
+    plain_mb = columns.to_arrow().nbytes / 1e6
+
+    print(f"📊 {count} tracks, {len(TRACK_FIELDS)} fields")
+    for label, mb in (("dicts, a str per row", fresh_mb),
+                      ("decoded values", values_mb),
+                      ("  + dict per track", dict_mb),
+                      ("  + Track per track", track_mb),
+                      ("Arrow table", plain_mb),
+                      ("TrackColumns", columns.nbytes / 1e6)):
+        print(f"{label:<22} {mb:>8.0f} MB  {mb * 1e6 / count:>6.0f} B/track")
+    print(f"values -> dicts {to_dicts.elapsed_ms / 1000:.1f}s, -> Track records {to_tracks.elapsed_ms / 1000:.1f}s, "
+          f"Track records -> columns {from_tracks.elapsed_ms / 1000:.1f}s (heap tracing slows the first two)")
+
+
+if __name__ == "__main__":
+    main()
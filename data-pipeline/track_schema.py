@@ -0,0 +1,192 @@
+import os
+import math
+import argparse
+from weaviate.classes.config import Configure, Property, DataType, Tokenization
+from weaviate_client import connect
+from index_profiles import vector_index_config, add_index_profile_argument
+
+LEGACY_TRACK_COLLECTION = "Track"
+TYPED_TRACK_COLLECTION = "TrackV2"
+
+# Properties the recommendations UI renders; project queries onto these
+UI_PROPERTIES = [
+    "spotify_id", "name", "artists", "album", "genres", "popularity",
+    "duration_ms", "release_date", "album_image_url", "track_url",
+]
+
+
+def typed_track_properties():
+    """Property definitions of the typed, filter-optimized Track schema.
+
+    genres and artists are TEXT_ARRAY with field tokenization so genre and
+    artist filters match whole values through the inverted index. Numeric
+    fields used in range filters get a range index, and identifiers and URLs
+    are excluded from vectorization so vectors only describe the music.
+    """
+    return [
+        Property(name="spotify_id", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 index_searchable=False, skip_vectorization=True, vectorize_property_name=False),
+        Property(name="name", data_type=DataType.TEXT),
+        Property(name="artists", data_type=DataType.TEXT_ARRAY, tokenization=Tokenization.FIELD),
+        Property(name="album", data_type=DataType.TEXT),
+        Property(name="genres", data_type=DataType.TEXT_ARRAY, tokenization=Tokenization.FIELD),
+        Property(name="popularity", data_type=DataType.INT, index_filterable=True, index_range_filters=True),
+        Property(name="duration_ms", data_type=DataType.INT, index_filterable=True, index_range_filters=True),
+        Property(name="release_date", data_type=DataType.TEXT, index_searchable=False, skip_vectorization=True),
+        Property(name="release_year", data_type=DataType.INT, index_filterable=True, index_range_filters=True),
+        Property(name="preview_url", data_type=DataType.TEXT, index_filterable=False, index_searchable=False,
+                 skip_vectorization=True, vectorize_property_name=False),
+        Property(name="track_url", data_type=DataType.TEXT, index_filterable=False, index_searchable=False,
+                 skip_vectorization=True, vectorize_property_name=False),
+        Property(name="explicit", data_type=DataType.BOOL, index_filterable=True),
+        Property(name="album_image_url", data_type=DataType.TEXT, index_filterable=False, index_searchable=False,
+                 skip_vectorization=True, vectorize_property_name=False),
+    ]
+
+
+def create_typed_track_collection(client, name=TYPED_TRACK_COLLECTION, index_profile=None):
+    """Create a Track collection with the typed schema"""
+    vectorizer = Configure.Vectorizer.text2vec_openai(model="text-embedding-3-small") if os.getenv('OPENAI_API_KEY') else None
+    return client.collections.create(
+        name=name,
+        description="A music track with metadata",
+        properties=typed_track_properties(),
+        vectorizer_config=vectorizer,
+        vector_index_config=vector_index_config(index_profile),
+    )
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _split_list(value):
+    """Split a '; '-joined string into a list, passing lists through"""
+    if _is_missing(value):
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [part.strip() for part in str(value).split(';') if part.strip()]
+
+
+def parse_release_year(release_date):
+    """Return the year of a Spotify release date ('2022', '2022-03' or '2022-03-07')"""
+    if _is_missing(release_date):
+        return None
+    year = str(release_date)[:4]
+    return int(year) if year.isdigit() else None
+
+
+def track_properties(row):
+    """Convert a CSV row, DataFrame row or legacy Track object into typed properties"""
+    def text(key):
+        value = row.get(key)
+        return "" if _is_missing(value) else str(value)
+
+    def integer(key):
+        value = row.get(key)
+        return 0 if _is_missing(value) else int(value)
+
+    explicit = row.get('explicit')
+    if isinstance(explicit, str):
+        explicit = explicit.strip().lower() == 'true'
+
+    properties = {
+        "spotify_id": text('spotify_id'),
+        "name": text('name'),
+        "artists": _split_list(row.get('artists')),
+        "album": text('album'),
+        "genres": [g.lower() for g in _split_list(row.get('genres'))],
+        "popularity": integer('popularity'),
+        "duration_ms": integer('duration_ms'),
+        "release_date": text('release_date'),
+        "preview_url": text('preview_url'),
+        "track_url": text('track_url'),
+        "explicit": False if _is_missing(explicit) else bool(explicit),
+        "album_image_url": text('album_image_url'),
+    }
+    release_year = parse_release_year(row.get('release_date'))
+    if release_year is not None:
+        properties["release_year"] = release_year
+    return properties
+
+
+def _copy_collection(source_collection, target_collection, convert, include_vector=False, batch_size=200):
+    """Stream every object of one collection into another, keeping UUIDs"""
+    copied = 0
+    with target_collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=4) as batch:
+        for obj in source_collection.iterator(include_vector=include_vector):
+            vector = obj.vector.get("default") if include_vector and obj.vector else None
+            batch.add_object(properties=convert(obj.properties), uuid=obj.uuid, vector=vector)
+            copied += 1
+            if copied % 10000 == 0:
+                print(f"  copied {copied} objects...")
+
+    failed = target_collection.batch.failed_objects
+    for failure in failed[:5]:
+        print(f"  ❌ {failure.object_.uuid}: {failure.message}")
+    return copied - len(failed), len(failed)
+
+
+def migrate_track_collection(client, source=LEGACY_TRACK_COLLECTION, target=TYPED_TRACK_COLLECTION, replace=False, index_profile=None):
+    """Copy a legacy Track collection into the typed schema.
+
+    Objects keep their UUIDs and are re-vectorized from the typed properties.
+    With replace=True the source collection is recreated with the typed schema
+    under its original name (reusing the new vectors), and the temporary
+    target collection is dropped afterwards.
+    """
+    if not client.collections.exists(source):
+        raise ValueError(f"Source collection {source} does not exist")
+    if client.collections.exists(target):
+        raise ValueError(f"Target collection {target} already exists, delete it first")
+
+    print(f"Creating typed collection {target}...")
+    create_typed_track_collection(client, target, index_profile=index_profile)
+
+    print(f"Copying {source} -> {target}...")
+    copied, failed = _copy_collection(client.collections.get(source), client.collections.get(target), track_properties)
+    print(f"Copied {copied} tracks ({failed} failed)")
+
+    if replace:
+        if failed:
+            print(f"Not replacing {source} because {failed} objects failed to migrate")
+            return copied, failed
+
+        print(f"Replacing {source} with the typed schema...")
+        client.collections.delete(source)
+        create_typed_track_collection(client, source, index_profile=index_profile)
+        copied, failed = _copy_collection(
+            client.collections.get(target), client.collections.get(source), dict, include_vector=True,
+        )
+        print(f"Copied {copied} tracks back into {source} ({failed} failed)")
+        if not failed:
+            client.collections.delete(target)
+
+    return copied, failed
+
+
+def create_weaviate_client():
+    """Create and return a Weaviate client"""
+    return connect("cloud")
+
+
+def main():
+    """Migrate the Track collection to the typed schema"""
+    parser = argparse.ArgumentParser(description="Migrate the Track collection to the typed, filter-optimized schema")
+    parser.add_argument("--source", default=LEGACY_TRACK_COLLECTION)
+    parser.add_argument("--target", default=TYPED_TRACK_COLLECTION)
+    parser.add_argument("--replace", action="store_true",
+                        help="Recreate the source collection with the typed schema (the Next.js app expects string genres/artists)")
+    add_index_profile_argument(parser)
+    args = parser.parse_args()
+
+    client = create_weaviate_client()
+    try:
+        migrate_track_collection(client, source=args.source, target=args.target, replace=args.replace, index_profile=args.index_profile)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+from weaviate.classes.query import Filter, MetadataQuery
+from weaviate_client import get_client
+from track_schema import LEGACY_TRACK_COLLECTION, UI_PROPERTIES
+from timing import Stopwatch
+
+_typed_collections = {}
+
+
+def is_typed_collection(collection):
+    """True if the collection uses the typed schema (genre arrays and release_year)"""
+    if collection.name not in _typed_collections:
+        names = {p.name for p in collection.config.get().properties}
+        _typed_collections[collection.name] = "release_year" in names
+    return _typed_collections[collection.name]
+
+
+def track_filters(genres=None, min_popularity=None, max_popularity=None, year_from=None, year_to=None,
+                  explicit=None, typed=True):
+    """Build the Weaviate filter for the track search options, or None if there are none.
+
+    On the typed schema genres and years go through the inverted and range
+    indexes; the legacy TEXT-blob schema falls back to wildcard matches on
+    genres and release_date.
+    """
+    filters = []
+    if genres:
+        if typed:
+            filters.append(Filter.by_property("genres").contains_any([g.lower() for g in genres]))
+        else:
+            filters.append(Filter.any_of([Filter.by_property("genres").like(f"*{g}*") for g in genres]))
+    if min_popularity is not None:
+        filters.append(Filter.by_property("popularity").greater_or_equal(min_popularity))
+    if max_popularity is not None:
+        filters.append(Filter.by_property("popularity").less_or_equal(max_popularity))
+    if year_from is not None or year_to is not None:
+        if typed:
+            if year_from is not None:
+                filters.append(Filter.by_property("release_year").greater_or_equal(year_from))
+            if year_to is not None:
+                filters.append(Filter.by_property("release_year").less_or_equal(year_to))
+        else:
+            # release_date is word-tokenized, so range operators would compare the
+            # month and day tokens too; match the year token instead
+            first = year_from if year_from is not None else 1900
+            last = year_to if year_to is not None else 2100
+            filters.append(Filter.any_of([
+                Filter.by_property("release_date").like(f"{year}*") for year in range(first, last + 1)
+            ]))
+    if explicit is not None:
+        filters.append(Filter.by_property("explicit").equal(explicit))
+
+    if not filters:
+        return None
+    return filters[0] if len(filters) == 1 else Filter.all_of(filters)
+
+
+def search_tracks(collection, query, alpha=0.5, limit=20, genres=None, min_popularity=None, max_popularity=None,
+                  year_from=None, year_to=None, explicit=None, return_properties=None, vector=None):
+    """Hybrid BM25 + vector search over a Track collection.
+
+    alpha=0 is pure BM25, alpha=1 pure vector search. All filters run inside
+    Weaviate and only the UI properties come back, so the limit is the
+    number of tracks actually shown. vector lets callers pass a query
+    embedding they already have (see query_embeddings).
+    """
+    filters = track_filters(
+        genres=genres, min_popularity=min_popularity, max_popularity=max_popularity,
+        year_from=year_from, year_to=year_to, explicit=explicit, typed=is_typed_collection(collection),
+    )
+    return collection.query.hybrid(
+        query=query,
+        alpha=alpha,
+        vector=vector,
+        limit=limit,
+        filters=filters,
+        return_properties=return_properties or UI_PROPERTIES,
+        return_metadata=MetadataQuery(score=True),
+    )
+
+
+def main():
+    """Search tracks from the command line"""
+    parser = argparse.ArgumentParser(description="Hybrid track search with filters pushed into Weaviate")
+    parser.add_argument("query")
+    parser.add_argument("--collection", default=LEGACY_TRACK_COLLECTION)
+    parser.add_argument("--alpha", type=float, default=0.5, help="0 = keyword only, 1 = vector only")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--genres", nargs="+")
+    parser.add_argument("--min-popularity", type=int)
+    parser.add_argument("--max-popularity", type=int)
+    parser.add_argument("--year-from", type=int)
+    parser.add_argument("--year-to", type=int)
+    explicit = parser.add_mutually_exclusive_group()
+    explicit.add_argument("--explicit", dest="explicit", action="store_const", const=True, default=None)
+    explicit.add_argument("--clean", dest="explicit", action="store_const", const=False)
+    parser.add_argument("--target", choices=["local", "cloud"], default=None)
+    args = parser.parse_args()
+
+    collection = get_client(args.target).collections.get(args.collection)
+    with Stopwatch() as sw:
+        response = search_tracks(
+            collection, args.query, alpha=args.alpha, limit=args.limit, genres=args.genres,
+            min_popularity=args.min_popularity, max_popularity=args.max_popularity,
+            year_from=args.year_from, year_to=args.year_to, explicit=args.explicit,
+        )
+
+    print(f"🎵 {len(response.objects)} tracks for '{args.query}' in {sw.elapsed_ms:.0f}ms\n")
+    for i, track in enumerate(response.objects, 1):
+        p = track.properties
+        artists = ", ".join(p["artists"]) if isinstance(p.get("artists"), list) else p.get("artists")
+        genres = ", ".join(p["genres"]) if isinstance(p.get("genres"), list) else p.get("genres")
+        print(f"{i:>2}. {p.get('name')} - {artists} ({p.get('popularity')}) [{genres}] score={track.metadata.score:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,15 @@
 import os
+import argparse
 import pandas as pd
 import weaviate
-from dotenv import load_dotenv
+from weaviate_client import connect
 import glob
-
-load_dotenv()
+from ingestion import IngestionCheckpoint, ingest_rows
+from index_profiles import vector_index_config, add_index_profile_argument
 
 def create_weaviate_client():
     """Create and return a Weaviate client"""
-    weaviate_url = os.getenv('WEAVIATE_CLUSTER_URL')
-    weaviate_api_key = os.getenv('WEAVIATE_API_KEY')
-    
-    if not weaviate_url or not weaviate_api_key:
-        raise ValueError("WEAVIATE_CLUSTER_URL and WEAVIATE_API_KEY must be set in environment variables")
-    
-    # Remove https:// if present
-    weaviate_url = weaviate_url.replace("https://", "")
-    
-    return weaviate.Client(
-        url=f"https://{weaviate_url}",
-        auth_client_secret=weaviate.Auth.api_key(weaviate_api_key),
-        additional_headers={
-            "X-OpenAI-Api-Key": os.getenv('OPENAI_API_KEY') if os.getenv('OPENAI_API_KEY') else "",
-            "X-Cohere-Api-Key": os.getenv('COHERE_API_KEY') if os.getenv('COHERE_API_KEY') else ""
-        }
-    )
+    return connect("cloud")
 
 def get_latest_export_file():
     """Get the most recent CSV file from the exports directory"""
@@ -38,7 +23,7 @@ def get_latest_export_file():
     latest_file = max(csv_files, key=os.path.getmtime)
     return latest_file
 
-def create_track_collection(client):
+def create_track_collection(client, index_profile=None):
     """Create the Track collection if it doesn't exist"""
     try:
         # Check if collection already exists
@@ -64,17 +49,18 @@ def create_track_collection(client):
                 weaviate.classes.config.Property(name="release_date", data_type=weaviate.classes.config.DataType.TEXT),
                 weaviate.classes.config.Property(name="preview_url", data_type=weaviate.classes.config.DataType.TEXT),
                 weaviate.classes.config.Property(name="track_url", data_type=weaviate.classes.config.DataType.TEXT),
-                weaviate.classes.config.Property(name="explicit", data_type=weaviate.classes.config.DataType.BOOLEAN),
+                weaviate.classes.config.Property(name="explicit", data_type=weaviate.classes.config.DataType.BOOL),
                 weaviate.classes.config.Property(name="album_image_url", data_type=weaviate.classes.config.DataType.TEXT)
             ],
-            vectorizer_config=weaviate.classes.config.Configure.Vectorizer.text2vec_openai() if os.getenv('OPENAI_API_KEY') else None
+            vectorizer_config=weaviate.classes.config.Configure.Vectorizer.text2vec_openai() if os.getenv('OPENAI_API_KEY') else None,
+            vector_index_config=vector_index_config(index_profile)
         )
         print("Track collection created successfully!")
         
     except Exception as e:
         print(f"Error creating Track collection: {e}")
 
-def populate_tracks_from_file(client, csv_path):
+def populate_tracks_from_file(client, csv_path, resume=False, index_profile=None):
     """Populate the Track collection with data from a specific CSV file"""
     try:
         print(f"Reading CSV file: {csv_path}")
@@ -82,19 +68,19 @@ def populate_tracks_from_file(client, csv_path):
         
         print(f"Found {len(df)} tracks in CSV file")
         
+        # Clear existing data unless we are resuming an interrupted load
+        if not resume and client.collections.exists("Track"):
+            print("Clearing existing tracks...")
+            client.collections.delete("Track")
+        
         # Check if Track collection exists, if not create it
-        collections = client.collections.list_all()
-        if not any(col.name == "Track" for col in collections):
+        if not client.collections.exists("Track"):
             print("Track collection doesn't exist. Creating it...")
-            create_track_collection(client)
+            create_track_collection(client, index_profile=index_profile)
         
         # Get the Track collection
         track_collection = client.collections.get("Track")
         
-        # Clear existing data
-        print("Clearing existing tracks...")
-        track_collection.delete_many()
-        
         # Convert DataFrame to list of dictionaries
         tracks = []
         for _, row in df.iterrows():
@@ -114,26 +100,25 @@ def populate_tracks_from_file(client, csv_path):
             }
             tracks.append(track)
         
-        # Batch insert tracks
-        batch_size = 100
-        for i in range(0, len(tracks), batch_size):
-            batch = tracks[i:i + batch_size]
-            
-            with track_collection.batch.dynamic() as batch_client:
-                for track in batch:
-                    batch_client.add_object(
-                        properties=track
-                    )
-            
-            print(f"Inserted tracks {i+1} to {min(i+batch_size, len(tracks))}")
+        # Batch insert tracks, checkpointing after every committed chunk
+        checkpoint = IngestionCheckpoint("Track", csv_path)
+        inserted, failed = ingest_rows(track_collection, tracks, checkpoint, uuid_key="spotify_id", resume=resume)
         
-        print(f"Successfully populated {len(tracks)} tracks!")
+        print(f"Successfully populated {inserted} tracks!")
+        if failed:
+            print(f"{failed} tracks failed, see {checkpoint.dead_letter_path}")
         
     except Exception as e:
         print(f"Error populating tracks: {e}")
+        print("Re-run with --resume to continue from the last checkpoint.")
 
 def main():
     """Main function to use the latest export file"""
+    parser = argparse.ArgumentParser(description="Populate the Track collection from the latest export")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint and retry dead letters")
+    add_index_profile_argument(parser)
+    args = parser.parse_args()
+    
     try:
         # Get the latest export file
         latest_file = get_latest_export_file()
@@ -145,7 +130,7 @@ def main():
         
         try:
             # Populate with the latest data
-            populate_tracks_from_file(client, latest_file)
+            populate_tracks_from_file(client, latest_file, resume=args.resume, index_profile=args.index_profile)
             print("Done!")
         finally:
             client.close()
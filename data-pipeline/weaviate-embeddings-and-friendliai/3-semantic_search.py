@@ -1,24 +1,25 @@
 import os
-import weaviate
-from weaviate.classes.init import Auth
-from weaviate.classes.init import AdditionalConfig, Timeout
+import sys
 
-WEAVIATE_CLUSTER_URL = os.getenv('WEAVIATE_CLUSTER_URL') or 'https://zxzyqcyksbw7ozpm5yowa.c0.us-west2.gcp.weaviate.cloud'
-WEAVIATE_API_KEY = os.getenv('WEAVIATE_API_KEY') or 'n6mdfI32xrXF3DH76i8Pwc2IajzLZop2igb6'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
+from weaviate_client import connect
+from search_cache import CachedSearch
+from query_embeddings import VectorSearch, query_embedder
 
-client = weaviate.connect_to_weaviate_cloud(
-    cluster_url=WEAVIATE_CLUSTER_URL,
-    auth_credentials=Auth.api_key(WEAVIATE_API_KEY),
-)
+client = connect("cloud")
 
 print(client.is_connected())
 
 book_collection = client.collections.get(name="WeaviateEmbeddingBooks")
 
-# Semantic Search
+# Semantic Search, repeated queries are answered from the cache and query
+# vectors are embedded once and reused across runs
+
+backend = VectorSearch(book_collection, query_embedder("friendliai"))
+search = CachedSearch(book_collection, backend=backend)
 
-response = book_collection.query.near_text(
+response = search.near_text(
     query="biology",
     limit=3
 )
@@ -29,3 +30,6 @@ for book in response.objects:
     print(book.properties['description'])
     print(book.properties['categories'])
     print('---')
+
+search.print_metrics()
+backend.print_breakdown()
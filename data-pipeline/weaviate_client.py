@@ -0,0 +1,124 @@
+import os
+import atexit
+import threading
+import weaviate
+from weaviate.classes.init import AdditionalConfig, Auth, Timeout
+from dotenv import load_dotenv
+
+load_dotenv()
+load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env.local'))
+
+# Shared timeouts in seconds. Generative and Ollama-backed queries can be slow,
+# so the query timeout is generous; override per call when needed.
+DEFAULT_TIMEOUT = Timeout(init=10, query=120, insert=120)
+
+# Model provider keys forwarded to Weaviate's vectorizer and generative modules
+API_KEY_HEADERS = {
+    "X-OpenAI-Api-Key": "OPENAI_API_KEY",
+    "X-Cohere-Api-Key": "COHERE_API_KEY",
+    "X-Friendli-Api-Key": "FRIENDLIAI_API_KEY",
+}
+
+_shared_clients = {}
+_shared_lock = threading.Lock()
+
+
+def default_target():
+    """Return 'cloud' when a cluster URL is configured, otherwise 'local'"""
+    target = os.getenv('WEAVIATE_TARGET')
+    if target:
+        return target
+    return "cloud" if os.getenv('WEAVIATE_CLUSTER_URL') else "local"
+
+
+def api_key_headers(names=None):
+    """Return the provider API key headers that are set in the environment"""
+    headers = {}
+    for header, env_var in API_KEY_HEADERS.items():
+        if names is not None and header not in names:
+            continue
+        if os.getenv(env_var):
+            headers[header] = os.getenv(env_var)
+    return headers
+
+
+def connect(target=None, headers=None, timeout=None, skip_init_checks=False):
+    """Open a new v4 client.
+
+    Every v4 client sends queries and batch inserts over gRPC and only uses
+    REST for schema and metadata calls. target is 'local', 'cloud' or 'fake'
+    (the in-process fake_weaviate server, default: see default_target).
+    headers defaults to all provider API keys found in the environment.
+    """
+    return _open(target, headers, timeout, skip_init_checks, weaviate.connect_to_local,
+                 weaviate.connect_to_weaviate_cloud, "connect_to_fake")
+
+
+def connect_async(target=None, headers=None, timeout=None, skip_init_checks=False):
+    """Create a v4 async client with the same settings as connect.
+
+    The client is not connected yet; use it as `async with connect_async() as client:`
+    or await client.connect() yourself.
+    """
+    return _open(target, headers, timeout, skip_init_checks, weaviate.use_async_with_local,
+                 weaviate.use_async_with_weaviate_cloud, "use_async_with_fake")
+
+
+def _open(target, headers, timeout, skip_init_checks, local_factory, cloud_factory, fake_factory):
+    target = target or default_target()
+    if target == "fake":
+        # The test double is only imported when asked for
+        import fake_weaviate
+        return getattr(fake_weaviate, fake_factory)()
+    headers = api_key_headers() if headers is None else headers
+    additional_config = AdditionalConfig(timeout=timeout or DEFAULT_TIMEOUT)
+
+    if target == "local":
+        return local_factory(
+            host=os.getenv('WEAVIATE_HOST', 'localhost'),
+            port=int(os.getenv('WEAVIATE_HTTP_PORT', '8080')),
+            grpc_port=int(os.getenv('WEAVIATE_GRPC_PORT', '50051')),
+            headers=headers,
+            additional_config=additional_config,
+            skip_init_checks=skip_init_checks,
+        )
+
+    if target == "cloud":
+        cluster_url = os.getenv('WEAVIATE_CLUSTER_URL')
+        api_key = os.getenv('WEAVIATE_API_KEY')
+        if not cluster_url or not api_key:
+            raise ValueError("WEAVIATE_CLUSTER_URL and WEAVIATE_API_KEY must be set in environment variables")
+        return cloud_factory(
+            cluster_url=cluster_url,
+            auth_credentials=Auth.api_key(api_key),
+            headers=headers,
+            additional_config=additional_config,
+            skip_init_checks=skip_init_checks,
+        )
+
+    raise ValueError(f"Unknown Weaviate target {target!r}, expected 'local', 'cloud' or 'fake'")
+
+
+def get_client(target=None):
+    """Return a shared, already connected client for the target.
+
+    Reusing one client keeps the gRPC channel and HTTP connection pool warm
+    across calls instead of paying the connection setup every time. Shared
+    clients are closed at interpreter exit, do not close them yourself.
+    """
+    target = target or default_target()
+    with _shared_lock:
+        client = _shared_clients.get(target)
+        if client is None or not client.is_connected():
+            client = connect(target)
+            _shared_clients[target] = client
+        return client
+
+
+@atexit.register
+def close_shared_clients():
+    """Close every client handed out by get_client"""
+    with _shared_lock:
+        for client in _shared_clients.values():
+            client.close()
+        _shared_clients.clear()